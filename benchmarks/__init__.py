@@ -0,0 +1,4 @@
+"""Performance benchmarks for CryptoHelper.
+
+Run with ``python -m benchmarks``; see ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,153 @@
+"""Benchmark definitions: indicators, exchange response parsing and the engine."""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict
+
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.exchanges import BinanceClient, BybitClient, KuCoinClient
+from crypto_helper.exchanges.base import ExchangeClient
+from crypto_helper.indicators import core, vectorized
+from crypto_helper.transport import HttpTransport
+
+from . import payloads
+from .runner import benchmark
+
+INDICATOR_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+INDICATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "ema": lambda module, prices: module.ema(prices, 50),
+    "rsi": lambda module, prices: module.rsi(prices, 14),
+    "macd": lambda module, prices: module.macd(prices, 12, 26, 9),
+    "bollinger_bands": lambda module, prices: module.bollinger_bands(prices, 20, 2.0),
+}
+
+
+def _register_indicator(module: Any, prefix: str, name: str, compute: Callable[[Any, Any], Any]) -> None:
+    @benchmark(f"{prefix}.{name}", INDICATOR_SIZES)
+    def setup(size: int) -> Callable[[], Any]:
+        prices = payloads.candle_series(size).close if module is vectorized else payloads.closes(size)
+        return lambda: compute(module, prices)
+
+
+for _name, _compute in INDICATORS.items():
+    _register_indicator(core, "indicators.core", _name, _compute)
+    if vectorized.BACKEND == "numpy":
+        _register_indicator(vectorized, "indicators.vectorized", _name, _compute)
+
+
+def _register_backend(module: Any, backend: str, name: str, compute: Callable[[Any, Any], Any]) -> None:
+    # Both backends get the close column the engine hands them, so the pair shows
+    # what installing NumPy costs or saves on a single series
+    @benchmark(f"indicators.backends.{name}.{backend}", INDICATOR_SIZES)
+    def setup(size: int) -> Callable[[], Any]:
+        prices = payloads.candle_series(size).close
+        return lambda: compute(module, prices)
+
+
+if vectorized.BACKEND == "numpy":
+    for _name, _compute in INDICATORS.items():
+        _register_backend(core, "core", _name, _compute)
+        _register_backend(vectorized, "numpy", _name, _compute)
+
+
+# Candle-column indicators built on the rolling kernels; a 200-candle window
+# should cost about the same as a 20-candle one.
+COLUMN_INDICATORS: Dict[str, Callable[[CandleSeries], Any]] = {
+    "bollinger_bands_200": lambda candles: core.bollinger_bands(candles.close, 200, 2.0),
+    "atr": lambda candles: core.atr(candles.high, candles.low, candles.close, 14),
+    "stochastic": lambda candles: core.stochastic(candles.high, candles.low, candles.close, 14, 3),
+    "vwap": lambda candles: core.vwap(candles.high, candles.low, candles.close, candles.volume, 20),
+    "donchian_channels": lambda candles: core.donchian_channels(candles.high, candles.low, 20),
+    "donchian_channels_200": lambda candles: core.donchian_channels(candles.high, candles.low, 200),
+    "obv": lambda candles: core.obv(candles.close, candles.volume),
+}
+
+
+def _register_column_indicator(name: str, compute: Callable[[CandleSeries], Any]) -> None:
+    @benchmark(f"indicators.core.{name}", INDICATOR_SIZES)
+    def setup(size: int) -> Callable[[], Any]:
+        candles = payloads.candle_series(size)
+        return lambda: compute(candles)
+
+
+for _name, _compute in COLUMN_INDICATORS.items():
+    _register_column_indicator(_name, _compute)
+
+
+class _ReplayResponse:
+    status_code = 200
+    headers: Dict[str, str] = {}
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class _ReplaySession:
+    """Session answering every request with the same recorded body."""
+
+    def __init__(self, text: str) -> None:
+        self.response = _ReplayResponse(text)
+
+    def get(self, url: str, params: Any = None, timeout: float | None = None) -> _ReplayResponse:
+        return self.response
+
+
+def _register_parser(client_cls: type, payload: Callable[[int], str], sizes: tuple) -> None:
+    # No rate limiter: the benchmark measures parsing, not pacing
+    unthrottled = type(client_cls.__name__, (client_cls,), {"rate_limiter": None})
+
+    @benchmark(f"parsing.{client_cls.name}", sizes)
+    def setup(size: int) -> Callable[[], Any]:
+        client = unthrottled(transport=HttpTransport(session=_ReplaySession(payload(size))))
+        return lambda: client._fetch_page("BTCUSDT", "1m", size, payloads.START_MS)
+
+
+_register_parser(BinanceClient, payloads.binance_klines, (100, 1000))
+_register_parser(BybitClient, payloads.bybit_klines, (100, 1000))
+_register_parser(KuCoinClient, payloads.kucoin_klines, (100, 1500))
+
+
+class _StubExchange(ExchangeClient):
+    base_url = "https://example.invalid"
+    name = "stub"
+
+    def __init__(self, candles: CandleSeries) -> None:
+        super().__init__(transport=HttpTransport(session=_ReplaySession("[]")))
+        self.candles = candles
+
+    def _fetch_page(
+        self, symbol: str, interval: str, limit: int, start_time: int | None = None, end_time: int | None = None
+    ) -> CandleSeries:
+        return self.candles[-limit:]
+
+
+class _NullNotifier:
+    def send_message(self, text: str) -> None:
+        pass
+
+
+def _config(symbol: str, exchange: ExchangeClient) -> SignalConfig:
+    return SignalConfig(symbol=symbol, interval="1m", exchange=exchange, telegram_notifier=_NullNotifier())
+
+
+@benchmark("engine.run", (1,))
+def _engine_run(size: int) -> Callable[[], Any]:
+    engine = SignalEngine()
+    config = _config("BTCUSDT", _StubExchange(payloads.candle_series(1_000)))
+    return lambda: engine.run(config)
+
+
+@benchmark("engine.run_many", (10, 100))
+def _engine_run_many(size: int) -> Callable[[], Any]:
+    engine = SignalEngine()
+    exchange = _StubExchange(payloads.candle_series(1_000))
+    configs = [_config(f"SYM{index}USDT", exchange) for index in range(size)]
+    return lambda: engine.run_many(configs)
@@ -0,0 +1,59 @@
+"""Deterministic kline payloads in each exchange's REST response format."""
+from __future__ import annotations
+
+import json
+import random
+from typing import Iterator, List, Tuple
+
+from crypto_helper.candles import CandleSeries
+
+START_MS = 1_700_000_000_000
+STEP_MS = 60_000
+
+Row = Tuple[int, float, float, float, float, float]
+
+
+def random_walk(count: int, seed: int = 7) -> Iterator[Row]:
+    """``count`` one-minute candles of a geometric random walk, oldest first."""
+    rng = random.Random(seed)
+    price = 30_000.0
+    for index in range(count):
+        open_price = price
+        price = max(1.0, price * (1 + rng.gauss(0, 0.002)))
+        high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.001)))
+        low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.001)))
+        yield START_MS + index * STEP_MS, open_price, high, low, price, rng.uniform(1, 100)
+
+
+def candle_series(count: int, seed: int = 7) -> CandleSeries:
+    return CandleSeries.from_rows(list(random_walk(count, seed)))
+
+
+def closes(count: int, seed: int = 7) -> List[float]:
+    return list(candle_series(count, seed).close)
+
+
+def binance_klines(count: int) -> str:
+    rows = [
+        [ts, f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.5f}", ts + STEP_MS - 1, "0", 100, "0", "0", "0"]
+        for ts, o, h, l, c, v in random_walk(count)
+    ]
+    return json.dumps(rows)
+
+
+def bybit_klines(count: int) -> str:
+    rows = [
+        [str(ts), f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.5f}", f"{v * c:.2f}"]
+        for ts, o, h, l, c, v in random_walk(count)
+    ]
+    rows.reverse()
+    return json.dumps({"retCode": 0, "retMsg": "OK", "result": {"category": "linear", "list": rows}})
+
+
+def kucoin_klines(count: int) -> str:
+    rows = [
+        [str(ts // 1000), f"{o:.2f}", f"{c:.2f}", f"{h:.2f}", f"{l:.2f}", f"{v:.5f}", f"{v * c:.2f}"]
+        for ts, o, h, l, c, v in random_walk(count)
+    ]
+    rows.reverse()
+    return json.dumps({"code": "200000", "data": rows})
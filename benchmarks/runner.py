@@ -0,0 +1,140 @@
+"""Benchmark registry, timing loop, baseline comparison and command line."""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+Setup = Callable[[int], Callable[[], Any]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup
+    sizes: Tuple[int, ...]
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    number: int
+    repeat: int
+    best: float
+    median: float
+
+
+REGISTRY: List[Case] = []
+
+
+def benchmark(name: str, sizes: Sequence[int]) -> Callable[[Setup], Setup]:
+    """Register ``setup(size)``, which prepares inputs and returns the callable to time."""
+
+    def register(setup: Setup) -> Setup:
+        REGISTRY.append(Case(name, setup, tuple(sizes)))
+        return setup
+
+    return register
+
+
+def measure(function: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Tuple[int, List[float]]:
+    """Seconds per call for ``repeat`` rounds of enough calls to last ``min_time``."""
+    start = time.perf_counter()
+    function()
+    estimate = time.perf_counter() - start
+    number = max(1, int(min_time / estimate)) if estimate > 0 else 1000
+    if estimate > 1.0:
+        repeat = min(repeat, 3)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return number, timings
+
+
+def run(cases: Sequence[Case], max_size: int, repeat: int, min_time: float, log=sys.stderr) -> List[Result]:
+    results = []
+    for case in cases:
+        for size in case.sizes:
+            if size > max_size:
+                continue
+            number, timings = measure(case.setup(size), repeat, min_time)
+            result = Result(case.name, size, number, len(timings), min(timings), statistics.median(timings))
+            print(f"{case.name:<40} {size:>9}  {result.best * 1e3:12.4f} ms", file=log)
+            results.append(result)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    from crypto_helper.indicators.vectorized import BACKEND
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "indicator_backend": BACKEND,
+    }
+
+
+def compare(results: Sequence[Dict[str, Any]], baseline: Sequence[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """Every result whose best time is more than ``threshold`` slower than the baseline."""
+    previous = {(item["name"], item["size"]): item for item in baseline}
+    changes = []
+    for item in results:
+        old = previous.get((item["name"], item["size"]))
+        if old is None or not old["best"]:
+            continue
+        ratio = item["best"] / old["best"]
+        changes.append({"name": item["name"], "size": item["size"], "ratio": ratio, "regression": ratio > 1 + threshold})
+    return changes
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from . import cases  # noqa: F401  - registers the benchmarks
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run CryptoHelper benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--max-size", type=int, default=1_000_000, help="Skip inputs larger than this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown before flagging a regression")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    selected = [case for case in REGISTRY if args.filter in case.name]
+    if args.list:
+        for case in selected:
+            print(case.name, ",".join(map(str, case.sizes)))
+        return
+
+    results = [asdict(result) for result in run(selected, args.max_size, args.repeat, args.min_time)]
+    report: Dict[str, Any] = {"environment": environment(), "results": results}
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        report["comparison"] = compare(results, baseline["results"], args.threshold)
+        regressions = [item for item in report["comparison"] if item["regression"]]
+        for item in report["comparison"]:
+            flag = "REGRESSION" if item["regression"] else ""
+            print(f"{item['name']:<40} {item['size']:>9}  x{item['ratio']:.2f} {flag}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if regressions:
+        raise SystemExit(f"{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
@@ -0,0 +1,612 @@
+"""Local stand-in for the exchanges' REST APIs and a recorder of real responses.
+
+:class:`ExchangeServer` answers the kline, server-time and ticker endpoints of
+Binance, Bybit or KuCoin in their own response formats, either with
+synthetic candles or with responses captured by :class:`RecordingSession`.
+Latency, server errors and 429s can be injected, and each server enforces the
+exchange's request-weight budget and reports it in the exchange's rate-limit
+headers, so the whole pipeline (transport, rate limiters, pagination, engine)
+can be load-tested without network access::
+
+    python -m benchmarks.server serve --exchange binance --port 8000 --latency 0.05
+    python -m benchmarks.server record binance BTCUSDT,ETHUSDT 1h -o binance.jsonl.gz
+    python -m benchmarks.server load --exchange bybit --symbols 200 --throttle-rate 0.02
+
+Point a client at a server with ``BinanceClient(base_url=server.url)``, or set
+``CRYPTO_HELPER_BINANCE_URL`` (and so on) for ``main.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import math
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from crypto_helper.candles import candle_open, interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT")
+# Rate-limit headers kept in recordings and replayed
+RATE_LIMIT_HEADERS = (
+    "Retry-After",
+    "X-MBX-USED-WEIGHT-1M",
+    "X-Bapi-Limit-Status",
+    "X-Bapi-Limit-Reset-Timestamp",
+    "gw-ratelimit-remaining",
+    "gw-ratelimit-reset",
+)
+
+MINUTE_MS = 60_000
+Row = Tuple[int, float, float, float, float, float]
+_MASK = (1 << 64) - 1
+# Octaves of value noise building the price path, from one minute to ~45 days
+_OCTAVES = 16
+_VOLATILITY = 0.0007
+
+
+def _noise(seed: int, index: int) -> float:
+    """Deterministic value in [-1, 1) for ``index`` (splitmix64)."""
+    z = (seed + index * 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return (z ^ (z >> 31)) / 2**63 - 1.0
+
+
+def _symbol_seed(symbol: str) -> int:
+    # BTC-USDT on KuCoin follows the same path as BTCUSDT elsewhere
+    return zlib.crc32(symbol.replace("-", "").upper().encode())
+
+
+def synthetic_price(symbol: str, timestamp_ms: int) -> float:
+    """Price of ``symbol`` at ``timestamp_ms`` on a deterministic random-walk-like path.
+
+    The log price is a sum of interpolated noise octaves whose amplitude grows
+    with the square root of their length, like a random walk, so any time can
+    be evaluated without generating the path up to it.
+    """
+    seed = _symbol_seed(symbol)
+    position = timestamp_ms / MINUTE_MS
+    log_price = 0.0
+    for octave in range(_OCTAVES):
+        scaled = position / (1 << octave)
+        cell = math.floor(scaled)
+        fraction = scaled - cell
+        octave_seed = seed + octave * 0x632BE59BD9B4E019
+        left, right = _noise(octave_seed, cell), _noise(octave_seed, cell + 1)
+        log_price += _VOLATILITY * math.sqrt(1 << octave) * (left + (right - left) * fraction)
+    return 10 ** (seed % 5) * math.exp(log_price)
+
+
+@lru_cache(maxsize=256)
+def synthetic_candles(symbol: str, step_ms: int, first_ms: int, count: int) -> Tuple[Row, ...]:
+    """``count`` candles of ``step_ms`` opening at ``first_ms``, oldest first."""
+    seed = _symbol_seed(symbol)
+    rows = []
+    close = synthetic_price(symbol, first_ms)
+    for index in range(count):
+        timestamp = first_ms + index * step_ms
+        open_, close = close, synthetic_price(symbol, timestamp + step_ms)
+        wick = 1 + abs(_noise(seed, timestamp // MINUTE_MS)) * 0.002
+        volume = (1.5 + _noise(seed + 1, timestamp // MINUTE_MS)) * step_ms / MINUTE_MS
+        rows.append((timestamp, open_, max(open_, close) * wick, min(open_, close) / wick, close, volume))
+    return tuple(rows)
+
+
+def candle_window(
+    step_ms: int, limit: int, now_ms: int, start_ms: int | None = None, end_ms: int | None = None
+) -> Tuple[int, int]:
+    """First open time and count of the candles a kline request asks for.
+
+    Like the exchanges, candles open at or after ``start_ms`` and at or before
+    ``end_ms``; without ``start_ms`` the newest ``limit`` are returned, and no
+    candle opens after the one in progress at ``now_ms``.
+    """
+    last = candle_open(now_ms, step_ms)
+    if end_ms is not None:
+        last = min(last, candle_open(end_ms, step_ms))
+    if start_ms is None:
+        first = last - (limit - 1) * step_ms
+    else:
+        first = candle_open(start_ms, step_ms)
+        if first < start_ms:
+            first += step_ms
+    count = min(limit, (last - first) // step_ms + 1)
+    return first, max(count, 0)
+
+
+def _number(value: float) -> str:
+    return f"{value:.8g}"
+
+
+@dataclass
+class Faults:
+    """Failures injected by an :class:`ExchangeServer`.
+
+    Every response is delayed by ``latency`` plus up to ``jitter`` seconds;
+    ``error_rate`` and ``throttle_rate`` are the probabilities of answering
+    with HTTP 500 and HTTP 429 (with ``Retry-After: retry_after``).
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class Exchange:
+    """Endpoints and rate-limit budget of one emulated exchange."""
+
+    name: str
+    klines: str
+    time: str
+    tickers: str
+    weight_limit: float
+    window: float
+    max_limit: int
+
+
+EXCHANGES: Dict[str, Exchange] = {
+    "binance": Exchange("binance", "/api/v3/klines", "/api/v3/time", "/api/v3/ticker/24hr", 6000, 60, 1000),
+    "bybit": Exchange("bybit", "/v5/market/kline", "/v5/market/time", "/v5/market/tickers", 600, 5, 1000),
+    "kucoin": Exchange(
+        "kucoin", "/api/v1/market/candles", "/api/v1/timestamp", "/api/v1/market/allTickers", 2000, 30, 1500
+    ),
+}
+
+
+class Recording:
+    """Responses captured by :class:`RecordingSession`, looked up by path and parameters.
+
+    A request without an exact match gets the last response recorded for its
+    path, so a recording keeps serving load tests that ask for other times.
+    """
+
+    def __init__(self, entries: Iterable[Mapping[str, Any]]) -> None:
+        self.exact: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Mapping[str, Any]] = {}
+        self.latest: Dict[str, Mapping[str, Any]] = {}
+        for entry in entries:
+            self.exact[(entry["path"], _params_key(entry["params"]))] = entry
+            self.latest[entry["path"]] = entry
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            return cls(json.loads(line) for line in handle if line.strip())
+
+    def find(self, path: str, params: Mapping[str, str]) -> Optional[Mapping[str, Any]]:
+        return self.exact.get((path, _params_key(params))) or self.latest.get(path)
+
+
+def _params_key(params: Mapping[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((str(key), str(value)) for key, value in params.items()))
+
+
+class RecordingSession:
+    """Session wrapper saving every response of ``session`` for :class:`Recording`."""
+
+    def __init__(self, session: Any) -> None:
+        self.session = session
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # headers, mount() and the like belong to the wrapped session
+        return getattr(self.session, name)
+
+    def get(self, url: str, params: Mapping[str, str] | None = None, timeout: float | None = None) -> Any:
+        response = self.session.get(url, params=params, timeout=timeout)
+        headers = getattr(response, "headers", None) or {}
+        entry = {
+            "path": urlsplit(url).path,
+            "params": dict(params or {}),
+            "status": response.status_code,
+            "headers": {name: headers[name] for name in RATE_LIMIT_HEADERS if name in headers},
+            "body": response.text,
+        }
+        with self._lock:
+            self.entries.append(entry)
+        return response
+
+    def save(self, path: str) -> int:
+        """Write the recorded responses as gzip-compressed JSON lines; returns their number."""
+        with self._lock:
+            entries = list(self.entries)
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            for entry in entries:
+                handle.write(json.dumps(entry) + "\n")
+        return len(entries)
+
+
+class ExchangeServer:
+    """Threaded HTTP server emulating one exchange's public REST API.
+
+    Use as a context manager, or call :meth:`start` and :meth:`close`.
+    ``stats`` counts requests by status code, plus ``bytes`` sent.
+    """
+
+    def __init__(
+        self,
+        exchange: str = "binance",
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        symbols: Iterable[str] = DEFAULT_SYMBOLS,
+        recording: Recording | None = None,
+        faults: Faults | None = None,
+        weight_limit: float | None = None,
+        window: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.exchange = EXCHANGES[exchange]
+        self.symbols = tuple(symbols)
+        self.recording = recording
+        self.faults = faults or Faults()
+        self.weight_limit = weight_limit if weight_limit is not None else self.exchange.weight_limit
+        self.window = window if window is not None else self.exchange.window
+        self.clock = clock
+        self.stats: Counter = Counter()
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._used = 0.0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ExchangeServer":
+        # A short poll interval keeps close() quick
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, args=(0.05,), name=f"{self.exchange.name}-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ExchangeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def respond(self, path: str, params: Mapping[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body for a GET of ``path``; used by the request handler."""
+        exchange = self.exchange
+        with self._lock:
+            roll = self._random.random()
+            delay = self.faults.latency + self._random.random() * self.faults.jitter
+            now = self.clock()
+            if now - self._window_start >= self.window:
+                self._window_start, self._used = now - now % self.window, 0.0
+            weight = self._weight(path, params)
+            self._used += weight
+            used, reset = self._used, self._window_start + self.window
+        if delay:
+            time.sleep(delay)
+
+        headers = self._rate_limit_headers(used, reset, now)
+        if used > self.weight_limit:
+            headers["Retry-After"] = str(max(math.ceil(reset - now), 1))
+            return 429, headers, b'{"msg": "Too many requests"}'
+        if roll < self.faults.throttle_rate:
+            headers["Retry-After"] = _number(self.faults.retry_after)
+            return 429, headers, b'{"msg": "Too many requests"}'
+        if roll < self.faults.throttle_rate + self.faults.error_rate:
+            return 500, headers, b'{"msg": "Internal error"}'
+
+        if self.recording is not None:
+            entry = self.recording.find(path, params)
+            if entry is None:
+                return 404, headers, b'{"msg": "Not recorded"}'
+            return entry["status"], {**headers, **entry["headers"]}, entry["body"].encode()
+
+        try:
+            if path == exchange.klines:
+                payload = self._klines(params, int(now * 1000))
+            elif path == exchange.time:
+                payload = self._time(int(now * 1000))
+            elif path == exchange.tickers:
+                payload = self._tickers(int(now * 1000))
+            else:
+                return 404, headers, b'{"msg": "Unknown endpoint"}'
+        except (KeyError, ValueError) as error:
+            return 400, headers, json.dumps({"msg": f"Bad request: {error}"}).encode()
+        return 200, headers, json.dumps(payload, separators=(",", ":")).encode()
+
+    def _weight(self, path: str, params: Mapping[str, str]) -> float:
+        if self.exchange.name == "binance":
+            if path == self.exchange.tickers:
+                return 80
+            return 2 if path == self.exchange.klines else 1
+        if self.exchange.name == "kucoin" and path == self.exchange.tickers:
+            return 15
+        return 1
+
+    def _rate_limit_headers(self, used: float, reset: float, now: float) -> Dict[str, str]:
+        remaining = max(self.weight_limit - used, 0)
+        name = self.exchange.name
+        if name == "binance":
+            return {"X-MBX-USED-WEIGHT-1M": _number(used)}
+        if name == "bybit":
+            return {"X-Bapi-Limit-Status": _number(remaining), "X-Bapi-Limit-Reset-Timestamp": str(int(reset * 1000))}
+        return {"gw-ratelimit-remaining": _number(remaining), "gw-ratelimit-reset": str(int((reset - now) * 1000))}
+
+    def _klines(self, params: Mapping[str, str], now_ms: int) -> Any:
+        name = self.exchange.name
+        if name == "binance":
+            start, end = params.get("startTime"), params.get("endTime")
+            step = interval_to_ms(params["interval"])
+            limit = min(int(params.get("limit", 500)), self.exchange.max_limit)
+        elif name == "bybit":
+            start, end = params.get("start"), params.get("end")
+            step = interval_to_ms(params["interval"])
+            limit = min(int(params.get("limit", 200)), self.exchange.max_limit)
+        else:
+            start = str(int(params["startAt"]) * 1000) if "startAt" in params else None
+            end = str(int(params["endAt"]) * 1000) if "endAt" in params else None
+            step = interval_to_ms(params["type"])
+            limit = self.exchange.max_limit
+        first, count = candle_window(
+            step, limit, now_ms, int(start) if start is not None else None, int(end) if end is not None else None
+        )
+        rows = synthetic_candles(params["symbol"], step, first, count)
+        if name == "binance":
+            return [
+                [ts, _number(o), _number(h), _number(l), _number(c), _number(v), ts + step - 1, _number(v * c)]
+                + [100, "0", "0", "0"]
+                for ts, o, h, l, c, v in rows
+            ]
+        if name == "bybit":
+            listed = [
+                [str(ts), _number(o), _number(h), _number(l), _number(c), _number(v), _number(v * c)]
+                for ts, o, h, l, c, v in reversed(rows)
+            ]
+            result = {"category": "linear", "symbol": params["symbol"], "list": listed}
+            return {"retCode": 0, "retMsg": "OK", "result": result}
+        listed = [
+            [str(ts // 1000), _number(o), _number(c), _number(h), _number(l), _number(v), _number(v * c)]
+            for ts, o, h, l, c, v in reversed(rows)
+        ]
+        return {"code": "200000", "data": listed}
+
+    def _time(self, now_ms: int) -> Any:
+        name = self.exchange.name
+        if name == "binance":
+            return {"serverTime": now_ms}
+        if name == "bybit":
+            return {"retCode": 0, "retMsg": "OK", "result": {}, "time": now_ms}
+        return {"code": "200000", "data": now_ms}
+
+    def _tickers(self, now_ms: int) -> Any:
+        rows = []
+        for symbol in self.symbols:
+            seed = _symbol_seed(symbol)
+            last = synthetic_price(symbol, now_ms)
+            change = last / synthetic_price(symbol, now_ms - 86_400_000) - 1
+            volume = 1_000_000 * (1.5 + _noise(seed, 0)) * 10 ** (seed % 3)
+            half_spread = last * (1 + _noise(seed, 1)) * 0.0005
+            rows.append((symbol, last, change, volume, last - half_spread, last + half_spread))
+        name = self.exchange.name
+        if name == "binance":
+            return [
+                {
+                    "symbol": symbol,
+                    "lastPrice": _number(last),
+                    "priceChangePercent": _number(change * 100),
+                    "quoteVolume": _number(volume),
+                    "bidPrice": _number(bid),
+                    "askPrice": _number(ask),
+                }
+                for symbol, last, change, volume, bid, ask in rows
+            ]
+        if name == "bybit":
+            listed = [
+                {
+                    "symbol": symbol,
+                    "lastPrice": _number(last),
+                    "price24hPcnt": _number(change),
+                    "turnover24h": _number(volume),
+                    "bid1Price": _number(bid),
+                    "ask1Price": _number(ask),
+                }
+                for symbol, last, change, volume, bid, ask in rows
+            ]
+            return {"retCode": 0, "retMsg": "OK", "result": {"category": "linear", "list": listed}}
+        tickers = [
+            {
+                "symbol": symbol,
+                "last": _number(last),
+                "changeRate": _number(change),
+                "volValue": _number(volume),
+                "buy": _number(bid),
+                "sell": _number(ask),
+            }
+            for symbol, last, change, volume, bid, ask in rows
+        ]
+        return {"code": "200000", "data": {"time": now_ms, "ticker": tickers}}
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real APIs; the transport pools connections
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                status, headers, body = server.respond(parts.path, dict(parse_qsl(parts.query)))
+                if "gzip" in self.headers.get("Accept-Encoding", "") and len(body) > 1024:
+                    body = gzip.compress(body, compresslevel=1)
+                    headers["Content-Encoding"] = "gzip"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.stats[status] += 1
+                    server.stats["bytes"] += len(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("%s %s", self.address_string(), format % args)
+
+        return Handler
+
+
+def _client(exchange: str, **kwargs: Any) -> Any:
+    from crypto_helper import registry
+
+    return registry.exchanges.get(exchange)(**kwargs)
+
+
+def record(exchange: str, symbols: Iterable[str], interval: str, limit: int, path: str, tickers: bool = False) -> int:
+    """Download real responses through a :class:`RecordingSession` and save them to ``path``."""
+    from crypto_helper.transport import HttpTransport
+
+    recorder = RecordingSession(HttpTransport().session)
+    client = _client(exchange, transport=HttpTransport(session=recorder))
+    for symbol in symbols:
+        client.fetch_ohlc(client.native_symbol(symbol), client.native_interval(interval), limit=limit)
+    if tickers:
+        client.fetch_tickers()
+    return recorder.save(path)
+
+
+class _NullNotifier:
+    def send_message(self, text: str) -> None:
+        pass
+
+
+def load_test(
+    server: ExchangeServer, symbols: int, interval: str, workers: int, per_exchange: int | None = None
+) -> Dict[str, Any]:
+    """Scan ``symbols`` synthetic markets against ``server`` and report throughput."""
+    from crypto_helper.engine import SignalConfig, SignalEngine
+    from crypto_helper.transport import HttpTransport
+
+    client = _client(server.exchange.name, transport=HttpTransport(pool_size=workers), base_url=server.url)
+    configs = [
+        SignalConfig(
+            symbol=client.native_symbol(f"SYM{index}USDT"),
+            interval=client.native_interval(interval),
+            exchange=client,
+            telegram_notifier=_NullNotifier(),
+        )
+        for index in range(symbols)
+    ]
+    started = time.perf_counter()
+    results = SignalEngine().run_many(configs, max_workers=workers, per_exchange_limit=per_exchange)
+    elapsed = time.perf_counter() - started
+    statuses = {str(status): count for status, count in server.stats.items() if status != "bytes"}
+    requests = sum(statuses.values())
+    return {
+        "exchange": server.exchange.name,
+        "symbols": symbols,
+        "failed": sum(1 for result in results if not result.ok),
+        "seconds": round(elapsed, 3),
+        "symbols_per_second": round(symbols / elapsed, 1),
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 1),
+        "statuses": dict(sorted(statuses.items())),
+        "bytes": server.stats["bytes"],
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.server", description="Stand-in exchange server")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_server_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--exchange", choices=sorted(EXCHANGES), default="binance")
+        command.add_argument("--replay", help="Serve responses from this recording instead of synthetic candles")
+        command.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+        command.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, seconds")
+        command.add_argument("--error-rate", type=float, default=0.0, help="Share of HTTP 500 responses")
+        command.add_argument("--throttle-rate", type=float, default=0.0, help="Share of HTTP 429 responses")
+        command.add_argument("--weight-limit", type=float, default=None, help="Request weight per window")
+        command.add_argument("--window", type=float, default=None, help="Rate-limit window, seconds")
+        command.add_argument("--seed", type=int, default=0)
+
+    serve = commands.add_parser("serve", help="Run a stand-in server until interrupted")
+    add_server_options(serve)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS), help="Markets listed by the ticker endpoint")
+
+    load = commands.add_parser("load", help="Scan synthetic markets against an in-process server")
+    add_server_options(load)
+    load.add_argument("--symbols", type=int, default=100)
+    load.add_argument("--interval", default="1h")
+    load.add_argument("--workers", type=int, default=16)
+    load.add_argument("--per-exchange", type=int, default=None)
+
+    recorder = commands.add_parser("record", help="Record real exchange responses to a compressed file")
+    recorder.add_argument("exchange", choices=sorted(EXCHANGES))
+    recorder.add_argument("symbols", help="Comma-separated pairs")
+    recorder.add_argument("interval")
+    recorder.add_argument("--limit", type=int, default=500)
+    recorder.add_argument("--tickers", action="store_true", help="Also record the bulk ticker endpoint")
+    recorder.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    # A load test would otherwise log every notification
+    logging.basicConfig(level=logging.WARNING if args.command == "load" else logging.INFO)
+    if args.command == "record":
+        count = record(args.exchange, args.symbols.split(","), args.interval, args.limit, args.output, args.tickers)
+        print(f"Recorded {count} responses to {args.output}", file=sys.stderr)
+        return
+
+    options = dict(
+        recording=Recording.load(args.replay) if args.replay else None,
+        faults=Faults(args.latency, args.jitter, args.error_rate, args.throttle_rate, seed=args.seed),
+        weight_limit=args.weight_limit,
+        window=args.window,
+    )
+    if args.command == "serve":
+        server = ExchangeServer(
+            args.exchange, host=args.host, port=args.port, symbols=args.symbols.split(","), **options
+        )
+        print(f"Serving {args.exchange} at {server.url}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    with ExchangeServer(args.exchange, **options) as server:
+        report = load_test(server, args.symbols, args.interval, args.workers, args.per_exchange)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
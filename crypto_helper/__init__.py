@@ -1,11 +1,25 @@
-"""CryptoHelper package exports."""
-from .engine import SignalConfig, SignalEngine
-from .exchanges.binance import BinanceClient
-from .exchanges.bybit import BybitClient
-from .exchanges.kucoin import KuCoinClient
-from .notifications.telegram import TelegramNotifier
+"""CryptoHelper package exports.
+
+Exports are resolved on first access so that ``import crypto_helper`` stays
+cheap; see :mod:`crypto_helper.registry`.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "ScanResult": "crypto_helper.engine",
+    "SignalConfig": "crypto_helper.engine",
+    "SignalEngine": "crypto_helper.engine",
+    "BinanceClient": "crypto_helper.exchanges.binance",
+    "BybitClient": "crypto_helper.exchanges.bybit",
+    "KuCoinClient": "crypto_helper.exchanges.kucoin",
+    "TelegramNotifier": "crypto_helper.notifications.telegram",
+}
 
 __all__ = [
+    "ScanResult",
     "SignalConfig",
     "SignalEngine",
     "BinanceClient",
@@ -13,3 +27,16 @@ __all__ = [
     "KuCoinClient",
     "TelegramNotifier",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
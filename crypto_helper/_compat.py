@@ -1,11 +1,50 @@
-"""Compatibility helpers for optional third-party dependencies."""
+"""Compatibility helpers for optional third-party dependencies.
+
+``requests`` and ``numpy`` are heavy to import, so they are exposed as lazy
+module proxies that import the real module on first attribute access. This
+keeps ``import crypto_helper`` fast for short-lived CLI invocations.
+"""
 from __future__ import annotations
 
-try:  # pragma: no cover - executed depending on environment
-    import requests as _requests  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover - fallback for offline tests
-    from . import _requests_stub as _requests
+import importlib
+import importlib.util
+import types
+from typing import Any, Callable
+
+
+class _LazyModule(types.ModuleType):
+    """Module stand-in importing ``name`` (or ``fallback()``) when first used."""
+
+    def __init__(self, name: str, fallback: Callable[[], types.ModuleType] | None = None) -> None:
+        super().__init__(name)
+        self.__fallback = fallback
+        self.__module: types.ModuleType | None = None
+
+    def _load(self) -> types.ModuleType:
+        if self.__module is None:
+            try:
+                self.__module = importlib.import_module(self.__name__)
+            except ModuleNotFoundError:
+                if self.__fallback is None:
+                    raise
+                self.__module = self.__fallback()
+        return self.__module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> list:
+        return dir(self._load())
+
+
+def _requests_stub() -> types.ModuleType:  # pragma: no cover - fallback for offline tests
+    from . import _requests_stub as stub
+
+    return stub
+
 
-requests = _requests
+requests: Any = _LazyModule("requests", fallback=_requests_stub)
+# Whether NumPy is installed is known without importing it.
+numpy: Any = _LazyModule("numpy") if importlib.util.find_spec("numpy") is not None else None
 
-__all__ = ["requests"]
+__all__ = ["numpy", "requests"]
@@ -0,0 +1,415 @@
+"""HTTP API serving current signals and indicator values as JSON.
+
+``GET /signals/<exchange>/<symbol>/<interval>`` returns the signals and the
+latest indicator values computed on closed candles; query parameters
+(``ema_fast``, ``ema_slow``, ``rsi_period``, ``bollinger_period``,
+``bollinger_std``, ``filters``) override the defaults of
+:class:`~crypto_helper.engine.SignalConfig`. Periods are limited to
+:data:`MAX_PERIOD`, as the history fetched grows with them.
+
+Results only change when a candle closes, so each response is cached until
+the close of the candle in progress (by the exchange clock) and concurrent
+requests for the same key share one computation. Clients polling every
+second cost one download and indicator computation per candle, not per
+request. Run with::
+
+    python -m crypto_helper.api --port 8080 --cache candles.sqlite3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .candles import candle_open
+from .engine import MACD_FAST_PERIOD, MACD_SIGNAL_PERIOD, MACD_SLOW_PERIOD, SignalConfig, SignalEngine
+from .exchanges.base import ExchangeClient
+from .filters import FilterError, FilterSet, parse_filters
+from .multitenant import IndicatorCache, MarketIndicators
+from .scheduler import ClockSync
+
+logger = logging.getLogger(__name__)
+
+MAX_PERIOD = 1000
+MAX_STD_DEV = 10.0
+
+
+def _period(value: str) -> int:
+    period = int(value)
+    if not 1 <= period <= MAX_PERIOD:
+        raise ValueError(f"must be between 1 and {MAX_PERIOD}")
+    return period
+
+
+def _std_dev(value: str) -> float:
+    std_dev = float(value)
+    # NaN fails the comparison too
+    if not 0 < std_dev <= MAX_STD_DEV:
+        raise ValueError(f"must be positive and at most {MAX_STD_DEV:g}")
+    return std_dev
+
+
+# Query parameters overriding SignalConfig fields, with their validating converters
+PARAMETERS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "ema_fast": ("ema_fast", _period),
+    "ema_slow": ("ema_slow", _period),
+    "rsi_period": ("rsi_period", _period),
+    "bollinger_period": ("bollinger_period", _period),
+    "bollinger_std": ("bollinger_std_dev", _std_dev),
+}
+
+MAX_REQUEST_LINE = 8192
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+}
+
+
+class APIError(Exception):
+    """Error answered with ``status`` and a JSON body."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """Values valid until an expiry time, with concurrent misses coalesced.
+
+    :meth:`get` awaits ``compute()``, which returns ``(value, expires_at)``;
+    callers asking for a key while it is being computed wait for the same
+    result instead of starting their own. Failures are not cached.
+    """
+
+    def __init__(self, maxsize: int = 4096, clock: Callable[[], float] = time.time) -> None:
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[Hashable, Tuple[Any, float]] = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Tuple[Any, float]]]) -> Tuple[Any, float]:
+        """``(value, expires_at)`` for ``key``, computing it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > self.clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        pending = self._pending.get(key)
+        if pending is None:
+            self.misses += 1
+            pending = self._pending[key] = asyncio.ensure_future(compute())
+            pending.add_done_callback(lambda done: self._store(key, done))
+        else:
+            self.coalesced += 1
+        # A client hanging up must not cancel the computation the others wait for
+        return await asyncio.shield(pending)
+
+    def _store(self, key: Hashable, done: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        if done.cancelled() or done.exception() is not None:
+            return
+        self._entries[key] = done.result()
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Silent:
+    """The API reports signals in responses and never sends notifications."""
+
+    def send_message(self, text: str) -> None:
+        pass
+
+
+def _last(values: Any) -> Optional[float]:
+    return float(values[-1]) if len(values) else None
+
+
+class SignalsAPI:
+    """asyncio HTTP server answering signal requests from a :class:`ResponseCache`.
+
+    ``exchanges`` maps names to clients, or is a callable creating the client
+    for a name (raising ``KeyError`` for unknown ones). A response computed
+    right after a candle closes but before the exchange has published the
+    new candle is kept for ``retry`` seconds only.
+    """
+
+    def __init__(
+        self,
+        exchanges: Mapping[str, ExchangeClient] | Callable[[str], ExchangeClient],
+        engine: SignalEngine | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        delay: float = 1.0,
+        retry: float = 2.0,
+        sync_refresh: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self._exchanges = exchanges
+        self._clients: Dict[str, ExchangeClient] = {}
+        self._syncs: Dict[str, ClockSync] = {}
+        self.engine = engine or SignalEngine()
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.retry = retry
+        self.sync_refresh = sync_refresh
+        self.clock = clock
+        self.cache = cache if cache is not None else ResponseCache(clock=clock)
+        self.indicators = IndicatorCache()
+        self._server: asyncio.AbstractServer | None = None
+
+    def client(self, name: str) -> ExchangeClient:
+        client = self._clients.get(name)
+        if client is None:
+            try:
+                if callable(self._exchanges):
+                    client = self._exchanges(name)
+                else:
+                    client = self._exchanges[name]
+            except KeyError:
+                raise APIError(404, f"Unknown exchange {name!r}") from None
+            self._clients[name] = client
+            self._syncs[name] = ClockSync(client, self.sync_refresh, self.clock)
+        return client
+
+    async def signals(self, exchange: str, symbol: str, interval: str, query: Mapping[str, str]) -> Tuple[bytes, float]:
+        """JSON body and expiry time for one request; served from the cache while valid."""
+        client = self.client(exchange)
+        try:
+            config = SignalConfig(
+                symbol=client.native_symbol(symbol),
+                interval=client.native_interval(interval),
+                exchange=client,
+                telegram_notifier=_Silent(),
+            )
+        except ValueError as error:
+            raise APIError(400, str(error)) from None
+        overrides = {}
+        for name, (field, convert) in PARAMETERS.items():
+            if name in query:
+                try:
+                    overrides[field] = convert(query[name])
+                except ValueError as error:
+                    raise APIError(400, f"Invalid {name}: {error}") from None
+        filters = tuple(name for name in query.get("filters", "").split(",") if name)
+        filter_set = self.engine.filter_set
+        unknown = [name for name in filters if filter_set is None or name not in filter_set.expressions]
+        if unknown:
+            raise APIError(400, f"Unknown filters: {', '.join(unknown)}")
+        config = replace(config, filters=filters, **overrides)
+        key = (exchange, config.symbol, config.interval, tuple(sorted(overrides.items())), filters)
+        return await self.cache.get(key, lambda: asyncio.to_thread(self.compute, exchange, config))
+
+    def compute(self, exchange: str, config: SignalConfig) -> Tuple[bytes, float]:
+        """Fetch candles and evaluate ``config``; blocking, runs in a worker thread."""
+        metrics = self.engine.metrics
+        metrics.inc("api_computations_total", exchange=exchange)
+        client = config.exchange
+        step = client.interval_ms(config.interval)
+        now_ms = self._syncs[exchange].now_ms()
+        current = candle_open(now_ms, step)
+        try:
+            # One extra candle replaces the one still in progress, which is dropped
+            candles = self.engine.fetch_candles(config, self.engine._required_candles(config) + 1)
+        except Exception as error:
+            raise APIError(502, f"Failed to fetch candles: {error}") from error
+        if candles and candles.timestamps[-1] >= current:
+            candles = candles[:-1]
+        if candles and candles.timestamps[-1] + step >= current:
+            expires_ms = current + step
+        else:
+            # The exchange has not published the last closed candle yet
+            expires_ms = now_ms + int(self.retry * 1000)
+        source = MarketIndicators(self.indicators, (exchange, config.symbol, config.interval), candles)
+        signals = self.engine.generate_signals(config, candles, candles.close, source)
+        body = {
+            "exchange": exchange,
+            "symbol": config.symbol,
+            "interval": config.interval,
+            "candle_open": candles.timestamps[-1] if candles else None,
+            "expires_at": expires_ms,
+            "close": _last(candles.close),
+            "indicators": self._indicator_values(config, candles, source),
+            "signals": signals,
+        }
+        expires_at = (expires_ms - self._syncs[exchange].offset_ms) / 1000 + self.delay
+        return json.dumps(body, ensure_ascii=False).encode("utf-8"), expires_at
+
+    @staticmethod
+    def _indicator_values(config: SignalConfig, candles: Any, source: MarketIndicators) -> Dict[str, Any]:
+        # Same cache keys as the signal evaluation, so nothing is computed twice
+        closes = candles.close
+        values: Dict[str, Any] = {}
+        computations = {
+            "ema_fast": lambda: _last(source.ema(closes, config.ema_fast)),
+            "ema_slow": lambda: _last(source.ema(closes, config.ema_slow)),
+            "rsi": lambda: _last(source.rsi(closes, config.rsi_period)),
+            "macd": lambda: dict(
+                zip(
+                    ("macd", "signal", "histogram"),
+                    map(_last, source.macd(closes, MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD)),
+                )
+            ),
+            "bollinger": lambda: dict(
+                zip(
+                    ("upper", "middle", "lower"),
+                    map(_last, source.bollinger_bands(closes, config.bollinger_period, config.bollinger_std_dev)),
+                )
+            ),
+        }
+        for name, compute in computations.items():
+            try:
+                values[name] = compute()
+            except ValueError:
+                values[name] = None
+        return values
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("API сигналов слушает http://%s:%d", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                status, body, max_age = await self._respond(method, target)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = [
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(body)}",
+                    f"Cache-Control: public, max-age={max_age}" if max_age else "Cache-Control: no-store",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str) -> Tuple[int, bytes, int]:
+        metrics = self.engine.metrics
+        try:
+            if method != "GET":
+                raise APIError(405, "Only GET is supported")
+            if len(target) > MAX_REQUEST_LINE:
+                raise APIError(400, "Request line too long")
+            parts = urlsplit(target)
+            segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+            if segments == ["health"]:
+                return 200, b'{"status": "ok"}', 0
+            if len(segments) != 4 or segments[0] != "signals":
+                raise APIError(404, "Use /signals/<exchange>/<symbol>/<interval>")
+            _, exchange, symbol, interval = segments
+            body, expires_at = await self.signals(exchange.lower(), symbol, interval, dict(parse_qsl(parts.query)))
+        except APIError as error:
+            metrics.inc("api_requests_total", status=str(error.status))
+            return error.status, json.dumps({"error": str(error)}).encode("utf-8"), 0
+        except Exception:
+            logger.exception("Ошибка обработки запроса %s", target)
+            metrics.inc("api_requests_total", status="500")
+            return 500, b'{"error": "Internal error"}', 0
+        metrics.inc("api_requests_total", status="200")
+        return 200, body, max(int(expires_at - self.clock()), 0)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from . import registry
+
+    parser = argparse.ArgumentParser(description="Serve CryptoHelper signals over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache", help="Path to an SQLite candle cache shared with other runs")
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds after a candle closes before recomputing")
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help=(
+            "Filter 'name: expression' that requests may select with ?filters=name; may be repeated or given "
+            "as @path to a file with one filter per line"
+        ),
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    store = None
+    if args.cache:
+        from .exchanges.cache import CachedExchangeClient, CandleStore
+
+        store = CandleStore(args.cache)
+
+    def create(name: str) -> ExchangeClient:
+        if name not in registry.exchanges:
+            raise KeyError(name)
+        # Same override as main.py, e.g. for a local stand-in server
+        base_url = os.getenv(f"CRYPTO_HELPER_{name.upper()}_URL")
+        client_cls = registry.exchanges.get(name)
+        client = client_cls(base_url=base_url) if base_url else client_cls()
+        return CachedExchangeClient(client, store) if store is not None else client
+
+    filter_set = None
+    filters = parse_filters(args.filter)
+    if filters:
+        try:
+            filter_set = FilterSet(filters)
+        except FilterError as error:
+            raise SystemExit(str(error))
+    api = SignalsAPI(create, SignalEngine(filter_set=filter_set), host=args.host, port=args.port, delay=args.delay)
+    try:
+        asyncio.run(api.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("API сигналов остановлен")
+
+
+__all__ = ["APIError", "ResponseCache", "SignalsAPI"]
+
+
+if __name__ == "__main__":
+    main()
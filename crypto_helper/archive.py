@@ -0,0 +1,271 @@
+"""Memory-mapped archive of long candle histories for backtests and research.
+
+Each ``(exchange, symbol, interval)`` series is a directory of fixed-width
+column files: ``timestamps.i64`` with candle open times in milliseconds and
+``open``/``high``/``low``/``close``/``volume`` ``.f64`` files, all in native
+byte order. Updates only append, so the files never need rewriting.
+
+:meth:`CandleArchive.read` maps the files and returns a
+:class:`~crypto_helper.candles.CandleSeries` whose columns are read-only
+``memoryview`` objects over the mapped pages. Opening a multi-year 1m series
+therefore takes milliseconds and copies nothing into memory; the operating
+system pages data in as indicators read it. Time ranges are found with a
+binary search over the timestamp column (a direct computation when the
+series has no gaps) and sliced without copying::
+
+    python -m crypto_helper.archive download binance BTCUSDT,ETHUSDT 1m --since 2019-01-01 --root history
+    python -m crypto_helper.archive info --root history
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import mmap
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .candles import CandleSeries, candle_open, interval_to_ms
+from .exchanges.base import ExchangeClient
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+COLUMNS = (("timestamps", "q"), ("open", "d"), ("high", "d"), ("low", "d"), ("close", "d"), ("volume", "d"))
+SUFFIXES = {"q": ".i64", "d": ".f64"}
+ITEM_SIZE = 8
+
+SeriesKey = Tuple[str, str, str]
+
+
+class ArchiveError(ValueError):
+    """Raised for archives written in an incompatible format or out of order."""
+
+
+class _Mapping:
+    """Read-only maps of one series' column files."""
+
+    def __init__(self, directory: Path, length: int) -> None:
+        self.length = length
+        self.maps: List[mmap.mmap] = []
+        self.columns: List[memoryview] = []
+        for name, typecode in COLUMNS:
+            if not length:
+                self.columns.append(memoryview(array(typecode)))
+                continue
+            with open(directory / (name + SUFFIXES[typecode]), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), length * ITEM_SIZE, access=mmap.ACCESS_READ)
+            self.maps.append(mapped)
+            self.columns.append(memoryview(mapped).cast(typecode))
+
+
+class CandleArchive:
+    """Directory of append-only, memory-mapped candle series.
+
+    ``read`` is safe to call from several threads; appending to a series
+    while another process reads it is safe too, as readers only map the
+    candles that were complete when they looked.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._mappings: Dict[SeriesKey, _Mapping] = {}
+        self._lock = threading.Lock()
+
+    def path(self, exchange: str, symbol: str, interval: str) -> Path:
+        return self.root / exchange.lower() / symbol.upper() / interval
+
+    def series(self) -> Iterator[SeriesKey]:
+        """Every stored ``(exchange, symbol, interval)``."""
+        for meta in sorted(self.root.glob("*/*/*/meta.json")):
+            interval = meta.parent
+            yield interval.parent.parent.name, interval.parent.name, interval.name
+
+    def _meta(self, directory: Path) -> Optional[dict]:
+        try:
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if meta.get("version") != FORMAT_VERSION or meta.get("byteorder") != sys.byteorder:
+            raise ArchiveError(f"{directory} was written in an incompatible format: {meta}")
+        return meta
+
+    @staticmethod
+    def _length(directory: Path) -> int:
+        # A crash while appending may leave some columns longer than others;
+        # only candles present in every column count.
+        sizes = []
+        for name, typecode in COLUMNS:
+            try:
+                sizes.append((directory / (name + SUFFIXES[typecode])).stat().st_size // ITEM_SIZE)
+            except FileNotFoundError:
+                return 0
+        return min(sizes)
+
+    def count(self, exchange: str, symbol: str, interval: str) -> int:
+        return self._length(self.path(exchange, symbol, interval))
+
+    def read(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> CandleSeries:
+        """Candles opening in ``[start_ms, end_ms]`` as zero-copy views of the archive.
+
+        The returned series is read-only; copy it with
+        :meth:`~crypto_helper.candles.CandleSeries.copy` to modify it.
+        """
+        key = (exchange.lower(), symbol.upper(), interval)
+        directory = self.path(*key)
+        length = self._length(directory)
+        with self._lock:
+            mapping = self._mappings.get(key)
+            if mapping is None or mapping.length != length:
+                if self._meta(directory) is None and length:
+                    raise ArchiveError(f"{directory} has no meta.json")
+                # Earlier mappings stay valid for the series already handed out
+                mapping = self._mappings[key] = _Mapping(directory, length)
+        timestamps = mapping.columns[0]
+        first = 0 if start_ms is None else self._position(timestamps, start_ms, interval, bisect_left)
+        last = length if end_ms is None else self._position(timestamps, end_ms, interval, bisect_right)
+        return CandleSeries(*(column[first:last] for column in mapping.columns))
+
+    @staticmethod
+    def _position(timestamps: memoryview, timestamp_ms: int, interval: str, bisect) -> int:
+        """Index where ``timestamp_ms`` would be inserted, like :func:`bisect.bisect_left`/``right``."""
+        if not timestamps:
+            return 0
+        step = interval_to_ms(interval)
+        guess = (timestamp_ms - timestamps[0]) // step
+        # Without gaps the position follows from the first open time
+        if 0 <= guess < len(timestamps) and timestamps[guess] == timestamp_ms:
+            return guess if bisect is bisect_left else guess + 1
+        return bisect(timestamps, timestamp_ms)
+
+    def append(self, exchange: str, symbol: str, interval: str, candles: CandleSeries) -> int:
+        """Append the candles newer than the last stored one; returns how many were written.
+
+        Raises:
+            ArchiveError: If ``candles`` are not in ascending order.
+        """
+        directory = self.path(exchange, symbol, interval)
+        directory.mkdir(parents=True, exist_ok=True)
+        if self._meta(directory) is None:
+            meta = {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "interval_ms": interval_to_ms(interval)}
+            (directory / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        length = self._length(directory)
+        last = None
+        if length:
+            with open(directory / "timestamps.i64", "rb") as handle:
+                handle.seek((length - 1) * ITEM_SIZE)
+                last = array("q", handle.read(ITEM_SIZE))[0]
+        start = 0 if last is None else bisect_right(candles.timestamps, last)
+        fresh = candles[start:]
+        if not fresh:
+            return 0
+        timestamps = fresh.timestamps
+        if any(later <= earlier for earlier, later in zip(timestamps, timestamps[1:])):
+            raise ArchiveError("Candles must be in ascending order of open time")
+        for (name, typecode), column in zip(COLUMNS, (fresh.timestamps, *fresh.columns())):
+            path = directory / (name + SUFFIXES[typecode])
+            with open(path, "r+b" if path.exists() else "wb") as handle:
+                # Drop a partial tail left by an interrupted append
+                handle.truncate(length * ITEM_SIZE)
+                handle.seek(length * ITEM_SIZE)
+                handle.write(column if isinstance(column, memoryview) else column.tobytes())
+        return len(fresh)
+
+    def download(
+        self,
+        client: ExchangeClient,
+        symbol: str,
+        interval: str,
+        since_ms: int,
+        *,
+        chunk: int = 20_000,
+        clock=time.time,
+    ) -> int:
+        """Fetch closed candles from ``since_ms`` (or the last stored one) up to now.
+
+        Candles are requested ``chunk`` at a time, which the client splits into
+        parallel pages, and appended as they arrive, so an interrupted
+        download resumes where it stopped.
+        """
+        step = client.interval_ms(interval)
+        stored = self.read(client.name, symbol, interval)
+        start = max(since_ms, stored.timestamps[-1] + step) if stored else candle_open(since_ms, step)
+        # The candle in progress is not stored; it would change after the download
+        current = candle_open(int(clock() * 1000), step)
+        total = 0
+        while start < current:
+            limit = min(chunk, (current - start) // step)
+            candles = client.fetch_ohlc(symbol, interval, limit=limit, start_time=start)
+            candles = candles[: bisect_left(candles.timestamps, current)]
+            if not candles:
+                # Nothing was listed yet; skip ahead instead of asking again
+                start += limit * step
+                continue
+            total += self.append(client.name, symbol, interval, candles)
+            start = candles.timestamps[-1] + step
+            logger.info("%s %s %s: загружено %d свечей", client.name, symbol, interval, total)
+        return total
+
+
+def _parse_date(value: str) -> int:
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def main(argv: List[str] | None = None) -> None:
+    from . import registry
+
+    parser = argparse.ArgumentParser(prog="python -m crypto_helper.archive", description="Historical candle archive")
+    parser.add_argument("--root", default="history", help="Archive directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    download = commands.add_parser("download", help="Download or extend the history of some pairs")
+    download.add_argument("exchange", choices=registry.exchanges.names())
+    download.add_argument("symbols", help="Comma-separated pairs")
+    download.add_argument("interval")
+    download.add_argument("--since", default="2019-01-01", help="First date (ISO format, UTC) of a new series")
+    download.add_argument("--chunk", type=int, default=20_000, help="Candles per request batch")
+    commands.add_parser("info", help="List stored series")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    archive = CandleArchive(args.root)
+    if args.command == "download":
+        client = registry.exchanges.get(args.exchange)()
+        for symbol in filter(None, (symbol.strip() for symbol in args.symbols.split(","))):
+            symbol = client.native_symbol(symbol)
+            interval = client.native_interval(args.interval)
+            count = archive.download(client, symbol, interval, _parse_date(args.since), chunk=args.chunk)
+            print(f"{args.exchange} {symbol} {interval}: +{count} candles", file=sys.stderr)
+        return
+
+    for exchange, symbol, interval in archive.series():
+        candles = archive.read(exchange, symbol, interval)
+        if not candles:
+            continue
+        first, last = (
+            datetime.fromtimestamp(timestamp / 1000, timezone.utc).isoformat()
+            for timestamp in (candles.timestamps[0], candles.timestamps[-1])
+        )
+        print(f"{exchange} {symbol} {interval}: {len(candles)} candles, {first} .. {last}")
+
+
+__all__ = ["ArchiveError", "CandleArchive"]
+
+
+if __name__ == "__main__":
+    main()
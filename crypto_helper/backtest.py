@@ -0,0 +1,211 @@
+"""Bar-by-bar backtesting of the engine's signals over historical candles.
+
+Indicators are computed once over the whole history and the pattern detectors
+are evaluated as event vectors, so replaying ``n`` candles costs O(n) instead
+of the O(n^2) of calling :meth:`SignalEngine.generate_signals` per bar.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from . import patterns
+from .candles import CandleSeries
+from .indicators import vectorized as indicators
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZONS = (1, 5, 20)
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """Indicator parameters of a strategy.
+
+    Anything with the same attributes, such as a :class:`SignalConfig`, can be
+    passed wherever these are expected.
+    """
+
+    ema_fast: int = 50
+    ema_slow: int = 200
+    rsi_period: int = 14
+    bollinger_period: int = 20
+    bollinger_std_dev: float = 2.0
+
+
+@dataclass
+class BacktestSignal:
+    index: int
+    timestamp_ms: int
+    name: str
+    close: float
+    forward_returns: Dict[int, float] = field(default_factory=dict)
+
+
+@dataclass
+class HorizonStats:
+    count: int
+    mean_return: float
+    hit_rate: float
+
+
+@dataclass
+class BacktestReport:
+    signals: List[BacktestSignal]
+    stats: Dict[str, Dict[int, HorizonStats]]
+
+    def to_dict(self, include_signals: bool = False) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "stats": {
+                name: {str(horizon): asdict(value) for horizon, value in horizons.items()}
+                for name, horizons in self.stats.items()
+            }
+        }
+        if include_signals:
+            result["signals"] = [asdict(signal) for signal in self.signals]
+        return result
+
+
+def _tail_indices(events: Sequence[bool], total: int) -> List[int]:
+    """Map an end-aligned event vector to candle indices where it is true."""
+    offset = total - len(events)
+    return [index + offset for index, hit in enumerate(events) if hit]
+
+
+def signal_events(close_prices: Sequence[float], params: StrategyParams) -> Dict[str, List[int]]:
+    """Candle indices at which each signal of the engine would have fired."""
+    total = len(close_prices)
+    events: Dict[str, List[int]] = {}
+
+    try:
+        fast_ema = indicators.ema(close_prices, params.ema_fast)
+        slow_ema = indicators.ema(close_prices, params.ema_slow)
+    except ValueError as error:
+        logger.debug("EMA unavailable: %s", error)
+    else:
+        events["ema_crossover"] = _tail_indices(patterns.ema_crossover_events(fast_ema, slow_ema), total)
+
+    try:
+        rsi_values = indicators.rsi(close_prices, params.rsi_period)
+    except ValueError as error:
+        logger.debug("RSI unavailable: %s", error)
+    else:
+        events["rsi_oversold"] = _tail_indices(patterns.rsi_oversold_events(rsi_values), total)
+
+    try:
+        _upper, _mid, lower_band = indicators.bollinger_bands(
+            close_prices, params.bollinger_period, params.bollinger_std_dev
+        )
+    except ValueError as error:
+        logger.debug("Bollinger Bands unavailable: %s", error)
+    else:
+        events["bollinger_bounce"] = _tail_indices(patterns.bollinger_bounce_events(close_prices, lower_band), total)
+
+    return events
+
+
+def forward_return_stats(
+    close_prices: Sequence[float], indices: Iterable[int], horizons: Sequence[int] = DEFAULT_HORIZONS
+) -> Dict[int, HorizonStats]:
+    """Mean forward return and share of positive returns after each event."""
+    stats: Dict[int, HorizonStats] = {}
+    total = len(close_prices)
+    indices = list(indices)
+    for horizon in horizons:
+        returns = [
+            close_prices[index + horizon] / close_prices[index] - 1
+            for index in indices
+            if index + horizon < total and close_prices[index]
+        ]
+        if returns:
+            stats[horizon] = HorizonStats(
+                count=len(returns),
+                mean_return=sum(returns) / len(returns),
+                hit_rate=sum(1 for value in returns if value > 0) / len(returns),
+            )
+        else:
+            stats[horizon] = HorizonStats(count=0, mean_return=0.0, hit_rate=0.0)
+    return stats
+
+
+class Backtester:
+    """Replays the engine's signals over a candle history."""
+
+    def __init__(self, horizons: Sequence[int] = DEFAULT_HORIZONS) -> None:
+        self.horizons = tuple(horizons)
+
+    def run(self, candles: Any, params: StrategyParams) -> BacktestReport:
+        series = CandleSeries.coerce(candles)
+        closes = series.close
+        events = signal_events(closes, params)
+
+        signals: List[BacktestSignal] = []
+        stats: Dict[str, Dict[int, HorizonStats]] = {}
+        total = len(closes)
+        for name, indices in events.items():
+            stats[name] = forward_return_stats(closes, indices, self.horizons)
+            for index in indices:
+                signals.append(
+                    BacktestSignal(
+                        index=index,
+                        timestamp_ms=series.timestamps[index],
+                        name=name,
+                        close=closes[index],
+                        forward_returns={
+                            horizon: closes[index + horizon] / closes[index] - 1
+                            for horizon in self.horizons
+                            if index + horizon < total and closes[index]
+                        },
+                    )
+                )
+        signals.sort(key=lambda signal: (signal.index, signal.name))
+        return BacktestReport(signals=signals, stats=stats)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from . import registry
+
+    parser = argparse.ArgumentParser(description="Backtest CryptoHelper signals on historical candles")
+    parser.add_argument("symbol")
+    parser.add_argument("interval")
+    parser.add_argument("--exchange", choices=registry.exchanges.names(), default="binance")
+    parser.add_argument("--archive", help="Read the last --limit candles from this archive instead of the exchange")
+    parser.add_argument("--limit", type=int, default=10_000, help="Number of candles to replay")
+    parser.add_argument("--ema-fast", type=int, default=50)
+    parser.add_argument("--ema-slow", type=int, default=200)
+    parser.add_argument("--rsi-period", type=int, default=14)
+    parser.add_argument("--bollinger-period", type=int, default=20)
+    parser.add_argument("--bollinger-std", type=float, default=2.0)
+    parser.add_argument("--horizons", default="1,5,20", help="Comma-separated forward-return horizons in candles")
+    parser.add_argument("--signals", action="store_true", help="Include every historical signal in the output")
+    args = parser.parse_args(argv)
+
+    if args.archive:
+        from .archive import CandleArchive
+
+        candles = CandleArchive(args.archive).read(args.exchange, args.symbol, args.interval).tail(args.limit)
+    else:
+        candles = registry.exchanges.get(args.exchange)().fetch_ohlc(args.symbol, args.interval, limit=args.limit)
+    params = StrategyParams(args.ema_fast, args.ema_slow, args.rsi_period, args.bollinger_period, args.bollinger_std)
+    horizons: Tuple[int, ...] = tuple(int(value) for value in args.horizons.split(","))
+    report = Backtester(horizons).run(candles, params)
+    print(json.dumps(report.to_dict(include_signals=args.signals), indent=2))
+
+
+__all__ = [
+    "BacktestReport",
+    "BacktestSignal",
+    "Backtester",
+    "HorizonStats",
+    "StrategyParams",
+    "forward_return_stats",
+    "signal_events",
+]
+
+
+if __name__ == "__main__":
+    main()
+
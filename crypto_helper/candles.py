@@ -0,0 +1,278 @@
+"""Columnar candle storage shared by exchange clients, indicators and the engine."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime
+import re
+from typing import Any, overload
+
+_INTERVAL_UNITS_MS = {
+    "s": 1_000,
+    "m": 60_000,
+    "min": 60_000,
+    "h": 3_600_000,
+    "hour": 3_600_000,
+    "d": 86_400_000,
+    "day": 86_400_000,
+    "w": 604_800_000,
+    "week": 604_800_000,
+}
+_INTERVAL_PATTERN = re.compile(r"^(\d*)([a-zA-Z]*)$")
+# The Unix epoch is a Thursday; exchanges open weekly candles on Monday.
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def interval_to_ms(interval: str) -> int:
+    """Return the length of a candle interval in milliseconds.
+
+    Understands the Binance (``15m``, ``4h``), Bybit (``15``, ``240``, ``D``) and
+    KuCoin (``15min``, ``4hour``, ``1day``) spellings. Monthly candles have no
+    fixed length and are rejected.
+    """
+    match = _INTERVAL_PATTERN.match(interval.strip())
+    if not match:
+        raise ValueError(f"Unsupported candle interval: {interval!r}")
+    count, unit = match.groups()
+    if not unit:
+        unit = "m"  # Bybit spells minute intervals as bare numbers
+    elif unit not in ("m", "M"):
+        unit = unit.lower()
+    if unit not in _INTERVAL_UNITS_MS or (not count and unit not in ("d", "w")):
+        raise ValueError(f"Unsupported candle interval: {interval!r}")
+    return int(count or 1) * _INTERVAL_UNITS_MS[unit]
+
+
+def candle_open(timestamp_ms: int, step_ms: int) -> int:
+    """Open time of the ``step_ms`` candle containing ``timestamp_ms``.
+
+    Candles are aligned to the epoch, except that multiples of a week start
+    on Monday 00:00 UTC as they do on the exchanges.
+    """
+    offset = _WEEK_OFFSET_MS if step_ms % _INTERVAL_UNITS_MS["w"] == 0 else 0
+    return timestamp_ms - (timestamp_ms - offset) % step_ms
+
+
+class Candle:
+    """Lightweight row view into a :class:`CandleSeries`.
+
+    Exposes the same attributes as :class:`crypto_helper.exchanges.base.OHLCV`
+    so code written against lists of candles keeps working.
+    """
+
+    __slots__ = ("_series", "_index")
+
+    def __init__(self, series: "CandleSeries", index: int) -> None:
+        self._series = series
+        self._index = index
+
+    @property
+    def timestamp_ms(self) -> int:
+        return self._series.timestamps[self._index]
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self._series.timestamps[self._index] / 1000)
+
+    @property
+    def open(self) -> float:
+        return self._series.open[self._index]
+
+    @property
+    def high(self) -> float:
+        return self._series.high[self._index]
+
+    @property
+    def low(self) -> float:
+        return self._series.low[self._index]
+
+    @property
+    def close(self) -> float:
+        return self._series.close[self._index]
+
+    @property
+    def volume(self) -> float:
+        return self._series.volume[self._index]
+
+    def __repr__(self) -> str:
+        return (
+            f"Candle(timestamp_ms={self.timestamp_ms}, open={self.open}, high={self.high}, "
+            f"low={self.low}, close={self.close}, volume={self.volume})"
+        )
+
+
+class CandleSeries:
+    """Struct-of-arrays candle history.
+
+    Timestamps are candle open times in milliseconds (``array('q')``) and prices
+    and volumes are ``array('d')`` columns, so a candle costs 48 bytes and the
+    ``close`` column can be handed to the indicators without copying.
+
+    Columns may also be ``memoryview`` objects of the same formats, e.g. views
+    of a memory-mapped :mod:`~crypto_helper.archive`; they are kept as they
+    are, so such a series is read-only until :meth:`copy` is called.
+    """
+
+    __slots__ = ("timestamps", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        timestamps: Iterable[int] = (),
+        open: Iterable[float] = (),
+        high: Iterable[float] = (),
+        low: Iterable[float] = (),
+        close: Iterable[float] = (),
+        volume: Iterable[float] = (),
+    ) -> None:
+        self.timestamps = _column("q", timestamps)
+        self.open = _column("d", open)
+        self.high = _column("d", high)
+        self.low = _column("d", low)
+        self.close = _column("d", close)
+        self.volume = _column("d", volume)
+        if not all(len(column) == len(self.timestamps) for column in self.columns()):
+            raise ValueError("All candle columns must have the same length")
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Sequence[Any]],
+        *,
+        timestamp: int = 0,
+        open: int = 1,
+        high: int = 2,
+        low: int = 3,
+        close: int = 4,
+        volume: int = 5,
+        time_unit_ms: int = 1,
+    ) -> "CandleSeries":
+        """Parse raw exchange rows, given the position of each field in a row."""
+        if time_unit_ms == 1:
+            timestamps = array("q", [int(row[timestamp]) for row in rows])
+        else:
+            timestamps = array("q", [int(row[timestamp]) * time_unit_ms for row in rows])
+        return cls(
+            timestamps,
+            array("d", [float(row[open]) for row in rows]),
+            array("d", [float(row[high]) for row in rows]),
+            array("d", [float(row[low]) for row in rows]),
+            array("d", [float(row[close]) for row in rows]),
+            array("d", [float(row[volume]) for row in rows]),
+        )
+
+    @classmethod
+    def from_ohlcv(cls, candles: Iterable[Any]) -> "CandleSeries":
+        """Build a series from objects with ``timestamp``/``open``/.../``volume`` attributes."""
+        series = cls()
+        for candle in candles:
+            series.append(
+                _timestamp_ms(candle),
+                candle.open,
+                candle.high,
+                candle.low,
+                candle.close,
+                candle.volume,
+            )
+        return series
+
+    @classmethod
+    def coerce(cls, candles: Any) -> "CandleSeries":
+        """Return ``candles`` as a series, converting lists of ``OHLCV`` when needed."""
+        if isinstance(candles, cls):
+            return candles
+        return cls.from_ohlcv(candles)
+
+    def columns(self) -> tuple:
+        return (self.open, self.high, self.low, self.close, self.volume)
+
+    def copy(self) -> "CandleSeries":
+        """Writable copy backed by arrays."""
+        return CandleSeries(*(_copy(column) for column in (self.timestamps, *self.columns())))
+
+    def append(self, timestamp_ms: int, open: float, high: float, low: float, close: float, volume: float) -> None:
+        self.timestamps.append(timestamp_ms)
+        self.open.append(open)
+        self.high.append(high)
+        self.low.append(low)
+        self.close.append(close)
+        self.volume.append(volume)
+
+    def extend(self, other: "CandleSeries") -> None:
+        self.timestamps.extend(other.timestamps)
+        for column, values in zip(self.columns(), other.columns()):
+            column.extend(values)
+
+    def reverse(self) -> None:
+        """Reverse in place, e.g. for exchanges that return newest candles first."""
+        self.timestamps.reverse()
+        for column in self.columns():
+            column.reverse()
+
+    def tail(self, count: int) -> "CandleSeries":
+        if count >= len(self):
+            return self
+        return self[len(self) - count :]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __bool__(self) -> bool:
+        return len(self.timestamps) > 0
+
+    @overload
+    def __getitem__(self, index: int) -> Candle:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "CandleSeries":
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CandleSeries(self.timestamps[index], *(column[index] for column in self.columns()))
+        length = len(self.timestamps)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("candle index out of range")
+        return Candle(self, index)
+
+    def __iter__(self) -> Iterator[Candle]:
+        for index in range(len(self.timestamps)):
+            yield Candle(self, index)
+
+    def __repr__(self) -> str:
+        if not self:
+            return "CandleSeries([])"
+        return f"CandleSeries(len={len(self)}, first={self.timestamps[0]}, last={self.timestamps[-1]})"
+
+
+def _column(typecode: str, values: Iterable[Any]) -> Any:
+    if isinstance(values, array):
+        return values
+    if isinstance(values, memoryview):
+        if values.format != typecode:
+            raise ValueError(f"Expected a memoryview of format {typecode!r}, got {values.format!r}")
+        return values
+    return array(typecode, values)
+
+
+def _copy(column: Any) -> array:
+    if isinstance(column, array):
+        return array(column.typecode, column)
+    copied = array(column.format)
+    copied.frombytes(column.cast("B"))
+    return copied
+
+
+def _timestamp_ms(candle: Any) -> int:
+    value = getattr(candle, "timestamp_ms", None)
+    if value is not None:
+        return value
+    timestamp = candle.timestamp
+    if isinstance(timestamp, datetime):
+        return int(round(timestamp.timestamp() * 1000))
+    return int(timestamp)
+
+
+__all__ = ["Candle", "CandleSeries", "candle_open", "interval_to_ms"]
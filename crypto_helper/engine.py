@@ -2,56 +2,335 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
-from typing import Dict, List, Protocol
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Protocol, Sequence, Tuple
 
+from ._compat import requests
+from .candles import CandleSeries
 from .exchanges.base import ExchangeClient, OHLCV
-from .indicators import core as indicators
-from .notifications.telegram import TelegramNotifier
+from .exchanges.cache import CachedExchangeClient
+from .indicators import vectorized as indicators
+from .indicators.incremental import IndicatorSet
+from .resample import ResamplingExchangeClient, finest_interval, resample_many
+from .filters import FilterSet
+from .state import FILTER_PREFIX, SignalStateStore, is_edge_signal
+from . import metrics as _metrics
 from . import patterns
 
+if TYPE_CHECKING:
+    import pstats
+
 logger = logging.getLogger(__name__)
 
+MACD_FAST_PERIOD = 12
+MACD_SLOW_PERIOD = 26
+MACD_SIGNAL_PERIOD = 9
+
 
 class SignalFormatter(Protocol):
     def __call__(self, symbol: str, signals: Dict[str, str]) -> str:
         ...
 
 
+class Notifier(Protocol):
+    """Anything that delivers a text, e.g. a TelegramNotifier or TelegramDispatcher."""
+
+    def send_message(self, text: str) -> None:
+        ...
+
+
 @dataclass
 class SignalConfig:
     symbol: str
     interval: str
     exchange: ExchangeClient
-    telegram_notifier: TelegramNotifier
+    telegram_notifier: Notifier
     ema_fast: int = 50
     ema_slow: int = 200
     rsi_period: int = 14
     bollinger_period: int = 20
     bollinger_std_dev: float = 2.0
+    # Names of filters of the engine's FilterSet to evaluate as extra signals
+    filters: Tuple[str, ...] = ()
+
+
+@dataclass
+class ScanResult:
+    """Outcome of running one :class:`SignalConfig` as part of a scan."""
+
+    config: SignalConfig
+    signals: Optional[Dict[str, str]] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class SignalEngine:
-    def __init__(self, formatter: SignalFormatter | None = None) -> None:
+    """Computes signals for a :class:`SignalConfig` and notifies about them.
+
+    With a ``state_store`` notifications are edge-triggered: a message is sent
+    only when a signal switches on, and not again for the same signal within
+    ``cooldown`` seconds (a number or a per-signal mapping).
+
+    Stage latencies and counters go to ``metrics``, or to the process-wide
+    sink from :func:`crypto_helper.metrics.active` when none is given.
+
+    Filters named in :attr:`SignalConfig.filters` are looked up in
+    ``filter_set`` and reported as ``filter:<name>`` signals when they hold.
+    """
+
+    def __init__(
+        self,
+        formatter: SignalFormatter | None = None,
+        state_store: SignalStateStore | None = None,
+        cooldown: float | Mapping[str, float] = 0.0,
+        clock: Callable[[], float] = time.time,
+        metrics: _metrics.Metrics | None = None,
+        filter_set: FilterSet | None = None,
+    ) -> None:
         self.formatter = formatter or self.default_formatter
+        self.filter_set = filter_set
+        self.state_store = state_store
+        self.cooldown = cooldown
+        self.clock = clock
+        self._metrics = metrics
+
+    @property
+    def metrics(self) -> _metrics.Metrics:
+        return self._metrics if self._metrics is not None else _metrics.active()
 
     def run(self, config: SignalConfig) -> Dict[str, str]:
+        return self.process(config, self.fetch_candles(config))
+
+    def profile_run(self, config: SignalConfig, path: str | None = None) -> Tuple[Dict[str, str], pstats.Stats]:
+        """:meth:`run` under cProfile; the raw profile is also written to ``path`` if given."""
+        return _metrics.profile(self.run, config, path=path)
+
+    def run_timeframes(self, config: SignalConfig, intervals: Sequence[str]) -> Dict[str, Dict[str, str]]:
+        """Evaluate ``config`` on several timeframes, sharing downloads where that is cheaper.
+
+        Every timeframe is processed (and notified about) as its own config.
+        """
+        return self.process_timeframes(config, self.fetch_timeframes(config, intervals))
+
+    def fetch_timeframes(self, config: SignalConfig, intervals: Sequence[str]) -> Dict[str, CandleSeries]:
+        """Candles of every interval, resampling from one fetch of the finest one where it is cheaper.
+
+        A coarser interval resampled from fine candles needs one more bucket
+        than its own history, for the partial bucket at the start of the
+        window. Intervals whose share fits in one page of fine candles come
+        from the shared fetch; the rest are fetched on their own, as paging
+        through thousands of fine candles would cost more requests than it
+        saves. Clients serving history locally (a candle cache or a
+        resampling client) share everything.
+        """
+        exchange = config.exchange
+        finest = finest_interval(intervals)
+        step = exchange.interval_ms(finest)
+        required = self._required_candles(config)
+        local = isinstance(exchange, (CachedExchangeClient, ResamplingExchangeClient))
+        limit = required
+        shared: List[str] = []
+        separate: List[str] = []
+        for interval in intervals:
+            ratio = exchange.interval_ms(interval) // step
+            needed = required if ratio == 1 else (required + 1) * ratio
+            if ratio == 1 or local or needed <= exchange.max_limit:
+                shared.append(interval)
+                limit = max(limit, needed)
+            else:
+                separate.append(interval)
+        series = resample_many(self.fetch_candles(replace(config, interval=finest), limit=limit), step, shared)
+        for interval in separate:
+            series[interval] = self.fetch_candles(replace(config, interval=interval))
+        return {interval: series[interval] for interval in intervals}
+
+    def process_timeframes(self, config: SignalConfig, series: Mapping[str, CandleSeries]) -> Dict[str, Dict[str, str]]:
+        return {interval: self.process(replace(config, interval=interval), candles) for interval, candles in series.items()}
+
+    def fetch_candles(self, config: SignalConfig, limit: int | None = None) -> CandleSeries:
         logger.info("Fetching OHLC data for %s on %s", config.symbol, config.exchange.__class__.__name__)
-        candles = config.exchange.fetch_ohlc(config.symbol, config.interval)
-        close_prices = [candle.close for candle in candles]
+        limit = limit or self._required_candles(config)
+        with self.metrics.timer("fetch", exchange=config.exchange.name):
+            candles = config.exchange.fetch_ohlc(config.symbol, config.interval, limit=limit)
+        return CandleSeries.coerce(candles)
 
+    def _required_candles(self, config: SignalConfig) -> int:
+        """Smallest history for which every configured signal can be evaluated."""
+        filters = self.filter_set.required_candles(config.filters) if config.filters and self.filter_set else 0
+        return max(
+            filters,
+            # the crossover compares the last two values of both EMAs
+            config.ema_fast + 1,
+            config.ema_slow + 1,
+            # the first RSI value needs ``period`` changes of warm-up plus one
+            config.rsi_period + 2,
+            # the MACD signal line is an EMA over the MACD line
+            MACD_SLOW_PERIOD + MACD_SIGNAL_PERIOD - 1,
+            # the bounce compares the last two closes with the last band
+            config.bollinger_period,
+            2,
+        )
+
+    def process(self, config: SignalConfig, candles: CandleSeries) -> Dict[str, str]:
+        """Compute signals from already fetched candles and send the notification."""
+        close_prices = candles.close
         signals = self.generate_signals(config, candles, close_prices)
+        self.notify(config, signals)
+        return signals
+
+    def notify(self, config: SignalConfig, signals: Dict[str, str]) -> None:
+        if self.state_store is not None:
+            key = (config.exchange.name, config.symbol, config.interval)
+            fired = self.state_store.transition(key, signals, self.clock(), self.cooldown)
+            if not fired:
+                logger.debug("Состояние сигналов %s не изменилось — уведомление не требуется", config.symbol)
+                return
+            # Keep the MACD readout as context, drop signals that were already reported
+            signals = {
+                name: text for name, text in signals.items() if name in fired or not (is_edge_signal(name) or name == "summary")
+            }
         message = self.formatter(config.symbol, signals)
         logger.info("Sending Telegram notification: %s", message)
-        config.telegram_notifier.send_message(message)
-        return signals
+        metrics = self.metrics
+        metrics.inc("notifications_total")
+        try:
+            with metrics.timer("notify"):
+                config.telegram_notifier.send_message(message)
+        except requests.RequestException as error:
+            metrics.inc("notification_errors_total")
+            logger.error("Не удалось отправить уведомление для %s: %s", config.symbol, error)
 
-    def generate_signals(self, config: SignalConfig, candles: List[OHLCV], close_prices: List[float]) -> Dict[str, str]:
+    def run_many(
+        self,
+        configs: Iterable[SignalConfig],
+        max_workers: int = 8,
+        per_exchange_limit: int | Mapping[str, int] | None = None,
+        timeframes: Sequence[str] | None = None,
+    ) -> List[ScanResult]:
+        """Run many configs concurrently and collect per-symbol results and errors.
+
+        Fetches are I/O bound, so a thread pool of ``max_workers`` bounds the
+        wall-clock time of a scan by its slowest requests rather than their sum.
+        ``per_exchange_limit`` caps how many requests run against one exchange
+        at a time, either globally or per exchange name. Configs sharing an
+        exchange client also share its HTTP session. Results keep input order.
+
+        With ``timeframes`` each config is evaluated on all of them through
+        :meth:`run_timeframes`, and signal names are prefixed with the interval
+        (``"4h ema_crossover"``).
+        """
+        configs = list(configs)
+        if not configs:
+            return []
+
+        limits = self.exchange_limits(configs, per_exchange_limit)
+
+        def scan(config: SignalConfig) -> ScanResult:
+            limit = limits.get(config.exchange.name)
+            try:
+                if timeframes:
+                    if limit is None:
+                        series = self.fetch_timeframes(config, timeframes)
+                    else:
+                        with limit:
+                            series = self.fetch_timeframes(config, timeframes)
+                    by_interval = self.process_timeframes(config, series)
+                    signals = {
+                        f"{interval} {name}": text for interval, found in by_interval.items() for name, text in found.items()
+                    }
+                    return ScanResult(config, signals=signals)
+                if limit is None:
+                    candles = self.fetch_candles(config)
+                else:
+                    with limit:
+                        candles = self.fetch_candles(config)
+                return ScanResult(config, signals=self.process(config, candles))
+            except Exception as error:  # collected per symbol instead of aborting the scan
+                self.metrics.inc("scan_errors_total", exchange=config.exchange.name)
+                logger.error("Сканирование %s завершилось ошибкой: %s", config.symbol, error)
+                return ScanResult(config, error=error)
+
+        workers = max(1, min(max_workers, len(configs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="signal-scan") as executor:
+            return list(executor.map(scan, configs))
+
+    @staticmethod
+    def exchange_limits(
+        configs: Iterable[SignalConfig], per_exchange_limit: int | Mapping[str, int] | None
+    ) -> Dict[str, threading.BoundedSemaphore]:
+        """Semaphores capping concurrent requests per exchange name."""
+        limits: Dict[str, threading.BoundedSemaphore] = {}
+        for config in configs:
+            name = config.exchange.name
+            if name in limits:
+                continue
+            if isinstance(per_exchange_limit, Mapping):
+                cap = per_exchange_limit.get(name)
+            else:
+                cap = per_exchange_limit
+            if cap:
+                limits[name] = threading.BoundedSemaphore(cap)
+        return limits
+
+    def generate_signals(
+        self,
+        config: SignalConfig,
+        candles: CandleSeries | List[OHLCV],
+        close_prices: Sequence[float],
+        source: Any = None,
+    ) -> Dict[str, str]:
+        """Evaluate every signal for ``config``.
+
+        ``source`` provides ``ema``, ``rsi``, ``macd`` and ``bollinger_bands``
+        with the signatures of :mod:`.indicators.vectorized`; a shared cache can
+        be passed to reuse series already computed for the same candles.
+        """
+        source = indicators if source is None else source
+        metrics = self.metrics
+        if not metrics.enabled:
+            results = self._evaluate(config, close_prices, source)
+            self._apply_filters(config, candles, source, results)
+            return results
+
+        started = time.perf_counter()
+        timed = _metrics.CallTimer(source)
+        results = self._evaluate(config, close_prices, timed)
+        # Everything that is not an indicator call is pattern matching
+        metrics.observe("stage_seconds", timed.elapsed, stage="indicators")
+        metrics.observe("stage_seconds", time.perf_counter() - started - timed.elapsed, stage="patterns")
+        if config.filters and self.filter_set is not None:
+            with metrics.timer("filters"):
+                self._apply_filters(config, candles, source, results)
+        for name in results:
+            if is_edge_signal(name):
+                metrics.inc("signals_total", signal=name)
+        return results
+
+    def _apply_filters(self, config: SignalConfig, candles: Any, source: Any, results: Dict[str, str]) -> None:
+        if not config.filters or self.filter_set is None:
+            return
+        # A shared source (MarketIndicators) also shares filter sub-expressions between configs
+        matched = self.filter_set.evaluate(
+            CandleSeries.coerce(candles), config.filters, source, memo=getattr(source, "filter_values", None)
+        )
+        for name, holds in matched.items():
+            if holds:
+                results[FILTER_PREFIX + name] = "Фильтр «%s»: %s" % (name, self.filter_set.expressions[name])
+        if any(matched.values()):
+            results.pop("summary", None)
+
+    def _evaluate(self, config: SignalConfig, close_prices: Sequence[float], source: Any) -> Dict[str, str]:
         results: Dict[str, str] = {}
 
         try:
-            fast_ema = indicators.ema(close_prices, config.ema_fast)
-            slow_ema = indicators.ema(close_prices, config.ema_slow)
+            fast_ema = source.ema(close_prices, config.ema_fast)
+            slow_ema = source.ema(close_prices, config.ema_slow)
         except ValueError as error:
             logger.warning("Не удалось рассчитать EMA: %s", error)
         else:
@@ -59,7 +338,7 @@ class SignalEngine:
                 results["ema_crossover"] = "EMA-%d пересек EMA-%d вверх" % (config.ema_fast, config.ema_slow)
 
         try:
-            rsi_values = indicators.rsi(close_prices, config.rsi_period)
+            rsi_values = source.rsi(close_prices, config.rsi_period)
         except ValueError as error:
             logger.warning("Не удалось рассчитать RSI: %s", error)
         else:
@@ -67,7 +346,9 @@ class SignalEngine:
                 results["rsi_oversold"] = "RSI ниже %d — рынок перепродан" % config.rsi_period
 
         try:
-            macd_line, signal_line, histogram = indicators.macd(close_prices)
+            macd_line, signal_line, histogram = source.macd(
+                close_prices, MACD_FAST_PERIOD, MACD_SLOW_PERIOD, MACD_SIGNAL_PERIOD
+            )
         except ValueError as error:
             logger.warning("Не удалось рассчитать MACD: %s", error)
         else:
@@ -76,7 +357,7 @@ class SignalEngine:
             )
 
         try:
-            _upper_band, _mid_band, lower_band = indicators.bollinger_bands(
+            _upper_band, _mid_band, lower_band = source.bollinger_bands(
                 close_prices, config.bollinger_period, config.bollinger_std_dev
             )
         except ValueError as error:
@@ -88,6 +369,51 @@ class SignalEngine:
         results.setdefault("summary", "Нет сильных сигналов — наблюдаем")
         return results
 
+    @staticmethod
+    def create_state(config: SignalConfig, candles: CandleSeries | List[OHLCV] | None = None) -> IndicatorSet:
+        """Build incremental indicator state for ``config``, optionally seeded from history."""
+        state = IndicatorSet(
+            ema_fast=config.ema_fast,
+            ema_slow=config.ema_slow,
+            rsi_period=config.rsi_period,
+            bollinger_period=config.bollinger_period,
+            bollinger_std_dev=config.bollinger_std_dev,
+        )
+        if candles:
+            for price in CandleSeries.coerce(candles).close:
+                state.update_price(price)
+        return state
+
+    def generate_signals_from_state(
+        self, config: SignalConfig, state: IndicatorSet, candles: CandleSeries | None = None
+    ) -> Dict[str, str]:
+        """Evaluate the same signals as :meth:`generate_signals` from incremental state.
+
+        ``config.filters`` have no incremental form; they are evaluated on
+        ``candles``, the latest closed candles (at least
+        ``filter_set.required_candles(config.filters)`` of them), when given.
+        """
+        results: Dict[str, str] = {}
+
+        if patterns.ema_crossover(state.fast_ema_tail, state.slow_ema_tail):
+            results["ema_crossover"] = "EMA-%d пересек EMA-%d вверх" % (config.ema_fast, config.ema_slow)
+
+        if state.rsi.value is not None and patterns.rsi_oversold([state.rsi.value]):
+            results["rsi_oversold"] = "RSI ниже %d — рынок перепродан" % config.rsi_period
+
+        if state.macd.value is not None:
+            results["macd"] = "MACD %.2f, сигнал %.2f, гистограмма %.2f" % state.macd.value
+
+        if state.bollinger.value is not None:
+            lower_band = state.bollinger.value[2]
+            if patterns.bollinger_bounce(list(state.close_tail), [lower_band]):
+                results["bollinger_bounce"] = "Цена отскочила от нижней полосы Боллинджера"
+
+        results.setdefault("summary", "Нет сильных сигналов — наблюдаем")
+        if candles is not None:
+            self._apply_filters(config, candles, indicators, results)
+        return results
+
     @staticmethod
     def default_formatter(symbol: str, signals: Dict[str, str]) -> str:
         parts = [f"{symbol} сигналы:"]
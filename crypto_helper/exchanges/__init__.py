@@ -1,6 +1,31 @@
-"""Exchange clients available in CryptoHelper."""
-from .binance import BinanceClient
-from .bybit import BybitClient
-from .kucoin import KuCoinClient
+"""Exchange clients available in CryptoHelper.
 
-__all__ = ["BinanceClient", "BybitClient", "KuCoinClient"]
+Clients are imported on first access; look them up by name through
+:data:`crypto_helper.registry.exchanges`.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "BinanceClient": ".binance",
+    "BybitClient": ".bybit",
+    "CompositeExchangeClient": ".composite",
+    "KuCoinClient": ".kucoin",
+}
+
+__all__ = ["BinanceClient", "BybitClient", "CompositeExchangeClient", "KuCoinClient"]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
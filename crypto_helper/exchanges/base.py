@@ -1,12 +1,19 @@
 """Base classes and utilities for exchange clients."""
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Protocol
+from typing import Callable, List, Optional, Protocol
 
-import requests
+from .. import metrics as _metrics
+from .._compat import requests
+from ..candles import CandleSeries, interval_to_ms
+from ..transport import HttpTransport, RateLimiter, default_transport
 
 
 @dataclass
@@ -21,6 +28,25 @@ class OHLCV:
     volume: float
 
 
+@dataclass
+class Ticker:
+    """24-hour snapshot of one market from an exchange's bulk ticker endpoint."""
+
+    symbol: str
+    last: float
+    change_pct: float
+    quote_volume: float
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+
+    @property
+    def spread_pct(self) -> Optional[float]:
+        """Bid/ask spread relative to the mid price, in percent."""
+        if not self.bid or not self.ask:
+            return None
+        return (self.ask - self.bid) / ((self.ask + self.bid) / 2) * 100
+
+
 class CandleFactory(Protocol):
     """Protocol describing the call signature for candle factories."""
 
@@ -29,25 +55,145 @@ class CandleFactory(Protocol):
 
 
 class ExchangeClient(ABC):
-    """Abstract base client that fetches OHLC data from crypto exchanges."""
+    """Abstract base client that fetches OHLC data from crypto exchanges.
+
+    Subclasses implement :meth:`_fetch_page` for a single request of at most
+    ``max_limit`` candles; :meth:`fetch_ohlc` splits larger requests into
+    time-ranged pages and downloads them in parallel.
+    """
 
     base_url: str
+    name: str = "exchange"
+    max_limit: int = 1000
+    max_parallel_pages: int = 4
+    rate_limiter: Callable[[], RateLimiter] | None = None
 
-    def __init__(self, session: requests.Session | None = None) -> None:
-        self.session = session or requests.Session()
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        transport: HttpTransport | None = None,
+        base_url: str | None = None,
+    ) -> None:
+        if base_url is not None:
+            # E.g. a local stand-in server (see ``benchmarks.server``)
+            self.base_url = base_url.rstrip("/")
+        if transport is None:
+            transport = HttpTransport(session=session) if session is not None else default_transport()
+        self.transport = transport
+        self.session = transport.session
+        self._io = threading.local()
+        if self.rate_limiter is not None:
+            transport.rate_limiter(self.base_url, self.rate_limiter)
 
-    @abstractmethod
-    def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100) -> List[OHLCV]:
-        """Retrieve OHLC data for a symbol.
+    def fetch_ohlc(
+        self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None
+    ) -> CandleSeries:
+        """Retrieve OHLC data for a symbol, oldest candle first.
 
         Args:
             symbol: Trading pair, e.g. ``BTCUSDT``.
             interval: Exchange-specific candle interval string (e.g. ``1h``).
             limit: Number of candles to return.
+            start_time: Optional open time (milliseconds) of the first candle wanted.
         """
+        if limit <= self.max_limit:
+            return self._timed_page(symbol, interval, limit, start_time)
+
+        step = self.interval_ms(interval)
+        if start_time is None:
+            now = int(time.time() * 1000)
+            start_time = now - now % step - (limit - 1) * step
+        pages = [
+            (start_time + offset * step, min(self.max_limit, limit - offset))
+            for offset in range(0, limit, self.max_limit)
+        ]
+        with ThreadPoolExecutor(max_workers=min(len(pages), self.max_parallel_pages)) as executor:
+            results = list(
+                executor.map(
+                    lambda page: self._timed_page(symbol, interval, page[1], page[0], page[0] + (page[1] - 1) * step),
+                    pages,
+                )
+            )
+
+        candles = CandleSeries()
+        for page in results:
+            last = candles.timestamps[-1] if candles else None
+            candles.extend(page if last is None else page[bisect_right(page.timestamps, last) :])
+        return candles[:limit]
+
+    @abstractmethod
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        """Fetch at most ``max_limit`` candles with open times in ``[start_time, end_time]``."""
+        raise NotImplementedError
+
+    def _timed_page(
+        self, symbol: str, interval: str, limit: int, start_time: int | None = None, end_time: int | None = None
+    ) -> CandleSeries:
+        """:meth:`_fetch_page`, recording the time spent building candles as the ``parse`` stage."""
+        metrics = _metrics.active()
+        if not metrics.enabled:
+            return self._fetch_page(symbol, interval, limit, start_time=start_time, end_time=end_time)
+        self._io.elapsed = 0.0
+        started = time.perf_counter()
+        page = self._fetch_page(symbol, interval, limit, start_time=start_time, end_time=end_time)
+        parse = time.perf_counter() - started - self._io.elapsed
+        metrics.observe("stage_seconds", parse, stage="parse", exchange=self.name)
+        return page
+
+    def interval_ms(self, interval: str) -> int:
+        """Length of one ``interval`` candle in milliseconds."""
+        return interval_to_ms(interval)
+
+    def fetch_tickers(self) -> List[Ticker]:
+        """24-hour tickers of every market on the exchange, in a single request."""
+        raise NotImplementedError(f"{self.name} does not provide bulk tickers")
+
+    def native_symbol(self, symbol: str) -> str:
+        """``symbol`` in this exchange's spelling; ``BTCUSDT``, ``BTC-USDT`` and ``BTC/USDT`` are accepted."""
+        return symbol.replace("-", "").replace("/", "").upper()
+
+    def native_interval(self, interval: str) -> str:
+        """``interval``, given in any supported spelling, in this exchange's spelling."""
+        step = self.interval_ms(interval)
+        for unit, unit_ms in (("w", 604_800_000), ("d", 86_400_000), ("h", 3_600_000), ("m", 60_000), ("s", 1_000)):
+            if step % unit_ms == 0:
+                return f"{step // unit_ms}{unit}"
+        raise ValueError(f"Unsupported candle interval: {interval!r}")
+
+    def server_time(self) -> int:
+        """Exchange clock in milliseconds; clients without a time endpoint use the local clock."""
+        return int(time.time() * 1000)
+
+    def _request(self, endpoint: str, params: dict[str, str], weight: float = 1) -> list:
+        """Perform a GET request against the exchange API.
+
+        ``weight`` is the endpoint's cost in the exchange's rate-limit units.
+        """
+        metrics = _metrics.active()
+        if not metrics.enabled:
+            return self.transport.get(f"{self.base_url}{endpoint}", params=params, weight=weight).json()
+        started = time.perf_counter()
+        response = self.transport.get(f"{self.base_url}{endpoint}", params=params, weight=weight)
+        fetched = time.perf_counter()
+        data = response.json()
+        finished = time.perf_counter()
+        metrics.observe("stage_seconds", finished - fetched, stage="decode", exchange=self.name)
+        # Time spent waiting for and decoding the response is not candle construction
+        self._io.elapsed = getattr(self._io, "elapsed", 0.0) + finished - started
+        return data
+
 
-    def _request(self, endpoint: str, params: dict[str, str]) -> list:
-        """Perform a GET request against the exchange API."""
-        response = self.session.get(f"{self.base_url}{endpoint}", params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+def _price(value: object) -> Optional[float]:
+    """Optional numeric field of a ticker payload; empty and zero prices are missing."""
+    try:
+        number = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    return number or None
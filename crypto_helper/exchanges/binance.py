@@ -1,26 +1,49 @@
 """Binance exchange client implementation."""
 from __future__ import annotations
 
-from datetime import datetime
 from typing import List
 
-from .base import ExchangeClient, OHLCV
+from ..candles import CandleSeries
+from ..transport import BinanceRateLimiter
+from .base import ExchangeClient, Ticker, _price
 
 
 class BinanceClient(ExchangeClient):
     base_url = "https://api.binance.com"
+    name = "binance"
+    rate_limiter = BinanceRateLimiter
+    max_limit = 1000
 
-    def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100) -> List[OHLCV]:
-        params = {"symbol": symbol.upper(), "interval": interval, "limit": str(limit)}
-        data = self._request("/api/v3/klines", params=params)
+    def server_time(self) -> int:
+        return int(self._request("/api/v3/time", params={})["serverTime"])
+
+    def fetch_tickers(self) -> List[Ticker]:
+        # Without a symbol the endpoint returns every market and weighs 80
+        data = self._request("/api/v3/ticker/24hr", params={}, weight=80)
         return [
-            OHLCV(
-                timestamp=datetime.fromtimestamp(item[0] / 1000),
-                open=float(item[1]),
-                high=float(item[2]),
-                low=float(item[3]),
-                close=float(item[4]),
-                volume=float(item[5]),
+            Ticker(
+                symbol=row["symbol"],
+                last=float(row["lastPrice"]),
+                change_pct=float(row["priceChangePercent"]),
+                quote_volume=float(row["quoteVolume"]),
+                bid=_price(row.get("bidPrice")),
+                ask=_price(row.get("askPrice")),
             )
-            for item in data
+            for row in data
         ]
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        params = {"symbol": symbol.upper(), "interval": interval, "limit": str(limit)}
+        if start_time is not None:
+            params["startTime"] = str(start_time)
+        if end_time is not None:
+            params["endTime"] = str(end_time)
+        data = self._request("/api/v3/klines", params=params, weight=2)
+        return CandleSeries.from_rows(data)
@@ -1,32 +1,67 @@
 """Bybit exchange client implementation."""
 from __future__ import annotations
 
-from datetime import datetime
 from typing import List
 
-from .base import ExchangeClient, OHLCV
+from ..candles import CandleSeries
+from ..transport import BybitRateLimiter
+from .base import ExchangeClient, Ticker, _price
 
 
 class BybitClient(ExchangeClient):
     base_url = "https://api.bybit.com"
+    name = "bybit"
+    rate_limiter = BybitRateLimiter
+    max_limit = 1000
 
-    def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100) -> List[OHLCV]:
+    def server_time(self) -> int:
+        return int(self._request("/v5/market/time", params={})["time"])
+
+    def native_interval(self, interval: str) -> str:
+        step = self.interval_ms(interval)
+        if step == 86_400_000:
+            return "D"
+        if step == 604_800_000:
+            return "W"
+        if step % 60_000 or step > 86_400_000:
+            raise ValueError(f"Unsupported Bybit interval: {interval!r}")
+        return str(step // 60_000)
+
+    def fetch_tickers(self) -> List[Ticker]:
+        data = self._request("/v5/market/tickers", params={"category": "linear"})
+        return [
+            Ticker(
+                symbol=row["symbol"],
+                last=float(row["lastPrice"]),
+                # Bybit reports the change as a fraction
+                change_pct=float(row["price24hPcnt"]) * 100,
+                quote_volume=float(row["turnover24h"]),
+                bid=_price(row.get("bid1Price")),
+                ask=_price(row.get("ask1Price")),
+            )
+            for row in data.get("result", {}).get("list", [])
+        ]
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
         params = {
             "category": "linear",
             "symbol": symbol.upper(),
             "interval": interval,
             "limit": str(limit),
         }
+        if start_time is not None:
+            params["start"] = str(start_time)
+        if end_time is not None:
+            params["end"] = str(end_time)
         data = self._request("/v5/market/kline", params=params)
-        candles = data.get("result", {}).get("list", [])
-        return [
-            OHLCV(
-                timestamp=datetime.fromtimestamp(int(item[0]) / 1000),
-                open=float(item[1]),
-                high=float(item[2]),
-                low=float(item[3]),
-                close=float(item[4]),
-                volume=float(item[5]),
-            )
-            for item in candles
-        ]
+        candles = CandleSeries.from_rows(data.get("result", {}).get("list", []))
+        # Bybit returns the newest candle first
+        candles.reverse()
+        return candles
@@ -0,0 +1,177 @@
+"""Persistent candle cache that only downloads candles missing from disk."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from ..candles import CandleSeries
+from .base import ExchangeClient, Ticker
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, interval, ts)
+) WITHOUT ROWID
+"""
+
+
+class CandleStore:
+    """SQLite store of closed candles keyed by exchange, symbol and interval.
+
+    A single connection is shared between threads and guarded by a lock, so
+    one store can back every client of a multi-symbol scan.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_SCHEMA)
+
+    def last_timestamp(self, key: CacheKey) -> int | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MAX(ts) FROM candles WHERE exchange = ? AND symbol = ? AND interval = ?", key
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, key: CacheKey, start_time: int = 0, end_time: int | None = None) -> CandleSeries:
+        """Return cached candles with ``start_time <= ts < end_time``, oldest first."""
+        query = (
+            "SELECT ts, open, high, low, close, volume FROM candles "
+            "WHERE exchange = ? AND symbol = ? AND interval = ? AND ts >= ?"
+        )
+        params: tuple = (*key, start_time)
+        if end_time is not None:
+            query += " AND ts < ?"
+            params += (end_time,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY ts", params).fetchall()
+        return CandleSeries.from_rows(rows)
+
+    def store(self, key: CacheKey, candles: CandleSeries) -> None:
+        if not candles:
+            return
+        rows = [
+            (*key, ts, o, h, l, c, v)
+            for ts, o, h, l, c, v in zip(candles.timestamps, *candles.columns())
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class CachedExchangeClient(ExchangeClient):
+    """Wraps any :class:`ExchangeClient` with a :class:`CandleStore`.
+
+    Closed candles are served from the store; only the tail after the newest
+    cached candle (which always includes the candle still in progress) is
+    requested from the exchange, using its start-time parameter.
+    """
+
+    def __init__(
+        self,
+        client: ExchangeClient,
+        store: CandleStore,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(transport=client.transport)
+        self.client = client
+        self.store = store
+        self.clock = clock
+        self.base_url = client.base_url
+        self.name = client.name
+
+    def interval_ms(self, interval: str) -> int:
+        return self.client.interval_ms(interval)
+
+    def fetch_tickers(self) -> List[Ticker]:
+        return self.client.fetch_tickers()
+
+    def native_symbol(self, symbol: str) -> str:
+        return self.client.native_symbol(symbol)
+
+    def native_interval(self, interval: str) -> str:
+        return self.client.native_interval(interval)
+
+    def server_time(self) -> int:
+        return self.client.server_time()
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        # fetch_ohlc serves whole requests itself; a page is just a short one
+        return self.fetch_ohlc(symbol, interval, limit, start_time)
+
+    def fetch_ohlc(
+        self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None
+    ) -> CandleSeries:
+        key = (self.name, symbol.upper(), interval)
+        step = self.interval_ms(interval)
+        now = int(self.clock() * 1000)
+
+        if start_time is not None:
+            candles = self.client.fetch_ohlc(symbol, interval, limit=limit, start_time=start_time)
+            self._store_closed(key, candles, step, now)
+            return candles
+
+        window_start = now - now % step - (limit - 1) * step
+        last_cached = self.store.last_timestamp(key)
+        if last_cached is None or last_cached + step < window_start:
+            fresh = self.client.fetch_ohlc(symbol, interval, limit=limit)
+            self._store_closed(key, fresh, step, now)
+            return fresh
+
+        missing = (now - last_cached) // step
+        logger.debug("Cache hit for %s, fetching %d missing candles", key, missing)
+        fresh = self.client.fetch_ohlc(symbol, interval, limit=min(missing, limit), start_time=last_cached + step)
+        self._store_closed(key, fresh, step, now)
+
+        candles = self.store.load(key, window_start, end_time=last_cached + step)
+        candles.extend(_after(fresh, last_cached))
+        if len(candles) < limit and (not candles or candles.timestamps[0] > window_start):
+            # The cache does not reach back far enough (e.g. a larger limit than before)
+            fresh = self.client.fetch_ohlc(symbol, interval, limit=limit)
+            self._store_closed(key, fresh, step, now)
+            return fresh
+        return candles.tail(limit)
+
+    def _store_closed(self, key: CacheKey, candles: CandleSeries, step: int, now: int) -> None:
+        self.store.store(key, candles[: bisect_right(candles.timestamps, now - step)])
+
+
+def _after(candles: CandleSeries, timestamp: int) -> CandleSeries:
+    return candles[bisect_right(candles.timestamps, timestamp) :]
+
+
+__all__ = ["CachedExchangeClient", "CandleStore"]
@@ -0,0 +1,181 @@
+"""Consolidated candles from several exchanges, with hedged requests."""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Mapping, Sequence
+
+from .. import metrics as _metrics
+from ..candles import CandleSeries
+from .base import ExchangeClient, Ticker
+
+logger = logging.getLogger(__name__)
+
+
+class CompositeExchangeClient(ExchangeClient):
+    """Queries several exchanges concurrently and merges their candles.
+
+    Symbols and intervals are given once, in any spelling the clients
+    understand (``BTCUSDT``/``BTC-USDT``, ``1h``/``60``/``1hour``), and
+    translated with each client's :meth:`~ExchangeClient.native_symbol` and
+    :meth:`~ExchangeClient.native_interval`; ``symbols`` overrides the
+    translation per exchange name, e.g. ``{"kucoin": {"XBTUSDT": "BTC-USDT"}}``.
+
+    Every candle of the result is the volume-weighted average of the candles
+    the answering exchanges reported for that open time, with their volumes
+    summed. By default all exchanges are awaited (up to ``timeout``) and
+    failing ones are skipped. With ``quorum`` set the request is hedged: the
+    merge uses the first ``quorum`` exchanges to answer successfully, and
+    requests that have not started are cancelled while slower ones are
+    ignored. ``quorum=1`` simply takes the fastest healthy exchange.
+
+    Requests run on one pool of ``max_workers`` threads (by default eight per
+    exchange) shared by concurrent calls, so ignored stragglers finish on
+    threads that are reused; :meth:`close` stops the pool.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[ExchangeClient],
+        *,
+        quorum: int | None = None,
+        timeout: float | None = None,
+        symbols: Mapping[str, Mapping[str, str]] | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        if not clients:
+            raise ValueError("At least one exchange client is required")
+        if quorum is not None and not 1 <= quorum <= len(clients):
+            raise ValueError(f"quorum must be between 1 and {len(clients)}")
+        super().__init__(transport=clients[0].transport)
+        self.clients = list(clients)
+        self.quorum = quorum
+        self.timeout = timeout
+        self.symbols = {name: dict(mapping) for name, mapping in (symbols or {}).items()}
+        self.base_url = clients[0].base_url
+        self.name = "+".join(client.name for client in self.clients)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or 8 * len(self.clients), thread_name_prefix=f"composite-{self.name}"
+        )
+
+    def close(self) -> None:
+        """Cancel queued requests and wait for running ones to finish."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "CompositeExchangeClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def server_time(self) -> int:
+        return self.clients[0].server_time()
+
+    def fetch_tickers(self) -> List[Ticker]:
+        # The symbols are translated for every exchange when candles are fetched
+        return self.clients[0].fetch_tickers()
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        # fetch_ohlc serves whole requests itself; a page is just a short one
+        return self.fetch_ohlc(symbol, interval, limit, start_time)
+
+    def fetch_ohlc(
+        self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None
+    ) -> CandleSeries:
+        needed = self.quorum or len(self.clients)
+        futures: Dict[Future, ExchangeClient] = {
+            self._executor.submit(self._fetch_one, client, symbol, interval, limit, start_time): client
+            for client in self.clients
+        }
+        answered: List[CandleSeries] = []
+        errors: Dict[str, BaseException] = {}
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        pending = set(futures)
+        try:
+            while pending and len(answered) < needed:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    client = futures[future]
+                    try:
+                        candles = future.result()
+                    except Exception as error:
+                        errors[client.name] = error
+                        logger.warning("Биржа %s не ответила для %s: %s", client.name, symbol, error)
+                        _metrics.active().inc("composite_errors_total", exchange=client.name)
+                        continue
+                    if candles:
+                        answered.append(candles)
+        finally:
+            # Requests that have not started are dropped; running ones finish in
+            # the background and their results are ignored
+            for future in pending:
+                future.cancel()
+        if pending:
+            _metrics.active().inc("composite_ignored_total", len(pending))
+
+        if not answered:
+            detail = "; ".join(f"{name}: {error}" for name, error in errors.items()) or "no candles"
+            raise RuntimeError(f"No exchange returned candles for {symbol} {interval} ({detail})")
+        if len(answered) < needed:
+            logger.warning("Для %s ответили %d из %d бирж", symbol, len(answered), needed)
+        return merge_candles(answered)[-limit:]
+
+    def _fetch_one(
+        self, client: ExchangeClient, symbol: str, interval: str, limit: int, start_time: int | None
+    ) -> CandleSeries:
+        native = self.symbols.get(client.name, {}).get(symbol.upper()) or client.native_symbol(symbol)
+        with _metrics.active().timer("exchange", exchange=client.name):
+            return client.fetch_ohlc(native, client.native_interval(interval), limit=limit, start_time=start_time)
+
+
+def merge_candles(series: Sequence[CandleSeries]) -> CandleSeries:
+    """Volume-weighted consolidation of candle series sharing open times.
+
+    Open times present in only some series are merged from those that have
+    them. Where every reported volume is zero the prices are averaged equally.
+    """
+    if len(series) == 1:
+        return series[0]
+    buckets: Dict[int, List[float]] = {}
+    for candles in series:
+        for timestamp, open_, high, low, close, volume in zip(candles.timestamps, *candles.columns()):
+            bucket = buckets.get(timestamp)
+            if bucket is None:
+                bucket = buckets[timestamp] = [0.0] * 10
+            weight = volume if volume > 0 else 0.0
+            bucket[0] += open_ * weight
+            bucket[1] += high * weight
+            bucket[2] += low * weight
+            bucket[3] += close * weight
+            bucket[4] += weight
+            # Unweighted sums for candles without volume
+            bucket[5] += open_
+            bucket[6] += high
+            bucket[7] += low
+            bucket[8] += close
+            bucket[9] += 1
+
+    merged = CandleSeries()
+    for timestamp in sorted(buckets):
+        bucket = buckets[timestamp]
+        volume = bucket[4]
+        if volume > 0:
+            merged.append(timestamp, bucket[0] / volume, bucket[1] / volume, bucket[2] / volume, bucket[3] / volume, volume)
+        else:
+            count = bucket[9]
+            merged.append(timestamp, bucket[5] / count, bucket[6] / count, bucket[7] / count, bucket[8] / count, 0.0)
+    return merged
+
+
+__all__ = ["CompositeExchangeClient", "merge_candles"]
@@ -1,30 +1,86 @@
 """KuCoin exchange client implementation."""
 from __future__ import annotations
 
-from datetime import datetime
+import time
+from bisect import bisect_left, bisect_right
 from typing import List
 
-from .base import ExchangeClient, OHLCV
+from ..candles import CandleSeries
+from ..transport import KuCoinRateLimiter
+from .base import ExchangeClient, Ticker, _price
+
+# Quote currencies recognised when splitting ``BTCUSDT`` into ``BTC-USDT``
+QUOTE_CURRENCIES = ("USDT", "USDC", "TUSD", "BTC", "ETH", "KCS", "EUR", "DAI", "TRX")
 
 
 class KuCoinClient(ExchangeClient):
     base_url = "https://api.kucoin.com"
+    name = "kucoin"
+    rate_limiter = KuCoinRateLimiter
+    max_limit = 1500
+
+    def server_time(self) -> int:
+        return int(self._request("/api/v1/timestamp", params={})["data"])
+
+    def native_symbol(self, symbol: str) -> str:
+        symbol = symbol.replace("/", "-").upper()
+        if "-" in symbol:
+            return symbol
+        for quote in QUOTE_CURRENCIES:
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                return f"{symbol[: -len(quote)]}-{quote}"
+        raise ValueError(f"Cannot split {symbol!r} into base and quote currency; use BASE-QUOTE")
 
-    def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100) -> List[OHLCV]:
+    def native_interval(self, interval: str) -> str:
+        step = self.interval_ms(interval)
+        for unit, unit_ms in (("week", 604_800_000), ("day", 86_400_000), ("hour", 3_600_000), ("min", 60_000)):
+            if step % unit_ms == 0:
+                return f"{step // unit_ms}{unit}"
+        raise ValueError(f"Unsupported KuCoin interval: {interval!r}")
+
+    def fetch_tickers(self) -> List[Ticker]:
+        data = self._request("/api/v1/market/allTickers", params={}, weight=15)
+        return [
+            Ticker(
+                symbol=row["symbol"],
+                last=_price(row.get("last")) or 0.0,
+                # KuCoin reports the change as a fraction and omits it for inactive markets
+                change_pct=(_price(row.get("changeRate")) or 0.0) * 100,
+                quote_volume=_price(row.get("volValue")) or 0.0,
+                bid=_price(row.get("buy")),
+                ask=_price(row.get("sell")),
+            )
+            for row in data.get("data", {}).get("ticker", [])
+        ]
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        # KuCoin has no limit parameter and otherwise returns up to 1500 candles,
+        # so always ask for the exact time range covering ``limit`` candles.
+        step = self.interval_ms(interval)
+        if start_time is None:
+            now = int(time.time() * 1000)
+            start_time = now - now % step - (limit - 1) * step
+        if end_time is None:
+            end_time = start_time + (limit - 1) * step
         params = {
             "symbol": symbol.upper(),
             "type": interval,
+            "startAt": str(start_time // 1000),
+            "endAt": str((end_time + step) // 1000),
         }
         data = self._request("/api/v1/market/candles", params=params)
-        candles = data.get("data", [])[:limit]
-        return [
-            OHLCV(
-                timestamp=datetime.fromtimestamp(int(item[0])),
-                open=float(item[1]),
-                close=float(item[2]),
-                high=float(item[3]),
-                low=float(item[4]),
-                volume=float(item[5]),
-            )
-            for item in candles
-        ]
+        # KuCoin rows are [time (s), open, close, high, low, volume, turnover], newest first
+        candles = CandleSeries.from_rows(
+            data.get("data", []), open=1, close=2, high=3, low=4, time_unit_ms=1000
+        )
+        candles.reverse()
+        first = bisect_left(candles.timestamps, start_time)
+        last = bisect_right(candles.timestamps, end_time)
+        return candles[first:last][-limit:]
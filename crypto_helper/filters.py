@@ -0,0 +1,484 @@
+"""User-defined signal filters compiled into one shared evaluation plan.
+
+A filter is a boolean expression over candle columns and indicators::
+
+    rsi(14) < 25 and cross_up(ema(21), ema(55)) and volume > sma(volume, 20) * 2
+
+Expressions use Python syntax restricted to numbers, the columns ``open``,
+``high``, ``low``, ``close`` and ``volume``, the functions in
+:data:`FUNCTIONS`, arithmetic, comparisons, ``and``/``or``/``not`` and
+``cross_up``/``cross_down``. Every filter added to a :class:`FilterSet` is
+compiled once into nodes of a single DAG, where identical sub-expressions
+(``ema(close, 21)`` and ``ema(21)`` included) are stored once. Evaluation
+computes each node reachable from the requested filters exactly once, and
+only as many trailing values as its consumers look at; only indicators
+need their inputs in full.
+"""
+from __future__ import annotations
+
+import ast
+import math
+import operator
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+from .candles import CandleSeries
+from .indicators import core
+from .indicators import vectorized
+from .indicators.rolling import rolling_max, rolling_min, rolling_sum
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Node needs: a number of trailing values, or FULL for the whole series
+FULL = -1
+
+
+class FilterError(ValueError):
+    """A filter expression is malformed or uses unknown names."""
+
+
+@dataclass(frozen=True)
+class Function:
+    """An indicator callable from filter expressions.
+
+    ``series`` lists the default column of each series argument the user may
+    override (``ema(volume, 20)``); ``fixed`` lists columns always passed
+    after them. ``compute(source, *series, *params)`` returns the series, or a
+    tuple of series of which ``component`` is selected. ``warmup`` returns how
+    many leading input values produce no output for the given parameters.
+    """
+
+    base: str
+    series: Tuple[str, ...]
+    fixed: Tuple[str, ...]
+    params: Tuple[Tuple[str, Optional[float], type], ...]
+    compute: Callable[..., Any]
+    warmup: Callable[..., int]
+    component: Optional[int] = None
+
+
+def _sma(source: Any, prices: Sequence[float], period: int) -> List[float]:
+    return [total / period for total in rolling_sum(prices, period)]
+
+
+def _function(base: str, series: Tuple[str, ...], fixed: Tuple[str, ...], params, compute, warmup, components=None):
+    if components is None:
+        return {base: Function(base, series, fixed, params, compute, warmup)}
+    return {
+        name: Function(base, series, fixed, params, compute, warmup, index) for index, name in enumerate(components)
+    }
+
+
+FUNCTIONS: Dict[str, Function] = {
+    **_function("ema", ("close",), (), (("period", None, int),), lambda s, x, p: s.ema(x, p), lambda p: p - 1),
+    **_function("sma", ("close",), (), (("period", None, int),), _sma, lambda p: p - 1),
+    **_function("rsi", ("close",), (), (("period", 14, int),), lambda s, x, p: s.rsi(x, p), lambda p: p + 1),
+    **_function(
+        "macd",
+        ("close",),
+        (),
+        (("fast", 12, int), ("slow", 26, int), ("signal", 9, int)),
+        lambda s, x, fast, slow, signal: s.macd(x, fast, slow, signal),
+        lambda fast, slow, signal: slow + signal - 2,
+        ("macd", "macd_signal", "macd_hist"),
+    ),
+    **_function(
+        "bollinger",
+        ("close",),
+        (),
+        (("period", 20, int), ("std", 2.0, float)),
+        lambda s, x, p, k: s.bollinger_bands(x, p, k),
+        lambda p, k: p - 1,
+        ("bollinger_upper", "bollinger_mid", "bollinger_lower"),
+    ),
+    **_function(
+        "atr", (), ("high", "low", "close"), (("period", 14, int),), lambda s, h, l, c, p: core.atr(h, l, c, p), lambda p: p - 1
+    ),
+    **_function(
+        "stochastic",
+        (),
+        ("high", "low", "close"),
+        (("k", 14, int), ("d", 3, int)),
+        lambda s, h, l, c, k, d: core.stochastic(h, l, c, k, d),
+        lambda k, d: k + d - 2,
+        ("stoch_k", "stoch_d"),
+    ),
+    **_function(
+        "vwap",
+        (),
+        ("high", "low", "close", "volume"),
+        (("period", 20, int),),
+        lambda s, h, l, c, v, p: core.vwap(h, l, c, v, p),
+        lambda p: p - 1,
+    ),
+    **_function(
+        "donchian",
+        (),
+        ("high", "low"),
+        (("period", 20, int),),
+        lambda s, h, l, p: core.donchian_channels(h, l, p),
+        lambda p: p - 1,
+        ("donchian_upper", "donchian_mid", "donchian_lower"),
+    ),
+    **_function("obv", (), ("close", "volume"), (), lambda s, c, v: core.obv(c, v), lambda: 0),
+    **_function("highest", ("high",), (), (("period", None, int),), lambda s, x, p: rolling_max(x, p), lambda p: p - 1),
+    **_function("lowest", ("low",), (), (("period", None, int),), lambda s, x, p: rolling_min(x, p), lambda p: p - 1),
+}
+
+_BINARY = {ast.Add: ("add", operator.add), ast.Sub: ("sub", operator.sub), ast.Mult: ("mul", operator.mul), ast.Div: ("div", None)}
+_COMPARE = {
+    ast.Lt: ("lt", operator.lt),
+    ast.LtE: ("le", operator.le),
+    ast.Gt: ("gt", operator.gt),
+    ast.GtE: ("ge", operator.ge),
+    ast.Eq: ("eq", operator.eq),
+    ast.NotEq: ("ne", operator.ne),
+}
+_COMMUTATIVE = {"add", "mul", "eq", "ne", "and", "or"}
+
+
+def _divide(left: float, right: float) -> float:
+    return left / right if right else math.nan
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {name: function for name, function in _BINARY.values() if function}
+_OPERATORS["div"] = _divide
+_OPERATORS.update({name: function for name, function in _COMPARE.values()})
+_OPERATORS["and"] = lambda left, right: bool(left) and bool(right)
+_OPERATORS["or"] = lambda left, right: bool(left) or bool(right)
+
+
+@dataclass
+class _Node:
+    op: str
+    args: Tuple[int, ...]
+    value: Any = None  # constant, column name, operator name or (Function, params)
+    need: int = 0
+    warmup: int = 0
+
+
+def _more(need: int, other: int) -> int:
+    """The more demanding of two needs; FULL beats any count."""
+    if need == FULL or other == FULL:
+        return FULL
+    return max(need, other)
+
+
+class FilterSet:
+    """Named filters sharing one compiled plan.
+
+    ``source`` passed to :meth:`evaluate` supplies ``ema``, ``rsi``, ``macd``
+    and ``bollinger_bands`` over close prices with the signatures of
+    :mod:`.indicators.vectorized` (e.g. a :class:`~.multitenant.MarketIndicators`).
+    """
+
+    def __init__(self, filters: Mapping[str, str] | None = None) -> None:
+        self._nodes: List[_Node] = []
+        self._index: Dict[tuple, int] = {}
+        self.expressions: Dict[str, str] = {}
+        self.roots: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for name, expression in (filters or {}).items():
+            self.add(name, expression)
+
+    def __len__(self) -> int:
+        return len(self.roots)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.roots
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def add(self, name: str, expression: str) -> None:
+        """Compile ``expression`` into the plan under ``name``."""
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as error:
+            raise FilterError(f"Invalid filter {name!r}: {error.msg}") from None
+        with self._lock:
+            root = self._compile(tree.body)
+            if self._nodes[root].op in ("const", "column"):
+                raise FilterError(f"Filter {name!r} must be a condition, not a single value")
+            self._demand(root, 1)
+            self.expressions[name] = expression.strip()
+            self.roots[name] = root
+
+    def required_candles(self, names: Iterable[str] | None = None) -> int:
+        """Candles needed for every node of the given filters to have a value."""
+        required = 1
+        for name in self._names(names):
+            node = self._nodes[self.roots[name]]
+            required = max(required, node.warmup + node.need)
+        return required
+
+    def evaluate(
+        self,
+        candles: CandleSeries,
+        names: Iterable[str] | None = None,
+        source: Any = None,
+        memo: MutableMapping[int, Any] | None = None,
+    ) -> Dict[str, bool]:
+        """Whether each filter holds on the last candle.
+
+        ``memo`` caches node values; pass the same mapping when evaluating
+        different filters on the same candles to share their sub-expressions.
+        Filters whose indicators lack history evaluate to ``False``.
+        """
+        source = vectorized if source is None else source
+        memo = {} if memo is None else memo
+        results: Dict[str, bool] = {}
+        for name in self._names(names):
+            value = self._value(self.roots[name], candles, source, memo)
+            results[name] = _last_truth(value)
+        return results
+
+    def _names(self, names: Iterable[str] | None) -> Iterable[str]:
+        if names is None:
+            return list(self.roots)
+        names = list(names)
+        for name in names:
+            if name not in self.roots:
+                raise KeyError(f"Unknown filter {name!r}")
+        return names
+
+    # Compilation
+
+    def _intern(self, op: str, args: Tuple[int, ...], value: Any = None) -> int:
+        if op == "operator" and value in _COMMUTATIVE:
+            args = tuple(sorted(args))
+        key = (op, args, value if op != "function" else (value[0].base, value[0].component, value[1]))
+        index = self._index.get(key)
+        if index is None:
+            warmup = max((self._nodes[arg].warmup for arg in args), default=0)
+            if op == "function":
+                function, params = value
+                warmup += function.warmup(*params)
+            elif op == "cross":
+                warmup += 1
+            index = len(self._nodes)
+            self._nodes.append(_Node(op, args, value, warmup=warmup))
+            self._index[key] = index
+        return index
+
+    def _demand(self, index: int, need: int) -> None:
+        node = self._nodes[index]
+        combined = _more(node.need, need)
+        if combined == node.need and node.need:
+            return
+        node.need = combined
+        if node.op == "function":
+            child_need = FULL
+        elif node.op == "cross":
+            child_need = FULL if combined == FULL else combined + 1
+        else:
+            child_need = combined
+        for arg in node.args:
+            self._demand(arg, child_need)
+
+    def _compile(self, node: ast.AST) -> int:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return self._intern("const", (), float(node.value))
+        if isinstance(node, ast.Name):
+            if node.id not in COLUMNS:
+                raise FilterError(f"Unknown name {node.id!r}; columns are {', '.join(COLUMNS)}")
+            return self._intern("column", (), node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = node.operand
+            if isinstance(operand, ast.Constant) and isinstance(operand.value, (int, float)):
+                return self._intern("const", (), -float(operand.value))
+            return self._intern("operator", (self._intern("const", (), -1.0), self._compile(operand)), "mul")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return self._intern("not", (self._compile(node.operand),))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            name = _BINARY[type(node.op)][0]
+            return self._intern("operator", (self._compile(node.left), self._compile(node.right)), name)
+        if isinstance(node, ast.BoolOp):
+            name = "and" if isinstance(node.op, ast.And) else "or"
+            result = self._compile(node.values[0])
+            for value in node.values[1:]:
+                result = self._intern("operator", (result, self._compile(value)), name)
+            return result
+        if isinstance(node, ast.Compare):
+            left = self._compile(node.left)
+            result = None
+            for op, comparator in zip(node.ops, node.comparators):
+                if type(op) not in _COMPARE:
+                    raise FilterError(f"Unsupported comparison {type(op).__name__}")
+                right = self._compile(comparator)
+                comparison = self._intern("operator", (left, right), _COMPARE[type(op)][0])
+                result = comparison if result is None else self._intern("operator", (result, comparison), "and")
+                left = right
+            return result
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            return self._compile_call(node.func.id, node.args, node.keywords)
+        raise FilterError(f"Unsupported syntax: {ast.unparse(node)!r}")
+
+    def _compile_call(self, name: str, args: List[ast.expr], keywords: List[ast.keyword]) -> int:
+        if name in ("cross_up", "cross_down"):
+            if len(args) != 2 or keywords:
+                raise FilterError(f"{name}() takes exactly two series")
+            first, second = (self._compile(arg) for arg in args)
+            if name == "cross_down":
+                first, second = second, first
+            return self._intern("cross", (first, second))
+
+        function = FUNCTIONS.get(name)
+        if function is None:
+            raise FilterError(f"Unknown function {name!r}")
+        args = list(args)
+        series: List[int] = []
+        for default in function.series:
+            # A leading argument that is not a number overrides the default column
+            if args and not _is_number(args[0]):
+                series.append(self._compile(args.pop(0)))
+            else:
+                series.append(self._intern("column", (), default))
+        series.extend(self._intern("column", (), column) for column in function.fixed)
+
+        if len(args) > len(function.params):
+            raise FilterError(f"{name}() takes at most {len(function.params)} parameters")
+        values: Dict[str, float] = {}
+        for (param, _, _), arg in zip(function.params, args):
+            values[param] = _number(arg, name)
+        known = {param for param, _, _ in function.params}
+        for keyword in keywords:
+            if keyword.arg not in known or keyword.arg in values:
+                raise FilterError(f"{name}() got an unexpected or repeated parameter {keyword.arg!r}")
+            values[keyword.arg] = _number(keyword.value, name)
+        params = []
+        for param, default, kind in function.params:
+            value = values.get(param, default)
+            if value is None:
+                raise FilterError(f"{name}() requires the {param!r} parameter")
+            if kind is int:
+                if value != int(value) or value <= 0:
+                    raise FilterError(f"{name}() parameter {param!r} must be a positive integer")
+                value = int(value)
+            params.append(value)
+        return self._intern("function", tuple(series), (function, tuple(params)))
+
+    # Evaluation
+
+    def _value(self, index: int, candles: CandleSeries, source: Any, memo: MutableMapping[int, Any]) -> Any:
+        if index in memo:
+            return memo[index]
+        node = self._nodes[index]
+        args = [self._value(arg, candles, source, memo) for arg in node.args]
+        if node.op == "const":
+            value = node.value
+        elif node.op == "column":
+            value = getattr(candles, node.value)
+        elif any(arg is None for arg in args):
+            value = None
+        elif node.op == "function":
+            value = self._call(node, args, candles, source, memo)
+        elif node.op == "operator":
+            value = _elementwise(_OPERATORS[node.value], args, node.need)
+        elif node.op == "not":
+            value = _elementwise(lambda item: not item, args, node.need)
+        else:  # cross
+            value = _cross(args[0], args[1], node.need)
+        memo[index] = value
+        return value
+
+    def _call(self, node: _Node, args: List[Any], candles: CandleSeries, source: Any, memo: MutableMapping[int, Any]) -> Any:
+        function, params = node.value
+        # The shared source caches indicators of the close prices only
+        closes_only = all(self._nodes[arg].op == "column" and self._nodes[arg].value == "close" for arg in node.args)
+        provider = source if closes_only and function.series else vectorized
+        key = ("function", function.base, node.args, params)
+        if key in memo:
+            result = memo[key]
+        else:
+            try:
+                result = function.compute(provider, *args, *params)
+            except ValueError:
+                result = None
+            memo[key] = result
+        if result is None or function.component is None:
+            return result
+        return result[function.component]
+
+
+def parse_filters(specs: Iterable[str]) -> Dict[str, str]:
+    """Expand ``--filter`` values into ``{name: expression}``.
+
+    A value is ``name: expression``, a bare expression (named ``filterN``) or
+    ``@path`` to a file with one such entry per line and ``#`` comments.
+    """
+    entries: List[str] = []
+    for spec in specs:
+        if spec.startswith("@"):
+            with open(spec[1:], encoding="utf-8") as handle:
+                entries.extend(line.split("#", 1)[0].strip() for line in handle)
+        else:
+            entries.append(spec.strip())
+    filters = {}
+    for number, entry in enumerate(filter(None, entries), 1):
+        name, separator, expression = entry.partition(":")
+        if not separator:
+            name, expression = f"filter{number}", entry
+        filters[name.strip()] = expression.strip()
+    return filters
+
+
+def _is_number(node: ast.expr) -> bool:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        node = node.operand
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+
+
+def _number(node: ast.expr, function: str) -> float:
+    if not _is_number(node):
+        raise FilterError(f"{function}() parameters must be numbers")
+    return float(ast.literal_eval(node))
+
+
+def _is_series(value: Any) -> bool:
+    return hasattr(value, "__len__")
+
+
+def _tail(value: Any, count: int) -> Any:
+    if not _is_series(value):
+        return value
+    return value if count == FULL or count >= len(value) else value[len(value) - count :]
+
+
+def _elementwise(function: Callable[..., Any], args: List[Any], need: int) -> Any:
+    """Apply ``function`` over the trailing ``need`` values of the series arguments, aligned at the end."""
+    lengths = [len(arg) for arg in args if _is_series(arg)]
+    if not lengths:
+        return function(*args)
+    length = min(lengths) if need == FULL else min(min(lengths), need)
+    columns = [
+        _tail(arg, length) if _is_series(arg) else [arg] * length
+        for arg in args
+    ]
+    return [function(*values) for values in zip(*columns)]
+
+
+def _cross(first: Any, second: Any, need: int) -> Any:
+    # True where ``first`` moved from below ``second`` to above it
+    count = len(first) if _is_series(first) else math.inf
+    if _is_series(second):
+        count = min(count, len(second))
+    if count == math.inf or count < 2:
+        return [False] * (1 if need == FULL else need)
+    length = count - 1 if need == FULL else min(need, count - 1)
+    first = _tail(first, length + 1) if _is_series(first) else [first] * (length + 1)
+    second = _tail(second, length + 1) if _is_series(second) else [second] * (length + 1)
+    return [first[i] < second[i] and first[i + 1] > second[i + 1] for i in range(length)]
+
+
+def _last_truth(value: Any) -> bool:
+    if value is None:
+        return False
+    if _is_series(value):
+        return bool(len(value)) and bool(value[-1])
+    return bool(value)
+
+
+__all__ = ["COLUMNS", "FUNCTIONS", "FilterError", "FilterSet", "Function", "parse_filters"]
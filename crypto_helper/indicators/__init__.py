@@ -1,4 +1,21 @@
 """Indicator utilities."""
-from .core import bollinger_bands, ema, macd, rsi
+from .core import atr, bollinger_bands, donchian_channels, ema, macd, macd_from_ema, obv, rsi, stochastic, vwap
+from .incremental import BollingerState, EMAState, IndicatorSet, MACDState, RSIState
 
-__all__ = ["bollinger_bands", "ema", "macd", "rsi"]
+__all__ = [
+    "atr",
+    "bollinger_bands",
+    "donchian_channels",
+    "ema",
+    "macd",
+    "macd_from_ema",
+    "obv",
+    "rsi",
+    "stochastic",
+    "vwap",
+    "BollingerState",
+    "EMAState",
+    "IndicatorSet",
+    "MACDState",
+    "RSIState",
+]
@@ -5,6 +5,8 @@ from collections.abc import Sequence
 from dataclasses import dataclass
 from typing import List
 
+from .rolling import RollingMax, RollingMin, RollingMoments, RollingSum
+
 
 @dataclass
 class IndicatorResult:
@@ -65,8 +67,11 @@ def macd(prices: Sequence[float], fast_period: int = 12, slow_period: int = 26,
     if len(prices) <= slow_period:
         raise ValueError("Not enough price data for MACD")
 
-    fast_ema = ema(prices, fast_period)
-    slow_ema = ema(prices, slow_period)
+    return macd_from_ema(ema(prices, fast_period), ema(prices, slow_period), signal_period)
+
+
+def macd_from_ema(fast_ema: Sequence[float], slow_ema: Sequence[float], signal_period: int = 9) -> tuple[List[float], List[float], List[float]]:
+    """MACD from already computed fast and slow EMAs of the same prices."""
     macd_line = [f - s for f, s in zip(fast_ema[-len(slow_ema):], slow_ema)]
     signal_line = ema(macd_line, signal_period)
     histogram = [m - s for m, s in zip(macd_line[-len(signal_line):], signal_line)]
@@ -83,13 +88,118 @@ def bollinger_bands(prices: Sequence[float], period: int = 20, num_std_dev: floa
     upper_band = []
     lower_band = []
 
-    for i in range(len(prices) - period + 1):
-        window = prices[i : i + period]
-        mean = sum(window) / period
-        variance = sum((price - mean) ** 2 for price in window) / period
+    moments = RollingMoments(period)
+    for price in prices:
+        window = moments.update(price)
+        if window is None:
+            continue
+        mean, variance = window
         std_dev = variance ** 0.5
         mid_band.append(mean)
         upper_band.append(mean + num_std_dev * std_dev)
         lower_band.append(mean - num_std_dev * std_dev)
 
     return upper_band, mid_band, lower_band
+
+
+def _check_columns(period: int, length: int, name: str, *columns: Sequence[float]) -> None:
+    if period <= 0:
+        raise ValueError(f"{name} period must be positive")
+    if any(len(column) != len(columns[0]) for column in columns):
+        raise ValueError(f"{name} inputs must have the same length")
+    if len(columns[0]) < length:
+        raise ValueError(f"Not enough price data for {name}")
+
+
+def atr(high: Sequence[float], low: Sequence[float], close: Sequence[float], period: int = 14) -> List[float]:
+    """Average True Range with Wilder's smoothing, seeded with the mean of the first ``period`` ranges."""
+    _check_columns(period, period, "ATR", high, low, close)
+    ranges = [high[0] - low[0]]
+    for i in range(1, len(close)):
+        previous = close[i - 1]
+        ranges.append(max(high[i] - low[i], abs(high[i] - previous), abs(low[i] - previous)))
+
+    average = sum(ranges[:period]) / period
+    atr_values = [average]
+    for true_range in ranges[period:]:
+        average = (average * (period - 1) + true_range) / period
+        atr_values.append(average)
+    return atr_values
+
+
+def stochastic(
+    high: Sequence[float], low: Sequence[float], close: Sequence[float], k_period: int = 14, d_period: int = 3
+) -> tuple[List[float], List[float]]:
+    """Stochastic oscillator: ``%K`` over ``k_period`` candles and its ``d_period`` SMA ``%D``."""
+    _check_columns(k_period, k_period + d_period - 1, "Stochastic", high, low, close)
+    if d_period <= 0:
+        raise ValueError("Stochastic %D period must be positive")
+    highest, lowest = RollingMax(k_period), RollingMin(k_period)
+    d_sum = RollingSum(d_period)
+    k_values: List[float] = []
+    d_values: List[float] = []
+    for price_high, price_low, price in zip(high, low, close):
+        top = highest.update(price_high)
+        bottom = lowest.update(price_low)
+        if top is None:
+            continue
+        k = 50.0 if top == bottom else 100 * (price - bottom) / (top - bottom)
+        k_values.append(k)
+        total = d_sum.update(k)
+        if total is not None:
+            d_values.append(total / d_period)
+    return k_values, d_values
+
+
+def vwap(
+    high: Sequence[float], low: Sequence[float], close: Sequence[float], volume: Sequence[float], period: int = 20
+) -> List[float]:
+    """Rolling VWAP of the typical price ``(high + low + close) / 3`` over ``period`` candles.
+
+    Windows without volume fall back to the mean typical price.
+    """
+    _check_columns(period, period, "VWAP", high, low, close, volume)
+    weighted, volumes, typical_sum = RollingSum(period), RollingSum(period), RollingSum(period)
+    vwap_values: List[float] = []
+    for price_high, price_low, price, amount in zip(high, low, close, volume):
+        typical = (price_high + price_low + price) / 3
+        traded = weighted.update(typical * amount)
+        total = volumes.update(amount)
+        typical_total = typical_sum.update(typical)
+        if traded is None:
+            continue
+        vwap_values.append(traded / total if total > 0 else typical_total / period)
+    return vwap_values
+
+
+def donchian_channels(high: Sequence[float], low: Sequence[float], period: int = 20) -> tuple[List[float], List[float], List[float]]:
+    """Highest high, midpoint and lowest low of the last ``period`` candles."""
+    _check_columns(period, period, "Donchian channels", high, low)
+    upper = RollingMax(period).update
+    lower = RollingMin(period).update
+    upper_band: List[float] = []
+    mid_band: List[float] = []
+    lower_band: List[float] = []
+    for price_high, price_low in zip(high, low):
+        top = upper(price_high)
+        bottom = lower(price_low)
+        if top is None:
+            continue
+        upper_band.append(top)
+        mid_band.append((top + bottom) / 2)
+        lower_band.append(bottom)
+    return upper_band, mid_band, lower_band
+
+
+def obv(close: Sequence[float], volume: Sequence[float]) -> List[float]:
+    """On-balance volume, starting from zero at the first candle."""
+    _check_columns(1, 1, "OBV", close, volume)
+    total = 0.0
+    obv_values = [total]
+    for i in range(1, len(close)):
+        if close[i] > close[i - 1]:
+            total += volume[i]
+        elif close[i] < close[i - 1]:
+            total -= volume[i]
+        obv_values.append(total)
+    return obv_values
@@ -0,0 +1,246 @@
+"""Stateful indicator calculations updated in constant time per candle.
+
+Each state mirrors the batch function of the same name in :mod:`.core` and
+produces bit-for-bit identical values, so a state seeded from history and then
+fed new prices one by one agrees with a full recomputation over the series.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from typing import Deque, List, Optional, Tuple
+
+from .rolling import RollingMoments
+
+
+class EMAState:
+    """Exponential moving average seeded with the SMA of the first ``period`` prices."""
+
+    __slots__ = ("period", "multiplier", "value", "_count", "_total")
+
+    def __init__(self, period: int) -> None:
+        if period <= 0:
+            raise ValueError("EMA period must be positive")
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.value: Optional[float] = None
+        self._count = 0
+        self._total = 0
+
+    @classmethod
+    def from_history(cls, prices: Iterable[float], period: int) -> "EMAState":
+        state = cls(period)
+        state.extend(prices)
+        return state
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def extend(self, prices: Iterable[float]) -> List[float]:
+        return [value for value in map(self.update, prices) if value is not None]
+
+    def update(self, price: float) -> Optional[float]:
+        if self.value is None:
+            self._count += 1
+            self._total += price
+            if self._count == self.period:
+                self.value = self._total / self.period
+            return self.value
+        self.value = (price - self.value) * self.multiplier + self.value
+        return self.value
+
+
+class RSIState:
+    """Wilder-smoothed RSI matching :func:`.core.rsi`.
+
+    The first ``period`` price changes only seed the averages; a value is
+    emitted from the ``period + 1``-th change onwards.
+    """
+
+    __slots__ = ("period", "value", "_previous", "_gains", "_losses", "_avg_gain", "_avg_loss")
+
+    def __init__(self, period: int = 14) -> None:
+        if period <= 0:
+            raise ValueError("RSI period must be positive")
+        self.period = period
+        self.value: Optional[float] = None
+        self._previous: Optional[float] = None
+        self._gains: List[float] = []
+        self._losses: List[float] = []
+        self._avg_gain: Optional[float] = None
+        self._avg_loss: Optional[float] = None
+
+    @classmethod
+    def from_history(cls, prices: Iterable[float], period: int = 14) -> "RSIState":
+        state = cls(period)
+        state.extend(prices)
+        return state
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def extend(self, prices: Iterable[float]) -> List[float]:
+        return [value for value in map(self.update, prices) if value is not None]
+
+    def update(self, price: float) -> Optional[float]:
+        previous, self._previous = self._previous, price
+        if previous is None:
+            return None
+        change = price - previous
+        gain = max(change, 0)
+        loss = abs(min(change, 0))
+
+        if self._avg_gain is None or self._avg_loss is None:
+            self._gains.append(gain)
+            self._losses.append(loss)
+            if len(self._gains) == self.period:
+                self._avg_gain = sum(self._gains) / self.period
+                self._avg_loss = sum(self._losses) / self.period
+                self._gains = []
+                self._losses = []
+            return None
+
+        period = self.period
+        self._avg_gain = (self._avg_gain * (period - 1) + gain) / period
+        self._avg_loss = (self._avg_loss * (period - 1) + loss) / period
+        if self._avg_loss == 0:
+            rs = float("inf")
+        else:
+            rs = self._avg_gain / self._avg_loss
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class MACDState:
+    """MACD line, signal line and histogram matching :func:`.core.macd`."""
+
+    __slots__ = ("fast", "slow", "signal", "value")
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        if slow_period <= fast_period:
+            raise ValueError("Slow period must be greater than fast period")
+        self.fast = EMAState(fast_period)
+        self.slow = EMAState(slow_period)
+        self.signal = EMAState(signal_period)
+        self.value: Optional[Tuple[float, float, float]] = None
+
+    @classmethod
+    def from_history(
+        cls,
+        prices: Iterable[float],
+        fast_period: int = 12,
+        slow_period: int = 26,
+        signal_period: int = 9,
+    ) -> "MACDState":
+        state = cls(fast_period, slow_period, signal_period)
+        state.extend(prices)
+        return state
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def extend(self, prices: Iterable[float]) -> List[Tuple[float, float, float]]:
+        return [value for value in map(self.update, prices) if value is not None]
+
+    def update(self, price: float) -> Optional[Tuple[float, float, float]]:
+        fast_value = self.fast.update(price)
+        slow_value = self.slow.update(price)
+        if slow_value is None or fast_value is None:
+            return None
+        macd_value = fast_value - slow_value
+        signal_value = self.signal.update(macd_value)
+        if signal_value is None:
+            return None
+        self.value = (macd_value, signal_value, macd_value - signal_value)
+        return self.value
+
+
+class BollingerState:
+    """Rolling Bollinger Bands over the last ``period`` prices.
+
+    Returns ``(upper, mid, lower)`` like :func:`.core.bollinger_bands`. The cost
+    of an update depends on the window length only, never on the history.
+    """
+
+    __slots__ = ("period", "num_std_dev", "value", "_moments")
+
+    def __init__(self, period: int = 20, num_std_dev: float = 2.0) -> None:
+        if period <= 0:
+            raise ValueError("Period must be positive")
+        self.period = period
+        self.num_std_dev = num_std_dev
+        self.value: Optional[Tuple[float, float, float]] = None
+        self._moments = RollingMoments(period)
+
+    @classmethod
+    def from_history(cls, prices: Iterable[float], period: int = 20, num_std_dev: float = 2.0) -> "BollingerState":
+        state = cls(period, num_std_dev)
+        state.extend(prices)
+        return state
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def extend(self, prices: Iterable[float]) -> List[Tuple[float, float, float]]:
+        return [value for value in map(self.update, prices) if value is not None]
+
+    def update(self, price: float) -> Optional[Tuple[float, float, float]]:
+        window = self._moments.update(price)
+        if window is None:
+            return None
+        mean, variance = window
+        std_dev = variance ** 0.5
+        self.value = (mean + self.num_std_dev * std_dev, mean, mean - self.num_std_dev * std_dev)
+        return self.value
+
+
+class IndicatorSet:
+    """Bundle of indicator states driven by closed candles.
+
+    Keeps the last two values of every series that the detectors in
+    :mod:`crypto_helper.patterns` look at, so signals can be evaluated without
+    the full history.
+    """
+
+    def __init__(
+        self,
+        ema_fast: int = 50,
+        ema_slow: int = 200,
+        rsi_period: int = 14,
+        bollinger_period: int = 20,
+        bollinger_std_dev: float = 2.0,
+    ) -> None:
+        self.fast_ema = EMAState(ema_fast)
+        self.slow_ema = EMAState(ema_slow)
+        self.rsi = RSIState(rsi_period)
+        self.macd = MACDState()
+        self.bollinger = BollingerState(bollinger_period, bollinger_std_dev)
+        self.fast_ema_tail: Deque[float] = deque(maxlen=2)
+        self.slow_ema_tail: Deque[float] = deque(maxlen=2)
+        self.close_tail: Deque[float] = deque(maxlen=2)
+        self.candles = 0
+
+    def update(self, candle) -> None:
+        """Feed one closed candle (anything with a ``close`` attribute)."""
+        self.update_price(candle.close)
+
+    def update_price(self, price: float) -> None:
+        self.candles += 1
+        self.close_tail.append(price)
+        fast = self.fast_ema.update(price)
+        if fast is not None:
+            self.fast_ema_tail.append(fast)
+        slow = self.slow_ema.update(price)
+        if slow is not None:
+            self.slow_ema_tail.append(slow)
+        self.rsi.update(price)
+        self.macd.update(price)
+        self.bollinger.update(price)
+
+    def extend(self, candles: Iterable) -> None:
+        for candle in candles:
+            self.update(candle)
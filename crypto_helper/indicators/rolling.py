@@ -0,0 +1,190 @@
+"""Sliding-window kernels whose cost per value does not depend on the window.
+
+Window statistics are updated as one value enters and one leaves, so a
+200-period window over 1m candles costs the same as a 5-period one:
+
+* :class:`RollingMoments` keeps the mean and variance with Welford's
+  update, resynchronised from the window every so often so rounding errors
+  cannot accumulate over long series.
+* :class:`RollingSum` keeps a compensated (Neumaier) running sum.
+* :class:`RollingMax` and :class:`RollingMin` keep a monotonic deque, so each
+  value is pushed and popped at most once.
+
+Batch helpers apply a kernel over a whole series; the incremental indicator
+states use the same kernels, so both produce identical values.
+"""
+from __future__ import annotations
+
+import operator
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import Deque, List, Optional, Tuple
+
+# Recompute the moments from the window after this many slides (at least one window)
+RESYNC_INTERVAL = 1024
+
+
+def _check_period(period: int) -> None:
+    if period <= 0:
+        raise ValueError("Period must be positive")
+
+
+class RollingMoments:
+    """Mean and population variance of the last ``period`` values."""
+
+    __slots__ = ("period", "mean", "_m2", "_window", "_slides", "_resync")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._window: Deque[float] = deque()
+        self._slides = 0
+        self._resync = max(RESYNC_INTERVAL, period)
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    @property
+    def variance(self) -> float:
+        return max(self._m2 / len(self._window), 0.0) if self._window else 0.0
+
+    def update(self, value: float) -> Optional[Tuple[float, float]]:
+        """Add ``value``; returns ``(mean, variance)`` once the window is full."""
+        window = self._window
+        window.append(value)
+        if len(window) <= self.period:
+            if len(window) < self.period:
+                return None
+            self._exact()
+            return self.mean, self.variance
+        removed = window.popleft()
+        self._slides += 1
+        if self._slides >= self._resync:
+            self._exact()
+        else:
+            previous = self.mean
+            delta = value - removed
+            self.mean += delta / self.period
+            self._m2 += delta * (value - self.mean + removed - previous)
+        return self.mean, self.variance
+
+    def _exact(self) -> None:
+        # Two-pass moments from the window itself
+        self._slides = 0
+        window = self._window
+        mean = sum(window) / len(window)
+        self.mean = mean
+        self._m2 = sum((value - mean) ** 2 for value in window)
+
+
+class RollingSum:
+    """Compensated sum of the last ``period`` values."""
+
+    __slots__ = ("period", "_total", "_compensation", "_window")
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        self._total = 0.0
+        self._compensation = 0.0
+        self._window: Deque[float] = deque()
+
+    @property
+    def ready(self) -> bool:
+        return len(self._window) == self.period
+
+    @property
+    def value(self) -> float:
+        return self._total + self._compensation
+
+    def _add(self, value: float) -> None:
+        total = self._total + value
+        if abs(self._total) >= abs(value):
+            self._compensation += (self._total - total) + value
+        else:
+            self._compensation += (value - total) + self._total
+        self._total = total
+
+    def update(self, value: float) -> Optional[float]:
+        """Add ``value``; returns the window sum once the window is full."""
+        self._window.append(value)
+        self._add(value)
+        if len(self._window) > self.period:
+            self._add(-self._window.popleft())
+        return self.value if len(self._window) == self.period else None
+
+
+class _RollingExtremum:
+    __slots__ = ("period", "_candidates", "_index")
+
+    # Whether a new value makes an older candidate obsolete (a builtin, so it is not bound)
+    _dominates = operator.ge
+
+    def __init__(self, period: int) -> None:
+        _check_period(period)
+        self.period = period
+        # (index, value) pairs; values are monotonic from oldest to newest
+        self._candidates: Deque[Tuple[int, float]] = deque()
+        self._index = 0
+
+    def update(self, value: float) -> Optional[float]:
+        """Add ``value``; returns the window extremum once the window is full."""
+        candidates = self._candidates
+        while candidates and self._dominates(value, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self._index, value))
+        if candidates[0][0] <= self._index - self.period:
+            candidates.popleft()
+        self._index += 1
+        return candidates[0][1] if self._index >= self.period else None
+
+
+class RollingMax(_RollingExtremum):
+    """Maximum of the last ``period`` values."""
+
+    __slots__ = ()
+    _dominates = operator.ge
+
+
+class RollingMin(_RollingExtremum):
+    """Minimum of the last ``period`` values."""
+
+    __slots__ = ()
+    _dominates = operator.le
+
+
+def _apply(kernel, values: Iterable[float]) -> list:
+    return [result for result in map(kernel.update, values) if result is not None]
+
+
+def rolling_mean_variance(values: Sequence[float], period: int) -> Tuple[List[float], List[float]]:
+    """Means and population variances of every full ``period`` window."""
+    moments = _apply(RollingMoments(period), values)
+    return [mean for mean, _ in moments], [variance for _, variance in moments]
+
+
+def rolling_sum(values: Sequence[float], period: int) -> List[float]:
+    return _apply(RollingSum(period), values)
+
+
+def rolling_max(values: Sequence[float], period: int) -> List[float]:
+    return _apply(RollingMax(period), values)
+
+
+def rolling_min(values: Sequence[float], period: int) -> List[float]:
+    return _apply(RollingMin(period), values)
+
+
+__all__ = [
+    "RollingMax",
+    "RollingMin",
+    "RollingMoments",
+    "RollingSum",
+    "rolling_max",
+    "rolling_mean_variance",
+    "rolling_min",
+    "rolling_sum",
+]
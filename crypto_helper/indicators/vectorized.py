@@ -0,0 +1,180 @@
+"""Array-based indicator backend selected automatically when NumPy is installed.
+
+The functions mirror :mod:`.core` and accept either a 1D series of closes or a
+2D ``symbols x candles`` matrix, in which case every row is computed in the
+same call. Without NumPy they fall back to the pure-Python implementations
+(applied row by row for 2D input) and return lists.
+
+Recursive indicators (EMA, RSI) cannot be vectorised along time. For a single
+series EMA hands the input straight to the pure-Python loop and returns its
+list (NumPy arrays are converted first, as stepping through NumPy scalars is
+slower than through floats); RSI computes the price changes with NumPy and
+only runs the smoothing as a loop over floats, returning a list as well. For a
+matrix the recursion is vectorised across symbols.
+"""
+from __future__ import annotations
+
+from typing import Any, List
+
+from .._compat import numpy as np
+from . import core
+
+BACKEND = "numpy" if np is not None else "python"
+
+
+def _is_matrix(prices: Any) -> bool:
+    return len(prices) > 0 and hasattr(prices[0], "__len__")
+
+
+def as_array(prices: Any):
+    """Return ``prices`` as a float64 NumPy array, without copying when possible."""
+    if isinstance(prices, np.ndarray) and prices.dtype == np.float64:
+        return prices
+    if isinstance(prices, (memoryview, bytes, bytearray)) or getattr(prices, "typecode", None) == "d":
+        return np.frombuffer(prices, dtype=np.float64)
+    return np.asarray(prices, dtype=np.float64)
+
+
+def _python_series(prices: Any) -> Any:
+    """``prices`` in a form the pure-Python loops iterate quickly."""
+    return prices.tolist() if np is not None and isinstance(prices, np.ndarray) else prices
+
+
+def _check_length(array, minimum: int, message: str) -> None:
+    if array.ndim not in (1, 2):
+        raise ValueError("Prices must be a 1D series or a 2D symbols x candles matrix")
+    if array.shape[-1] < minimum:
+        raise ValueError(message)
+
+
+def _ema_rows(values, period: int):
+    """EMA along the last axis of a 2D array, vectorised across rows."""
+    multiplier = 2 / (period + 1)
+    count = values.shape[-1]
+    out = np.empty((values.shape[0], count - period + 1), dtype=np.float64)
+    # cumsum adds left to right, so the seed equals ``sum(prices[:period])``
+    current = np.cumsum(values[:, :period], axis=-1)[:, -1] / period
+    out[:, 0] = current
+    for index in range(period, count):
+        current = (values[:, index] - current) * multiplier + current
+        out[:, index - period + 1] = current
+    return out
+
+
+def ema(prices: Any, period: int):
+    if not _is_matrix(prices):
+        return core.ema(_python_series(prices), period)
+    if np is None:
+        return [core.ema(row, period) for row in prices]
+
+    if period <= 0:
+        raise ValueError("EMA period must be positive")
+    values = as_array(prices)
+    _check_length(values, period, "Not enough price data for EMA")
+    return _ema_rows(values, period)
+
+
+def _rsi_series(gains: List[float], losses: List[float], period: int) -> List[float]:
+    """Wilder smoothing of one series' gains and losses, the loop of :func:`.core.rsi`."""
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    rsi_values = []
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        rs = float("inf") if avg_loss == 0 else avg_gain / avg_loss
+        rsi_values.append(100 - (100 / (1 + rs)))
+    return rsi_values
+
+
+def rsi(prices: Any, period: int = 14):
+    if np is None:
+        if _is_matrix(prices):
+            return [core.rsi(row, period) for row in prices]
+        return core.rsi(prices, period)
+
+    if period <= 0:
+        raise ValueError("RSI period must be positive")
+    values = as_array(prices)
+    _check_length(values, period + 1, "Not enough price data for RSI")
+
+    changes = np.diff(values, axis=-1)
+    gains = np.maximum(changes, 0)
+    losses = np.abs(np.minimum(changes, 0))
+    if values.ndim == 1:
+        return _rsi_series(gains.tolist(), losses.tolist(), period)
+    avg_gain = np.cumsum(gains[:, :period], axis=-1)[:, -1] / period
+    avg_loss = np.cumsum(losses[:, :period], axis=-1)[:, -1] / period
+
+    steps = changes.shape[-1]
+    out = np.empty((values.shape[0], max(steps - period, 0)), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for index in range(period, steps):
+            avg_gain = (avg_gain * (period - 1) + gains[:, index]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[:, index]) / period
+            rs = np.where(avg_loss == 0, np.inf, avg_gain / avg_loss)
+            out[:, index - period] = 100 - (100 / (1 + rs))
+    return out
+
+
+def macd(prices: Any, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+    if np is None:
+        if _is_matrix(prices):
+            rows = [core.macd(row, fast_period, slow_period, signal_period) for row in prices]
+            return tuple([list(component) for component in zip(*rows)]) if rows else ([], [], [])
+        return core.macd(prices, fast_period, slow_period, signal_period)
+
+    if slow_period <= fast_period:
+        raise ValueError("Slow period must be greater than fast period")
+    values = as_array(prices)
+    _check_length(values, slow_period + 1, "Not enough price data for MACD")
+
+    return macd_from_ema(ema(values, fast_period), ema(values, slow_period), signal_period)
+
+
+def macd_from_ema(fast_ema: Any, slow_ema: Any, signal_period: int = 9):
+    """MACD from already computed EMAs, so callers holding them skip recomputing."""
+    if np is None:
+        if _is_matrix(fast_ema):
+            rows = [core.macd_from_ema(fast, slow, signal_period) for fast, slow in zip(fast_ema, slow_ema)]
+            return tuple([list(component) for component in zip(*rows)]) if rows else ([], [], [])
+        return core.macd_from_ema(fast_ema, slow_ema, signal_period)
+
+    fast_ema = as_array(fast_ema)
+    slow_ema = as_array(slow_ema)
+    macd_line = fast_ema[..., -slow_ema.shape[-1]:] - slow_ema
+    signal_line = as_array(ema(macd_line, signal_period))
+    histogram = macd_line[..., -signal_line.shape[-1]:] - signal_line
+    return macd_line, signal_line, histogram
+
+
+def bollinger_bands(prices: Any, period: int = 20, num_std_dev: float = 2.0):
+    if np is None:
+        if _is_matrix(prices):
+            rows = [core.bollinger_bands(row, period, num_std_dev) for row in prices]
+            return tuple([list(component) for component in zip(*rows)]) if rows else ([], [], [])
+        return core.bollinger_bands(prices, period, num_std_dev)
+
+    if period <= 0:
+        raise ValueError("Period must be positive")
+    values = as_array(prices)
+    _check_length(values, period, "Not enough price data for Bollinger Bands")
+
+    # Window sums from cumulative sums are O(n) for any period. Centering on the
+    # series mean first keeps the sum of squares small and avoids cancellation.
+    offset = values.mean(axis=-1, keepdims=True)
+    centered = values - offset
+    zeros = np.zeros(values.shape[:-1] + (1,), dtype=np.float64)
+    sums = np.concatenate((zeros, np.cumsum(centered, axis=-1)), axis=-1)
+    squares = np.concatenate((zeros, np.cumsum(centered * centered, axis=-1)), axis=-1)
+
+    window_mean = (sums[..., period:] - sums[..., :-period]) / period
+    window_square = (squares[..., period:] - squares[..., :-period]) / period
+    variance = np.maximum(window_square - window_mean * window_mean, 0.0)
+    std_dev = np.sqrt(variance)
+
+    mid_band = window_mean + offset
+    return mid_band + num_std_dev * std_dev, mid_band, mid_band - num_std_dev * std_dev
+
+
+__all__ = ["BACKEND", "as_array", "bollinger_bands", "ema", "macd", "macd_from_ema", "rsi"]
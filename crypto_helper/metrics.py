@@ -0,0 +1,262 @@
+"""Stage timings, counters and their Prometheus text exposition.
+
+Instrumented code reports to the metrics sink returned by :func:`active`,
+which does nothing until a :class:`MetricsRegistry` is installed with
+:func:`use` (or passed to :class:`SignalEngine` directly). Besides keeping
+histograms and counters for the Prometheus exporter, a registry forwards every
+observation to its hooks, so other backends can be plugged in.
+"""
+from __future__ import annotations
+
+import bisect
+import io
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pstats
+    from http.server import ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Hook = Callable[[str, str, float, Dict[str, str]], None]
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "labels", "started")
+
+    def __init__(self, metrics: "Metrics", stage: str, labels: Dict[str, str]) -> None:
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.metrics.observe("stage_seconds", time.perf_counter() - self.started, stage=self.stage, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Metrics sink interface; this base class discards everything."""
+
+    enabled = False
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the counter ``name``."""
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record ``value`` in the histogram ``name``."""
+
+    def timer(self, stage: str, **labels: str) -> Any:
+        """Context manager recording the duration of ``stage`` in ``stage_seconds``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage, labels)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry(Metrics):
+    """In-memory histograms and counters with a Prometheus text exporter."""
+
+    enabled = True
+
+    def __init__(self, prefix: str = "crypto_helper", buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.hooks: List[Hook] = []
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call ``hook(kind, name, value, labels)`` for every counter increment and observation."""
+        self.hooks.append(hook)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+        for hook in self.hooks:
+            hook("counter", name, amount, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+        for hook in self.hooks:
+            hook("histogram", name, value, labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def histogram(self, name: str, **labels: str) -> Tuple[int, float]:
+        """``(count, sum)`` of the histogram ``name`` for ``labels``."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+            return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, float("inf")), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.sum)}")
+                    lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the exposition atomically, e.g. for node_exporter's textfile collector."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> "ThreadingHTTPServer":
+        """Serve ``/metrics`` from a background thread; call ``shutdown()`` to stop."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class CallTimer:
+    """Proxy adding up the time spent in calls to the wrapped object's functions."""
+
+    def __init__(self, target: Any) -> None:
+        self.target = target
+        self.elapsed = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        function = getattr(self.target, name)
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.elapsed += time.perf_counter() - started
+
+        return timed
+
+
+def profile(function: Callable[..., Any], *args: Any, path: str | None = None, **kwargs: Any) -> Tuple[Any, "pstats.Stats"]:
+    """Run ``function`` under cProfile; optionally dump the raw profile to ``path``."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if path is not None:
+        profiler.dump_stats(path)
+    return result, pstats.Stats(profiler, stream=io.StringIO())
+
+
+def format_stats(stats: "pstats.Stats", limit: int = 25, sort: str = "cumulative") -> str:
+    stream = io.StringIO()
+    stats.stream = stream  # type: ignore[attr-defined]
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+_active: Metrics = Metrics()
+
+
+def active() -> Metrics:
+    """The process-wide metrics sink used by instrumented code."""
+    return _active
+
+
+def use(metrics: Metrics) -> Metrics:
+    """Install ``metrics`` as the process-wide sink and return the previous one."""
+    global _active
+    previous, _active = _active, metrics
+    return previous
+
+
+__all__ = [
+    "CallTimer",
+    "Metrics",
+    "MetricsRegistry",
+    "active",
+    "format_stats",
+    "profile",
+    "use",
+]
@@ -0,0 +1,187 @@
+"""Shared evaluation of many subscribers' configs over the same markets.
+
+Configs are grouped by ``(exchange, symbol, interval)``: each market is
+fetched once with enough history for its most demanding config, and indicator
+series are memoized per ``(indicator, parameters)`` in an LRU cache, so the
+cost grows with distinct markets and parameter sets rather than subscribers.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, NamedTuple, Tuple
+
+from .candles import CandleSeries
+from .engine import ScanResult, SignalConfig, SignalEngine
+from .indicators import vectorized as indicators
+
+logger = logging.getLogger(__name__)
+
+MarketKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+class _Failure(NamedTuple):
+    """Cached ``ValueError``; only its message is kept, not the traceback."""
+
+    message: str
+
+
+class IndicatorCache:
+    """Thread-safe LRU cache of computed indicator series.
+
+    Failures (``ValueError`` for too short a history) are cached as well, so a
+    parameter set that cannot be evaluated is not retried for every tenant;
+    every hit raises a new ``ValueError`` with the original message.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = self._entries[key]
+            else:
+                self.misses += 1
+                value = _MISSING
+        if value is _MISSING:
+            try:
+                value = compute()
+            except ValueError as error:
+                value = _Failure(str(error))
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        if isinstance(value, _Failure):
+            raise ValueError(value.message)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MarketIndicators:
+    """Indicator source for one market snapshot, backed by an :class:`IndicatorCache`.
+
+    It mirrors the functions of :mod:`.indicators.vectorized` so it can be
+    passed to :meth:`SignalEngine.generate_signals`; the ``prices`` argument
+    must be the snapshot's close prices. MACD is derived from the cached EMAs.
+    """
+
+    def __init__(self, cache: IndicatorCache, market: MarketKey, candles: CandleSeries) -> None:
+        self.cache = cache
+        # The last close is part of the key because the newest candle may
+        # still be in progress and change between fetches.
+        last = (candles.timestamps[-1], candles.close[-1]) if candles else None
+        self._snapshot = (market, len(candles), last)
+        # Node values of a FilterSet evaluated on this snapshot, shared by all its tenants
+        self.filter_values: Dict[Any, Any] = {}
+
+    def _get(self, name: str, params: tuple, compute: Callable[[], Any]) -> Any:
+        return self.cache.get((self._snapshot, name, params), compute)
+
+    def ema(self, prices: Any, period: int) -> Any:
+        return self._get("ema", (period,), lambda: indicators.ema(prices, period))
+
+    def rsi(self, prices: Any, period: int = 14) -> Any:
+        return self._get("rsi", (period,), lambda: indicators.rsi(prices, period))
+
+    def macd(self, prices: Any, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Any:
+        def compute() -> Any:
+            if slow_period <= fast_period:
+                raise ValueError("Slow period must be greater than fast period")
+            if len(prices) <= slow_period:
+                raise ValueError("Not enough price data for MACD")
+            return indicators.macd_from_ema(
+                self.ema(prices, fast_period), self.ema(prices, slow_period), signal_period
+            )
+
+        return self._get("macd", (fast_period, slow_period, signal_period), compute)
+
+    def bollinger_bands(self, prices: Any, period: int = 20, num_std_dev: float = 2.0) -> Any:
+        return self._get(
+            "bollinger", (period, num_std_dev), lambda: indicators.bollinger_bands(prices, period, num_std_dev)
+        )
+
+
+class MultiTenantEngine:
+    """Evaluates many configs, fetching and computing once per distinct market.
+
+    Every config of a market is evaluated on the same history, sized for the
+    config needing the most candles, so tenants with shorter indicators see a
+    longer warm-up than a standalone :meth:`SignalEngine.run` would use.
+    """
+
+    def __init__(
+        self,
+        engine: SignalEngine | None = None,
+        cache: IndicatorCache | None = None,
+        max_workers: int = 8,
+        per_exchange_limit: int | Mapping[str, int] | None = None,
+    ) -> None:
+        self.engine = engine or SignalEngine()
+        self.cache = cache if cache is not None else IndicatorCache()
+        self.max_workers = max_workers
+        self.per_exchange_limit = per_exchange_limit
+
+    @staticmethod
+    def market_key(config: SignalConfig) -> MarketKey:
+        return (config.exchange.name, config.symbol, config.interval)
+
+    def run(self, configs: Iterable[SignalConfig]) -> List[ScanResult]:
+        """Evaluate and notify every config; results keep input order."""
+        configs = list(configs)
+        markets: Dict[MarketKey, List[int]] = {}
+        for index, config in enumerate(configs):
+            markets.setdefault(self.market_key(config), []).append(index)
+        limits = self.engine.exchange_limits(configs, self.per_exchange_limit)
+        results: List[ScanResult | None] = [None] * len(configs)
+
+        def evaluate(market: MarketKey, indices: List[int]) -> None:
+            tenants = [configs[index] for index in indices]
+            limit = max(self.engine._required_candles(config) for config in tenants)
+            semaphore = limits.get(market[0])
+            try:
+                if semaphore is None:
+                    candles = self.engine.fetch_candles(tenants[0], limit)
+                else:
+                    with semaphore:
+                        candles = self.engine.fetch_candles(tenants[0], limit)
+            except Exception as error:  # every tenant of the market shares the failure
+                logger.error("Не удалось загрузить свечи %s: %s", market, error)
+                for index in indices:
+                    results[index] = ScanResult(configs[index], error=error)
+                return
+
+            source = MarketIndicators(self.cache, market, candles)
+            for index, config in zip(indices, tenants):
+                try:
+                    signals = self.engine.generate_signals(config, candles, candles.close, source)
+                    self.engine.notify(config, signals)
+                except Exception as error:
+                    logger.error("Сканирование %s завершилось ошибкой: %s", config.symbol, error)
+                    results[index] = ScanResult(config, error=error)
+                else:
+                    results[index] = ScanResult(config, signals=signals)
+
+        if markets:
+            workers = max(1, min(self.max_workers, len(markets)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tenant-scan") as executor:
+                for future in [executor.submit(evaluate, market, indices) for market, indices in markets.items()]:
+                    future.result()
+        return results  # type: ignore[return-value]
+
+
+__all__ = ["IndicatorCache", "MarketIndicators", "MarketKey", "MultiTenantEngine"]
@@ -1,4 +1,5 @@
 """Notification channels for CryptoHelper."""
-from .telegram import TelegramNotifier
+from .dispatch import TelegramDispatcher
+from .telegram import TelegramNotifier, TelegramRetryAfter
 
-__all__ = ["TelegramNotifier"]
+__all__ = ["TelegramDispatcher", "TelegramNotifier", "TelegramRetryAfter"]
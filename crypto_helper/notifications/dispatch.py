@@ -0,0 +1,183 @@
+"""Background Telegram delivery with fan-out, coalescing and rate limiting."""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Set, Tuple
+
+from .._compat import requests
+from ..transport import RateLimiter
+from .telegram import MAX_MESSAGE_LENGTH, TelegramNotifier, TelegramRetryAfter
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n"
+
+
+class TelegramDispatcher:
+    """Queue that delivers messages to many chats from background workers.
+
+    :meth:`send_message` only enqueues, so it can stand in for a
+    :class:`TelegramNotifier` in a :class:`SignalConfig` without blocking signal
+    computation. Delivery respects Telegram's limits: ``messages_per_second``
+    across the bot and one message per ``chat_interval`` seconds per chat.
+    Messages queued for a chat within ``coalesce_delay`` (or while the chat is
+    throttled) are joined into as few messages of at most 4096 characters as
+    possible. A 429 answer pauses the chat for the ``retry_after`` Telegram
+    asks for; other failures are retried up to ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        notifier: TelegramNotifier,
+        chat_ids: Iterable[str] | None = None,
+        *,
+        workers: int = 4,
+        messages_per_second: float = 30.0,
+        chat_interval: float = 1.0,
+        coalesce_delay: float = 0.25,
+        max_attempts: int = 5,
+        max_length: int = MAX_MESSAGE_LENGTH,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.notifier = notifier
+        self.chat_ids = list(chat_ids) if chat_ids is not None else [notifier.chat_id]
+        self.chat_interval = chat_interval
+        self.coalesce_delay = coalesce_delay
+        self.max_attempts = max_attempts
+        self.max_length = max_length
+        self.clock = clock
+        self._limiter = RateLimiter(messages_per_second, 1.0, clock=clock)
+        self._pending: Dict[str, Deque[str]] = {}
+        self._attempts: Dict[str, int] = {}
+        self._next_allowed: Dict[str, float] = {}
+        self._schedule: List[Tuple[float, str]] = []
+        self._scheduled: Set[str] = set()
+        self._busy: Set[str] = set()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"telegram-dispatch-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def send_message(self, text: str) -> None:
+        """Queue ``text`` for every subscribed chat."""
+        for chat_id in self.chat_ids:
+            self.submit(chat_id, text)
+
+    def submit(self, chat_id: str, text: str) -> None:
+        """Queue ``text`` for one chat."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Dispatcher is closed")
+            self._pending.setdefault(chat_id, deque()).append(text)
+            if chat_id not in self._scheduled and chat_id not in self._busy:
+                self._schedule_chat(chat_id, self.clock() + self.coalesce_delay)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued message has been delivered or dropped."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Deliver what is queued and stop the workers."""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def __enter__(self) -> "TelegramDispatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _schedule_chat(self, chat_id: str, at: float) -> None:
+        # Caller holds the condition.
+        at = max(at, self._next_allowed.get(chat_id, 0.0))
+        self._scheduled.add(chat_id)
+        heapq.heappush(self._schedule, (at, chat_id))
+        self._condition.notify()
+
+    def _next_batch(self) -> Tuple[str, str] | None:
+        with self._condition:
+            while True:
+                now = self.clock()
+                if self._schedule and self._schedule[0][0] <= now:
+                    _, chat_id = heapq.heappop(self._schedule)
+                    self._scheduled.discard(chat_id)
+                    self._busy.add(chat_id)
+                    return chat_id, self._take(self._pending[chat_id])
+                if self._closed and not self._schedule:
+                    return None
+                self._condition.wait(self._schedule[0][0] - now if self._schedule else None)
+
+    def _take(self, queue: Deque[str]) -> str:
+        """Pop as many queued texts as fit into one message."""
+        text = queue.popleft()
+        if len(text) > self.max_length:
+            cut = text.rfind("\n", 0, self.max_length)
+            cut = cut if cut > 0 else self.max_length
+            queue.appendleft(text[cut:].lstrip("\n"))
+            return text[:cut]
+        while queue and len(text) + len(SEPARATOR) + len(queue[0]) <= self.max_length:
+            text += SEPARATOR + queue.popleft()
+        return text
+
+    def _work(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            chat_id, text = batch
+            self._limiter.acquire()
+            delay = self.chat_interval
+            try:
+                self.notifier.send_message(text, chat_id=chat_id)
+            except TelegramRetryAfter as error:
+                delay = max(delay, error.retry_after)
+                self._requeue(chat_id, text, count_attempt=False)
+            except requests.RequestException as error:
+                attempts = self._attempts.get(chat_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    logger.error("Сообщение для чата %s отброшено после %d попыток: %s", chat_id, attempts, error)
+                    self._attempts.pop(chat_id, None)
+                else:
+                    delay = max(delay, min(2.0**attempts, 60.0))
+                    logger.warning("Не удалось отправить сообщение в чат %s: %s", chat_id, error)
+                    self._requeue(chat_id, text, count_attempt=True)
+            except Exception:
+                # E.g. a bug in a plugin notifier: retrying would fail the same way
+                logger.exception("Сообщение для чата %s отброшено из-за ошибки уведомителя", chat_id)
+                self._attempts.pop(chat_id, None)
+            else:
+                self._attempts.pop(chat_id, None)
+            finally:
+                self._release(chat_id, delay)
+
+    def _requeue(self, chat_id: str, text: str, count_attempt: bool) -> None:
+        with self._condition:
+            self._pending[chat_id].appendleft(text)
+            if count_attempt:
+                self._attempts[chat_id] = self._attempts.get(chat_id, 0) + 1
+
+    def _release(self, chat_id: str, delay: float) -> None:
+        with self._condition:
+            self._busy.discard(chat_id)
+            self._next_allowed[chat_id] = self.clock() + delay
+            if self._pending.get(chat_id):
+                self._schedule_chat(chat_id, 0.0)
+            else:
+                self._pending.pop(chat_id, None)
+            self._condition.notify_all()
+
+
+__all__ = ["TelegramDispatcher"]
@@ -5,10 +5,20 @@ import logging
 from dataclasses import dataclass
 from typing import Optional
 
-import requests
+from .._compat import requests
 
 logger = logging.getLogger(__name__)
 
+MAX_MESSAGE_LENGTH = 4096
+
+
+class TelegramRetryAfter(requests.HTTPError):
+    """Telegram answered 429 and asked to wait ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
 
 @dataclass
 class TelegramNotifier:
@@ -19,12 +29,23 @@ class TelegramNotifier:
     def __post_init__(self) -> None:
         self.session = self.session or requests.Session()
 
-    def send_message(self, text: str) -> None:
+    def send_message(self, text: str, chat_id: str | None = None) -> None:
         url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        payload = {"chat_id": self.chat_id, "text": text}
+        payload = {"chat_id": chat_id or self.chat_id, "text": text}
         response = self.session.post(url, json=payload, timeout=10)
+        if response.status_code == 429:
+            retry_after = _retry_after(response)
+            logger.warning("Telegram rate limit hit, retry after %.1fs", retry_after)
+            raise TelegramRetryAfter(retry_after, f"HTTP 429 from Telegram, retry after {retry_after}s")
         try:
             response.raise_for_status()
         except requests.HTTPError as exc:  # pragma: no cover - network errors are logged
             logger.error("Failed to send Telegram message: %s", exc)
             raise
+
+
+def _retry_after(response) -> float:
+    try:
+        return float(response.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return 1.0
@@ -0,0 +1,253 @@
+"""Parallel parameter sweeps over strategy parameters using historical candles.
+
+The close prices are copied once into shared memory; worker processes attach
+to that block instead of receiving the candles with every task. Inside a
+worker each indicator series is computed once per distinct parameter value
+and reused by every combination that needs it, so a grid costs roughly one
+backtest per distinct indicator setting rather than per combination.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from . import patterns
+from .backtest import StrategyParams, forward_return_stats
+from .candles import CandleSeries
+from .indicators import vectorized as indicators
+
+PARAMETERS = tuple(field.name for field in fields(StrategyParams))
+METRICS = ("hit_rate", "mean_return")
+
+
+@dataclass
+class OptimizationResult:
+    params: StrategyParams
+    signals: int
+    mean_return: float
+    hit_rate: float
+
+
+def parameter_grid(space: Mapping[str, Iterable[Any]]) -> Iterator[StrategyParams]:
+    """Every combination of the given values; missing parameters keep their defaults."""
+    unknown = set(space) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    names = list(space)
+    for values in itertools.product(*(list(space[name]) for name in names)):
+        params = StrategyParams(**dict(zip(names, values)))
+        if params.ema_fast < params.ema_slow:
+            yield params
+
+
+def random_search(space: Mapping[str, Sequence[Any]], samples: int, seed: int | None = None) -> Iterator[StrategyParams]:
+    """``samples`` distinct random combinations drawn from ``space``."""
+    grid = list(parameter_grid(space))
+    rng = random.Random(seed)
+    yield from rng.sample(grid, min(samples, len(grid)))
+
+
+# Worker state. ``_CLOSES`` points into the shared-memory block (or at the
+# caller's array when running in-process).
+_CLOSES: Sequence[float] = ()
+_SHARED: shared_memory.SharedMemory | None = None
+_HORIZON = 1
+
+
+def _attach(name: str, length: int, horizon: int) -> None:
+    global _CLOSES, _SHARED, _HORIZON
+    # Workers share the parent's resource tracker, so attaching registers the
+    # same name again and the parent's unlink() releases it for everyone.
+    _SHARED = shared_memory.SharedMemory(name=name)
+    _CLOSES = _SHARED.buf.cast("d")[:length]
+    _HORIZON = horizon
+    _clear_caches()
+
+
+def _use_local(closes: Sequence[float], horizon: int) -> None:
+    global _CLOSES, _HORIZON
+    _CLOSES = closes
+    _HORIZON = horizon
+    _clear_caches()
+
+
+def _clear_caches() -> None:
+    for cached in (_ema, _crossover_events, _rsi_events, _bollinger_events):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def _ema(period: int) -> Any:
+    return indicators.ema(_CLOSES, period)
+
+
+@lru_cache(maxsize=1024)
+def _crossover_events(fast: int, slow: int) -> Tuple[int, ...]:
+    events = patterns.ema_crossover_events(_ema(fast), _ema(slow))
+    offset = len(_CLOSES) - len(events)
+    return tuple(index + offset for index, hit in enumerate(events) if hit)
+
+
+@lru_cache(maxsize=64)
+def _rsi_events(period: int) -> Tuple[int, ...]:
+    events = patterns.rsi_oversold_events(indicators.rsi(_CLOSES, period))
+    offset = len(_CLOSES) - len(events)
+    return tuple(index + offset for index, hit in enumerate(events) if hit)
+
+
+@lru_cache(maxsize=256)
+def _bollinger_events(period: int, std_dev: float) -> Tuple[int, ...]:
+    lower_band = indicators.bollinger_bands(_CLOSES, period, std_dev)[2]
+    events = patterns.bollinger_bounce_events(_CLOSES, lower_band)
+    offset = len(_CLOSES) - len(events)
+    return tuple(index + offset for index, hit in enumerate(events) if hit)
+
+
+def _evaluate(params: StrategyParams) -> OptimizationResult:
+    indices: List[int] = []
+    total = len(_CLOSES)
+    if params.ema_slow <= total:
+        indices.extend(_crossover_events(params.ema_fast, params.ema_slow))
+    if params.rsi_period < total:
+        indices.extend(_rsi_events(params.rsi_period))
+    if params.bollinger_period <= total:
+        indices.extend(_bollinger_events(params.bollinger_period, params.bollinger_std_dev))
+    stats = forward_return_stats(_CLOSES, indices, (_HORIZON,))[_HORIZON]
+    return OptimizationResult(params, stats.count, stats.mean_return, stats.hit_rate)
+
+
+def _evaluate_chunk(chunk: Sequence[StrategyParams]) -> List[OptimizationResult]:
+    return [_evaluate(params) for params in chunk]
+
+
+class Optimizer:
+    """Evaluates many :class:`StrategyParams` and ranks them.
+
+    Each combination's signals (all three detectors together) are scored by
+    the forward return ``horizon`` candles later; ``metric`` picks the ranking
+    key and ``min_signals`` drops combinations with too few events to judge.
+    """
+
+    def __init__(
+        self,
+        horizon: int = 5,
+        metric: str = "hit_rate",
+        workers: int | None = None,
+        min_signals: int = 1,
+        chunk_size: int = 64,
+    ) -> None:
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        self.horizon = horizon
+        self.metric = metric
+        self.workers = workers or os.cpu_count() or 1
+        self.min_signals = min_signals
+        self.chunk_size = chunk_size
+
+    def optimize(self, candles: Any, candidates: Iterable[StrategyParams]) -> List[OptimizationResult]:
+        closes = candles if isinstance(candles, array) else CandleSeries.coerce(candles).close
+        # Neighbouring combinations share indicator settings, so ordering the
+        # work keeps each worker's indicator cache hot.
+        ordered = sorted(candidates, key=lambda params: tuple(getattr(params, name) for name in PARAMETERS))
+        chunks = [ordered[start : start + self.chunk_size] for start in range(0, len(ordered), self.chunk_size)]
+
+        if self.workers <= 1 or len(chunks) <= 1:
+            _use_local(closes, self.horizon)
+            results = [result for chunk in chunks for result in _evaluate_chunk(chunk)]
+        else:
+            results = self._optimize_parallel(closes, chunks)
+        return self.rank(results)
+
+    def _optimize_parallel(self, closes: array, chunks: List[List[StrategyParams]]) -> List[OptimizationResult]:
+        block = shared_memory.SharedMemory(create=True, size=max(len(closes), 1) * closes.itemsize)
+        try:
+            block.buf[: len(closes) * closes.itemsize] = closes.tobytes()
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(chunks)),
+                initializer=_attach,
+                initargs=(block.name, len(closes), self.horizon),
+            ) as executor:
+                return [result for chunk in executor.map(_evaluate_chunk, chunks) for result in chunk]
+        finally:
+            block.close()
+            block.unlink()
+
+    def rank(self, results: Iterable[OptimizationResult]) -> List[OptimizationResult]:
+        eligible = [result for result in results if result.signals >= self.min_signals]
+        return sorted(eligible, key=lambda result: (getattr(result, self.metric), result.signals), reverse=True)
+
+
+def _values(spec: str, kind: type) -> List[Any]:
+    """Parse ``a,b,c`` or ``start:stop:step`` (inclusive) into a list of values."""
+    if ":" in spec:
+        start, stop, step = (kind(part) for part in spec.split(":"))
+        values = []
+        current = start
+        while current <= stop + (step * 1e-9 if kind is float else 0):
+            values.append(round(current, 10) if kind is float else current)
+            current += step
+        return values
+    return [kind(part) for part in spec.split(",")]
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from . import registry
+
+    parser = argparse.ArgumentParser(description="Sweep CryptoHelper strategy parameters over history")
+    parser.add_argument("symbol")
+    parser.add_argument("interval")
+    parser.add_argument("--exchange", choices=registry.exchanges.names(), default="binance")
+    parser.add_argument("--archive", help="Read the last --limit candles from this archive instead of the exchange")
+    parser.add_argument("--limit", type=int, default=10_000)
+    parser.add_argument("--ema-fast", default="10:50:10", help="Values as a,b,c or start:stop:step")
+    parser.add_argument("--ema-slow", default="50:200:50")
+    parser.add_argument("--rsi-period", default="7,14,21")
+    parser.add_argument("--bollinger-period", default="20")
+    parser.add_argument("--bollinger-std", default="2.0")
+    parser.add_argument("--samples", type=int, default=0, help="Random search with this many samples instead of the full grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--metric", choices=METRICS, default="hit_rate")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-signals", type=int, default=10)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    space: Dict[str, List[Any]] = {
+        "ema_fast": _values(args.ema_fast, int),
+        "ema_slow": _values(args.ema_slow, int),
+        "rsi_period": _values(args.rsi_period, int),
+        "bollinger_period": _values(args.bollinger_period, int),
+        "bollinger_std_dev": _values(args.bollinger_std, float),
+    }
+    candidates = random_search(space, args.samples, args.seed) if args.samples else parameter_grid(space)
+    if args.archive:
+        from .archive import CandleArchive
+
+        candles = CandleArchive(args.archive).read(args.exchange, args.symbol, args.interval).tail(args.limit)
+    else:
+        candles = registry.exchanges.get(args.exchange)().fetch_ohlc(args.symbol, args.interval, limit=args.limit)
+    optimizer = Optimizer(args.horizon, args.metric, args.workers, args.min_signals)
+    for result in optimizer.optimize(candles, candidates)[: args.top]:
+        print(json.dumps(asdict(result)))
+
+
+__all__ = [
+    "OptimizationResult",
+    "Optimizer",
+    "parameter_grid",
+    "random_search",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 """Pattern detection utilities."""
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, List, Sequence, Tuple
+
+from .indicators.rolling import rolling_min
 
 
 def ema_crossover(fast_ema: Iterable[float], slow_ema: Iterable[float]) -> bool:
@@ -19,10 +21,126 @@ def rsi_oversold(rsi_values: Iterable[float], threshold: float = 30) -> bool:
     return values[-1] < threshold
 
 
-def bollinger_bounce(close_prices: List[float], lower_band: Iterable[float]) -> bool:
+def bollinger_bounce(close_prices: Sequence[float], lower_band: Iterable[float]) -> bool:
     if len(close_prices) < 2:
         return False
     lb = list(lower_band)
     if not lb:
         return False
     return close_prices[-2] < lb[-1] and close_prices[-1] > lb[-1]
+
+
+def stochastic_oversold_cross(k_values: Sequence[float], d_values: Sequence[float], threshold: float = 20) -> bool:
+    """%K crossed above %D while the oscillator was in the oversold zone."""
+    if len(k_values) < 2 or len(d_values) < 2:
+        return False
+    return k_values[-2] < d_values[-2] and k_values[-1] > d_values[-1] and min(k_values[-2], d_values[-2]) < threshold
+
+
+def donchian_breakout(close_prices: Sequence[float], upper_band: Sequence[float]) -> bool:
+    """The last close broke above the previous candle's channel high."""
+    if len(close_prices) < 1 or len(upper_band) < 2:
+        return False
+    return close_prices[-1] > upper_band[-2]
+
+
+def vwap_reclaim(close_prices: Sequence[float], vwap_values: Sequence[float]) -> bool:
+    """The close crossed from below to above the VWAP."""
+    if len(close_prices) < 2 or len(vwap_values) < 2:
+        return False
+    return close_prices[-2] < vwap_values[-2] and close_prices[-1] > vwap_values[-1]
+
+
+def atr_expansion(atr_values: Sequence[float], factor: float = 1.5, lookback: int = 14) -> bool:
+    """The last ATR exceeds ``factor`` times its average over the preceding ``lookback`` values."""
+    if len(atr_values) <= lookback:
+        return False
+    previous = atr_values[-lookback - 1 : -1]
+    return atr_values[-1] > factor * sum(previous) / lookback
+
+
+def obv_divergence(close_prices: Sequence[float], obv_values: Sequence[float], lookback: int = 20) -> bool:
+    """Bullish divergence: price at a ``lookback`` low while OBV stays above its own low."""
+    if len(close_prices) < lookback or len(obv_values) < lookback:
+        return False
+    return close_prices[-1] <= min(close_prices[-lookback:]) and obv_values[-1] > min(obv_values[-lookback:])
+
+
+# Whole-series detectors used by the backtester and the optimizer. Each
+# ``<name>_events`` returns an event vector aligned with the end of its inputs,
+# where ``events[-1]`` equals the result of the last-bar detector ``<name>``.
+
+
+def ema_crossover_events(fast_ema: Sequence[float], slow_ema: Sequence[float]) -> List[bool]:
+    length = min(len(fast_ema), len(slow_ema))
+    fast = list(fast_ema[len(fast_ema) - length :])
+    slow = list(slow_ema[len(slow_ema) - length :])
+    if not length:
+        return []
+    return [False] + [
+        fast[i - 1] < slow[i - 1] and fast[i] > slow[i] for i in range(1, length)
+    ]
+
+
+def rsi_oversold_events(rsi_values: Iterable[float], threshold: float = 30) -> List[bool]:
+    return [value < threshold for value in rsi_values]
+
+
+def bollinger_bounce_events(close_prices: Sequence[float], lower_band: Sequence[float]) -> List[bool]:
+    offset = len(close_prices) - len(lower_band)
+    closes = list(close_prices)
+    return [
+        index + offset >= 1 and closes[index + offset - 1] < band and closes[index + offset] > band
+        for index, band in enumerate(lower_band)
+    ]
+
+
+def stochastic_oversold_cross_events(
+    k_values: Sequence[float], d_values: Sequence[float], threshold: float = 20
+) -> List[bool]:
+    k, d = _aligned(k_values, d_values)
+    return [False] * min(len(k), 1) + [
+        k[i - 1] < d[i - 1] and k[i] > d[i] and min(k[i - 1], d[i - 1]) < threshold for i in range(1, len(k))
+    ]
+
+
+def donchian_breakout_events(close_prices: Sequence[float], upper_band: Sequence[float]) -> List[bool]:
+    offset = len(close_prices) - len(upper_band)
+    return [False] * min(len(upper_band), 1) + [
+        close_prices[index + offset] > upper_band[index - 1] for index in range(1, len(upper_band))
+    ]
+
+
+def vwap_reclaim_events(close_prices: Sequence[float], vwap_values: Sequence[float]) -> List[bool]:
+    offset = len(close_prices) - len(vwap_values)
+    return [False] * min(len(vwap_values), 1) + [
+        close_prices[index + offset - 1] < vwap_values[index - 1] and close_prices[index + offset] > vwap_values[index]
+        for index in range(1, len(vwap_values))
+    ]
+
+
+def atr_expansion_events(atr_values: Sequence[float], factor: float = 1.5, lookback: int = 14) -> List[bool]:
+    values = list(atr_values)
+    return [
+        index >= lookback and value > factor * sum(values[index - lookback : index]) / lookback
+        for index, value in enumerate(values)
+    ]
+
+
+def obv_divergence_events(close_prices: Sequence[float], obv_values: Sequence[float], lookback: int = 20) -> List[bool]:
+    closes, obv_values = _aligned(close_prices, obv_values)
+    if len(closes) < lookback:
+        return [False] * len(closes)
+    # Rolling minima over full windows, exact like ``min`` of each slice
+    close_lows = rolling_min(closes, lookback)
+    obv_lows = rolling_min(obv_values, lookback)
+    return [False] * (lookback - 1) + [
+        closes[index + lookback - 1] <= close_low and obv_values[index + lookback - 1] > obv_low
+        for index, (close_low, obv_low) in enumerate(zip(close_lows, obv_lows))
+    ]
+
+
+def _aligned(first: Sequence[float], second: Sequence[float]) -> Tuple[List[float], List[float]]:
+    # The trailing values both series have, as lists
+    length = min(len(first), len(second))
+    return list(first[len(first) - length :]), list(second[len(second) - length :])
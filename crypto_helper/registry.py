@@ -0,0 +1,92 @@
+"""Name-based registries of exchange clients and notification channels.
+
+Entries are stored as ``"module:attribute"`` references and only imported
+when they are looked up, so listing or validating names never pays for
+importing HTTP or NumPy machinery. Third-party packages can add entries
+through the ``crypto_helper.exchanges`` and ``crypto_helper.notifiers``
+entry-point groups::
+
+    [project.entry-points."crypto_helper.exchanges"]
+    okx = "crypto_helper_okx:OKXClient"
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Dict, List, Union
+
+
+class Registry:
+    """Maps names to lazily imported objects."""
+
+    def __init__(self, kind: str, group: str) -> None:
+        self.kind = kind
+        self.group = group
+        self._entries: Dict[str, Union[str, Any]] = {}
+        self._loaded: Dict[str, Any] = {}
+        self._plugins_scanned = False
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: Union[str, Any]) -> None:
+        """Register ``target``, either an object or a ``"module:attribute"`` reference."""
+        name = name.lower()
+        with self._lock:
+            self._entries[name] = target
+            self._loaded.pop(name, None)
+
+    def _scan_plugins(self) -> None:
+        # Entry points are only read when a name is not built in, or when listing
+        if self._plugins_scanned:
+            return
+        from importlib.metadata import entry_points
+
+        for entry in entry_points(group=self.group):
+            self._entries.setdefault(entry.name.lower(), entry.value)
+        self._plugins_scanned = True
+
+    def __contains__(self, name: str) -> bool:
+        name = name.lower()
+        with self._lock:
+            if name not in self._entries:
+                self._scan_plugins()
+            return name in self._entries
+
+    def names(self) -> List[str]:
+        with self._lock:
+            self._scan_plugins()
+            return sorted(self._entries)
+
+    def get(self, name: str) -> Any:
+        """Return the object registered as ``name``, importing it on first use."""
+        name = name.lower()
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            if name not in self._entries:
+                self._scan_plugins()
+            if name not in self._entries:
+                raise KeyError(f"Unknown {self.kind} {name!r}; available: {', '.join(sorted(self._entries))}")
+            target = self._entries[name]
+            if isinstance(target, str):
+                target = _resolve(target)
+            self._loaded[name] = target
+            return target
+
+
+def _resolve(reference: str) -> Any:
+    module_name, _, attribute = reference.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in filter(None, attribute.split(".")):
+        target = getattr(target, part)
+    return target
+
+
+exchanges = Registry("exchange", "crypto_helper.exchanges")
+exchanges.register("binance", "crypto_helper.exchanges.binance:BinanceClient")
+exchanges.register("bybit", "crypto_helper.exchanges.bybit:BybitClient")
+exchanges.register("kucoin", "crypto_helper.exchanges.kucoin:KuCoinClient")
+
+notifiers = Registry("notifier", "crypto_helper.notifiers")
+notifiers.register("telegram", "crypto_helper.notifications.telegram:TelegramNotifier")
+
+__all__ = ["Registry", "exchanges", "notifiers"]
@@ -0,0 +1,141 @@
+"""Aggregation of fine candles into higher timeframes.
+
+Fetching the finest interval once and resampling locally replaces one
+request per timeframe with a single request (or a cache lookup). Buckets
+are aligned with :func:`~crypto_helper.candles.candle_open`, so they open at
+the same times as the exchanges' own candles, weekly ones on Monday.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping
+
+from .candles import CandleSeries, candle_open, interval_to_ms
+from .exchanges.base import ExchangeClient, Ticker
+
+
+def resample(candles: CandleSeries, target_ms: int, step_ms: int | None = None) -> CandleSeries:
+    """Aggregate ``candles`` into ``target_ms`` buckets.
+
+    Each bucket takes the first open, highest high, lowest low, last close and
+    summed volume of its candles. When the source interval ``step_ms`` is
+    given, a leading bucket that starts before the first candle is dropped, as
+    its open would be wrong; the trailing bucket is kept even if incomplete,
+    just like the exchanges' candle in progress.
+    """
+    if step_ms is not None and target_ms % step_ms:
+        raise ValueError(f"{target_ms} ms candles cannot be built from {step_ms} ms candles")
+    result = CandleSeries()
+    timestamps = candles.timestamps
+    if not timestamps:
+        return result
+    opens, highs, lows, closes, volumes = candles.columns()
+
+    bucket = candle_open(timestamps[0], target_ms)
+    index = 0
+    if step_ms is not None and timestamps[0] != bucket:
+        next_bucket = bucket + target_ms
+        while index < len(timestamps) and timestamps[index] < next_bucket:
+            index += 1
+    if index == len(timestamps):
+        return result
+
+    bucket = candle_open(timestamps[index], target_ms)
+    open_, high, low, close, volume = opens[index], highs[index], lows[index], closes[index], volumes[index]
+    for position in range(index + 1, len(timestamps)):
+        timestamp = timestamps[position]
+        if timestamp >= bucket + target_ms:
+            result.append(bucket, open_, high, low, close, volume)
+            bucket = candle_open(timestamp, target_ms)
+            open_, high, low, close, volume = (
+                opens[position], highs[position], lows[position], closes[position], volumes[position]
+            )
+            continue
+        if highs[position] > high:
+            high = highs[position]
+        if lows[position] < low:
+            low = lows[position]
+        close = closes[position]
+        volume += volumes[position]
+    result.append(bucket, open_, high, low, close, volume)
+    return result
+
+
+def resample_many(candles: CandleSeries, step_ms: int, intervals: Iterable[str]) -> Dict[str, CandleSeries]:
+    """Resample ``candles`` into every interval; the source interval itself is returned as is."""
+    series: Dict[str, CandleSeries] = {}
+    for interval in intervals:
+        target = interval_to_ms(interval)
+        series[interval] = candles if target == step_ms else resample(candles, target, step_ms)
+    return series
+
+
+def finest_interval(intervals: Iterable[str]) -> str:
+    """The interval every other one can be built from.
+
+    Raises:
+        ValueError: If some interval is not a multiple of the shortest one.
+    """
+    steps: Mapping[str, int] = {interval: interval_to_ms(interval) for interval in intervals}
+    if not steps:
+        raise ValueError("No intervals given")
+    finest = min(steps, key=steps.__getitem__)
+    for interval, step in steps.items():
+        if step % steps[finest]:
+            raise ValueError(f"Interval {interval} is not a multiple of {finest}")
+    return finest
+
+
+class ResamplingExchangeClient(ExchangeClient):
+    """Serves every interval by resampling ``base_interval`` candles of ``client``.
+
+    Wrap a :class:`~crypto_helper.exchanges.cache.CachedExchangeClient` to
+    keep the fine candles on disk, so each call only downloads the new tail.
+    """
+
+    def __init__(self, client: ExchangeClient, base_interval: str) -> None:
+        super().__init__(transport=client.transport)
+        self.client = client
+        self.base_interval = base_interval
+        self.base_url = client.base_url
+        self.name = client.name
+
+    def interval_ms(self, interval: str) -> int:
+        return self.client.interval_ms(interval)
+
+    def fetch_tickers(self) -> List[Ticker]:
+        return self.client.fetch_tickers()
+
+    def native_symbol(self, symbol: str) -> str:
+        return self.client.native_symbol(symbol)
+
+    def native_interval(self, interval: str) -> str:
+        return self.client.native_interval(interval)
+
+    def server_time(self) -> int:
+        return self.client.server_time()
+
+    def _fetch_page(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+        start_time: int | None = None,
+        end_time: int | None = None,
+    ) -> CandleSeries:
+        # fetch_ohlc serves whole requests itself; a page is just a short one
+        return self.fetch_ohlc(symbol, interval, limit, start_time)
+
+    def fetch_ohlc(
+        self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None
+    ) -> CandleSeries:
+        step = self.interval_ms(self.base_interval)
+        target = self.interval_ms(interval)
+        if target == step:
+            return self.client.fetch_ohlc(symbol, self.base_interval, limit=limit, start_time=start_time)
+        ratio = target // step
+        # One extra bucket covers a leading partial bucket that is dropped
+        candles = self.client.fetch_ohlc(symbol, self.base_interval, limit=(limit + 1) * ratio, start_time=start_time)
+        return resample(candles, target, step).tail(limit)
+
+
+__all__ = ["ResamplingExchangeClient", "finest_interval", "resample", "resample_many"]
@@ -0,0 +1,164 @@
+"""Long-running scheduler that evaluates configs right after their candles close."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+
+from . import metrics as _metrics
+from .candles import candle_open
+from .engine import ScanResult, SignalConfig, SignalEngine
+from .exchanges.base import ExchangeClient
+
+logger = logging.getLogger(__name__)
+
+
+class ClockSync:
+    """Offset between an exchange's clock and the local one.
+
+    The offset is measured against the midpoint of the request round trip and
+    refreshed every ``refresh`` seconds; if the exchange cannot be reached
+    the previous offset (initially zero) is kept.
+    """
+
+    def __init__(self, client: ExchangeClient, refresh: float = 3600.0, clock: Callable[[], float] = time.time) -> None:
+        self.client = client
+        self.refresh = refresh
+        self.clock = clock
+        self.offset_ms = 0
+        self._synced_at: float | None = None
+        self._lock = threading.Lock()
+
+    def sync(self) -> int:
+        with self._lock:
+            sent = self.clock()
+            try:
+                server = self.client.server_time()
+            except Exception as error:
+                logger.warning("Не удалось получить время сервера %s: %s", self.client.name, error)
+            else:
+                received = self.clock()
+                self.offset_ms = int(server - (sent + received) / 2 * 1000)
+                logger.debug("Clock offset for %s: %d ms", self.client.name, self.offset_ms)
+            self._synced_at = self.clock()
+            return self.offset_ms
+
+    def now_ms(self) -> int:
+        """Current exchange time in milliseconds."""
+        if self._synced_at is None or self.clock() - self._synced_at >= self.refresh:
+            self.sync()
+        return int(self.clock() * 1000) + self.offset_ms
+
+
+@dataclass
+class _Job:
+    exchange: ExchangeClient
+    interval: str
+    step_ms: int
+    configs: List[SignalConfig] = field(default_factory=list)
+    candle_close_ms: int = 0
+
+
+class CandleScheduler:
+    """Runs every config once per candle, ``delay`` seconds after the candle closes.
+
+    Configs sharing an exchange client and interval form one job and are
+    evaluated together through :meth:`SignalEngine.run_many`, reusing the
+    clients' warm HTTP sessions. Close times come from the exchange clock
+    (see :class:`ClockSync`). Each run is shifted by a random ``jitter`` so
+    that many jobs do not hit an exchange at the same instant. A job that
+    falls behind runs once for the latest candle instead of replaying every
+    close it missed.
+    """
+
+    def __init__(
+        self,
+        engine: SignalEngine,
+        configs: Iterable[SignalConfig],
+        *,
+        delay: float = 1.0,
+        jitter: float = 2.0,
+        max_workers: int = 8,
+        per_exchange_limit: int | Mapping[str, int] | None = None,
+        sync_refresh: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.engine = engine
+        self.delay = delay
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.per_exchange_limit = per_exchange_limit
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._queue: List[Tuple[float, int, _Job]] = []
+        self._sequence = itertools.count()
+        self._syncs: Dict[int, ClockSync] = {}
+
+        jobs: Dict[Tuple[int, str], _Job] = {}
+        for config in configs:
+            key = (id(config.exchange), config.interval)
+            job = jobs.get(key)
+            if job is None:
+                step = config.exchange.interval_ms(config.interval)
+                job = jobs[key] = _Job(config.exchange, config.interval, step)
+                if id(config.exchange) not in self._syncs:
+                    self._syncs[id(config.exchange)] = ClockSync(config.exchange, sync_refresh, clock)
+            job.configs.append(config)
+        self.jobs = list(jobs.values())
+
+    def _schedule(self, job: _Job) -> None:
+        sync = self._syncs[id(job.exchange)]
+        now = sync.now_ms()
+        # Never schedule the same close twice, even if the clocks disagree slightly
+        job.candle_close_ms = max(candle_open(now, job.step_ms), job.candle_close_ms) + job.step_ms
+        due = (job.candle_close_ms - sync.offset_ms) / 1000 + self.delay + self.rng.uniform(0, self.jitter)
+        heapq.heappush(self._queue, (due, next(self._sequence), job))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, max_runs: int | None = None) -> None:
+        """Run jobs until :meth:`stop` is called (or ``max_runs`` jobs have run)."""
+        for job in self.jobs:
+            self._schedule(job)
+        runs = 0
+        while self._queue and not self._stop.is_set():
+            due, _, job = self._queue[0]
+            wait = due - self.clock()
+            if wait > 0:
+                self._sleep(wait)
+                continue
+            heapq.heappop(self._queue)
+            self._run_job(job, lateness=-wait)
+            self._schedule(job)
+            runs += 1
+            if max_runs is not None and runs >= max_runs:
+                return
+
+    def _run_job(self, job: _Job, lateness: float) -> List[ScanResult]:
+        missed = int(lateness * 1000 // job.step_ms)
+        if missed:
+            # Only the latest candle matters; the closes in between are coalesced
+            logger.warning(
+                "Запуск %s %s опоздал на %.1f с, пропущено свечей: %d", job.exchange.name, job.interval, lateness, missed
+            )
+            _metrics.active().inc("scheduler_skipped_total", missed, exchange=job.exchange.name)
+        _metrics.active().inc("scheduler_runs_total", exchange=job.exchange.name)
+        results = self.engine.run_many(job.configs, self.max_workers, self.per_exchange_limit)
+        failed = sum(1 for result in results if not result.ok)
+        logger.info(
+            "%s %s: обработано %d конфигураций, ошибок: %d", job.exchange.name, job.interval, len(results), failed
+        )
+        return results
+
+
+__all__ = ["CandleScheduler", "ClockSync"]
@@ -0,0 +1,115 @@
+"""Persistent signal state used to notify only when a signal changes."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+StateKey = Tuple[str, str, str]
+
+# Signals that describe a market condition which can switch on and off. The
+# MACD readout and the summary line are informational and always present.
+EDGE_SIGNALS = frozenset({"ema_crossover", "rsi_oversold", "bollinger_bounce"})
+# User filters (see :mod:`crypto_helper.filters`) report as ``filter:<name>``
+FILTER_PREFIX = "filter:"
+
+
+def is_edge_signal(name: str) -> bool:
+    """Whether ``name`` is a signal that can switch on and off."""
+    return name in EDGE_SIGNALS or name.startswith(FILTER_PREFIX)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signal_state (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    signal TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    changed_at REAL NOT NULL,
+    notified_at REAL,
+    PRIMARY KEY (exchange, symbol, interval, signal)
+) WITHOUT ROWID
+"""
+
+
+class SignalState(NamedTuple):
+    active: bool
+    changed_at: float
+    notified_at: float | None
+
+
+class SignalStateStore:
+    """SQLite store of which signals are active per exchange, symbol and interval.
+
+    :meth:`transition` records the signals active after a run and returns
+    the ones that just switched on and are not inside their cool-down, i.e.
+    the ones worth a notification.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_SCHEMA)
+
+    def load(self, key: StateKey) -> Dict[str, SignalState]:
+        with self._lock:
+            return self._select(key)
+
+    def _select(self, key: StateKey) -> Dict[str, SignalState]:
+        rows = self._connection.execute(
+            "SELECT signal, active, changed_at, notified_at FROM signal_state "
+            "WHERE exchange = ? AND symbol = ? AND interval = ?",
+            key,
+        ).fetchall()
+        return {signal: SignalState(bool(active), changed, notified) for signal, active, changed, notified in rows}
+
+    def transition(
+        self,
+        key: StateKey,
+        active: Iterable[str],
+        now: float,
+        cooldown: float | Mapping[str, float] = 0.0,
+    ) -> List[str]:
+        """Store ``active`` as the current state and return signals to notify about."""
+        active = set(filter(is_edge_signal, active))
+        with self._lock, self._connection:
+            previous = self._select(key)
+
+            fired: List[str] = []
+            updates = []
+            for signal in sorted(active | set(previous)):
+                state = previous.get(signal)
+                is_active = signal in active
+                if state is not None and state.active == is_active:
+                    continue
+                notified_at = state.notified_at if state is not None else None
+                if is_active:
+                    wait = cooldown.get(signal, 0.0) if isinstance(cooldown, Mapping) else cooldown
+                    if notified_at is None or now - notified_at >= wait:
+                        fired.append(signal)
+                        notified_at = now
+                updates.append((*key, signal, int(is_active), now, notified_at))
+
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO signal_state VALUES (?, ?, ?, ?, ?, ?, ?)", updates
+            )
+        return fired
+
+    def clear(self, key: StateKey) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM signal_state WHERE exchange = ? AND symbol = ? AND interval = ?", key
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+__all__ = ["EDGE_SIGNALS", "FILTER_PREFIX", "SignalState", "SignalStateStore", "StateKey", "is_edge_signal"]
@@ -0,0 +1,14 @@
+"""Real-time kline streaming over exchange WebSocket feeds."""
+from .feeds import BinanceKlineFeed, BybitKlineFeed, KlineEvent, KlineFeed, KuCoinKlineFeed, feed_for
+from .stream import KlineStream, StreamingSignalRunner
+
+__all__ = [
+    "BinanceKlineFeed",
+    "BybitKlineFeed",
+    "KlineEvent",
+    "KlineFeed",
+    "KlineStream",
+    "KuCoinKlineFeed",
+    "StreamingSignalRunner",
+    "feed_for",
+]
@@ -0,0 +1,245 @@
+"""Exchange-specific kline WebSocket feed definitions.
+
+A feed knows how to address a set of ``(symbol, interval)`` streams on one
+connection and how to turn raw messages into :class:`KlineEvent` objects. The
+interval and symbol spellings are the same as for the REST clients.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..exchanges.base import ExchangeClient
+
+StreamKey = Tuple[str, str]
+
+
+@dataclass
+class KlineEvent:
+    """A candle update pushed by an exchange."""
+
+    exchange: str
+    symbol: str
+    interval: str
+    timestamp_ms: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool
+
+    @property
+    def key(self) -> StreamKey:
+        return (self.symbol, self.interval)
+
+
+class KlineFeed:
+    """Base class describing one exchange's kline WebSocket protocol."""
+
+    name = "exchange"
+    url = ""
+    max_streams_per_connection = 200
+    heartbeat_interval: Optional[float] = None
+    # Exchanges without an explicit "closed" flag report a candle as closed
+    # implicitly, when the next candle starts.
+    reports_close = True
+
+    def __init__(self, url: str | None = None) -> None:
+        if url is not None:
+            self.url = url
+        self._ids = itertools.count(1)
+
+    async def endpoint(self, streams: Sequence[StreamKey]) -> str:
+        return self.url
+
+    def subscribe_messages(self, streams: Sequence[StreamKey]) -> List[str]:
+        raise NotImplementedError
+
+    def heartbeat(self) -> Optional[str]:
+        return None
+
+    def parse(self, message: str | bytes) -> List[KlineEvent]:
+        raise NotImplementedError
+
+
+class BinanceKlineFeed(KlineFeed):
+    name = "binance"
+    url = "wss://stream.binance.com:9443/ws"
+    max_streams_per_connection = 1024
+    _batch = 200
+
+    def subscribe_messages(self, streams: Sequence[StreamKey]) -> List[str]:
+        names = [f"{symbol.lower()}@kline_{interval}" for symbol, interval in streams]
+        return [
+            json.dumps({"method": "SUBSCRIBE", "params": names[start : start + self._batch], "id": next(self._ids)})
+            for start in range(0, len(names), self._batch)
+        ]
+
+    def parse(self, message: str | bytes) -> List[KlineEvent]:
+        payload = json.loads(message)
+        if isinstance(payload, dict) and "data" in payload:
+            payload = payload["data"]
+        if not isinstance(payload, dict) or payload.get("e") != "kline":
+            return []
+        kline = payload["k"]
+        return [
+            KlineEvent(
+                exchange=self.name,
+                symbol=payload["s"],
+                interval=kline["i"],
+                timestamp_ms=int(kline["t"]),
+                open=float(kline["o"]),
+                high=float(kline["h"]),
+                low=float(kline["l"]),
+                close=float(kline["c"]),
+                volume=float(kline["v"]),
+                closed=bool(kline["x"]),
+            )
+        ]
+
+
+class BybitKlineFeed(KlineFeed):
+    name = "bybit"
+    url = "wss://stream.bybit.com/v5/public/linear"
+    max_streams_per_connection = 200
+    heartbeat_interval = 20.0
+    _batch = 10
+
+    def subscribe_messages(self, streams: Sequence[StreamKey]) -> List[str]:
+        topics = [f"kline.{interval}.{symbol.upper()}" for symbol, interval in streams]
+        return [
+            json.dumps({"op": "subscribe", "args": topics[start : start + self._batch]})
+            for start in range(0, len(topics), self._batch)
+        ]
+
+    def heartbeat(self) -> Optional[str]:
+        return json.dumps({"op": "ping"})
+
+    def parse(self, message: str | bytes) -> List[KlineEvent]:
+        payload = json.loads(message)
+        topic = payload.get("topic", "") if isinstance(payload, dict) else ""
+        if not topic.startswith("kline."):
+            return []
+        _, interval, symbol = topic.split(".", 2)
+        return [
+            KlineEvent(
+                exchange=self.name,
+                symbol=symbol,
+                interval=interval,
+                timestamp_ms=int(item["start"]),
+                open=float(item["open"]),
+                high=float(item["high"]),
+                low=float(item["low"]),
+                close=float(item["close"]),
+                volume=float(item["volume"]),
+                closed=bool(item.get("confirm")),
+            )
+            for item in payload.get("data", [])
+        ]
+
+
+class KuCoinKlineFeed(KlineFeed):
+    """KuCoin needs a connect token from the REST API and has no close flag."""
+
+    name = "kucoin"
+    max_streams_per_connection = 100
+    heartbeat_interval = 18.0
+    reports_close = False
+    _batch = 100
+
+    def __init__(self, url: str | None = None, client: ExchangeClient | None = None) -> None:
+        super().__init__(url)
+        self.client = client
+
+    async def endpoint(self, streams: Sequence[StreamKey]) -> str:
+        if self.url:
+            return self.url
+        if self.client is None:
+            raise ValueError("KuCoin feed needs a REST client or an explicit URL")
+        token, server, ping_interval = await asyncio.to_thread(self._bullet)
+        self.heartbeat_interval = ping_interval
+        return f"{server}?token={token}&connectId={uuid.uuid4().hex}"
+
+    def _bullet(self) -> Tuple[str, str, float]:
+        client = self.client
+        response = client.transport.post(f"{client.base_url}/api/v1/bullet-public")
+        data: Dict[str, Any] = response.json()["data"]
+        server = data["instanceServers"][0]
+        return data["token"], server["endpoint"], server.get("pingInterval", 18000) / 1000 * 0.9
+
+    def subscribe_messages(self, streams: Sequence[StreamKey]) -> List[str]:
+        topics = [f"{symbol.upper()}_{interval}" for symbol, interval in streams]
+        return [
+            json.dumps(
+                {
+                    "id": str(next(self._ids)),
+                    "type": "subscribe",
+                    "topic": "/market/candles:" + ",".join(topics[start : start + self._batch]),
+                    "response": True,
+                }
+            )
+            for start in range(0, len(topics), self._batch)
+        ]
+
+    def heartbeat(self) -> Optional[str]:
+        return json.dumps({"id": str(next(self._ids)), "type": "ping"})
+
+    def parse(self, message: str | bytes) -> List[KlineEvent]:
+        payload = json.loads(message)
+        if not isinstance(payload, dict) or payload.get("type") != "message":
+            return []
+        topic = payload.get("topic", "")
+        if not topic.startswith("/market/candles:"):
+            return []
+        symbol, _, interval = topic.split(":", 1)[1].rpartition("_")
+        # [start (s), open, close, high, low, volume, turnover]
+        candle = payload["data"]["candles"]
+        return [
+            KlineEvent(
+                exchange=self.name,
+                symbol=symbol,
+                interval=interval,
+                timestamp_ms=int(candle[0]) * 1000,
+                open=float(candle[1]),
+                high=float(candle[3]),
+                low=float(candle[4]),
+                close=float(candle[2]),
+                volume=float(candle[5]),
+                closed=False,
+            )
+        ]
+
+
+FEEDS = {
+    "binance": BinanceKlineFeed,
+    "bybit": BybitKlineFeed,
+    "kucoin": KuCoinKlineFeed,
+}
+
+
+def feed_for(client: ExchangeClient, url: str | None = None) -> KlineFeed:
+    """Return the kline feed matching a REST client."""
+    try:
+        feed_cls = FEEDS[client.name]
+    except KeyError:
+        raise ValueError(f"No kline stream available for exchange {client.name!r}") from None
+    if feed_cls is KuCoinKlineFeed:
+        return KuCoinKlineFeed(url, client=client)
+    return feed_cls(url)
+
+
+__all__ = [
+    "BinanceKlineFeed",
+    "BybitKlineFeed",
+    "FEEDS",
+    "KlineEvent",
+    "KlineFeed",
+    "KuCoinKlineFeed",
+    "StreamKey",
+    "feed_for",
+]
@@ -0,0 +1,309 @@
+"""Kline streaming over WebSocket feeding the signal engine as candles close."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from ..candles import CandleSeries
+from ..exchanges.base import ExchangeClient
+from .feeds import KlineEvent, KlineFeed, StreamKey, feed_for
+from .websocket import WebSocket, WebSocketError, connect
+
+if TYPE_CHECKING:  # pragma: no cover - imported for type hints only
+    from ..engine import SignalConfig, SignalEngine
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[KlineEvent], Any]
+
+
+class KlineStream:
+    """Multiplexes many ``(symbol, interval)`` streams of one exchange.
+
+    Streams are packed onto as few connections as the feed allows. Dropped
+    connections are re-established with jittered exponential backoff, and
+    closed candles missed while disconnected (or skipped by the feed) are
+    backfilled through the REST client before newer candles are delivered.
+    Malformed messages are skipped and a failing ``on_event`` is logged, so
+    neither stops the stream.
+    """
+
+    def __init__(
+        self,
+        feed: KlineFeed,
+        client: ExchangeClient,
+        streams: Iterable[StreamKey],
+        on_event: EventHandler,
+        *,
+        include_partial: bool = False,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.feed = feed
+        self.client = client
+        self.streams = [(symbol.upper(), interval) for symbol, interval in streams]
+        self.on_event = on_event
+        self.include_partial = include_partial
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.clock = clock
+        self.last_closed: Dict[StreamKey, int] = {}
+        self._in_progress: Dict[StreamKey, KlineEvent] = {}
+
+    async def run(self) -> None:
+        """Stream until cancelled."""
+        size = self.feed.max_streams_per_connection
+        chunks = [self.streams[start : start + size] for start in range(0, len(self.streams), size)]
+        await asyncio.gather(*(self._run_connection(chunk) for chunk in chunks))
+
+    async def _run_connection(self, streams: Sequence[StreamKey]) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                websocket = await connect(await self.feed.endpoint(streams))
+                try:
+                    for message in self.feed.subscribe_messages(streams):
+                        await websocket.send(message)
+                    delay = self.reconnect_delay
+                    await self._backfill_all(streams)
+                    await self._consume(websocket)
+                finally:
+                    await websocket.close()
+            except (
+                OSError,
+                WebSocketError,
+                asyncio.TimeoutError,
+                asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError,
+                # Malformed handshake responses, e.g. an error from the KuCoin bullet endpoint
+                KeyError,
+                IndexError,
+                ValueError,
+            ) as error:
+                logger.warning("Kline stream %s disconnected: %s", self.feed.name, error)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _consume(self, websocket: WebSocket) -> None:
+        heartbeat = None
+        if self.feed.heartbeat_interval:
+            heartbeat = asyncio.create_task(self._heartbeat(websocket))
+        try:
+            while True:
+                message = await websocket.recv()
+                try:
+                    events = self.feed.parse(message)
+                except (KeyError, IndexError, TypeError, ValueError) as error:
+                    logger.warning(
+                        "Kline stream %s: skipping malformed message %.200r: %r", self.feed.name, message, error
+                    )
+                    continue
+                for event in events:
+                    await self.handle(event)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, websocket: WebSocket) -> None:
+        while True:
+            await asyncio.sleep(self.feed.heartbeat_interval)
+            message = self.feed.heartbeat()
+            if message is not None:
+                await websocket.send(message)
+
+    async def handle(self, event: KlineEvent) -> None:
+        event.symbol = event.symbol.upper()
+        if not self.feed.reports_close:
+            previous = self._in_progress.get(event.key)
+            if previous is not None and event.timestamp_ms > previous.timestamp_ms:
+                previous.closed = True
+                await self._emit_closed(previous)
+            self._in_progress[event.key] = event
+        elif event.closed:
+            await self._emit_closed(event)
+            return
+        if self.include_partial:
+            await self._dispatch(event)
+
+    async def _emit_closed(self, event: KlineEvent) -> None:
+        last = self.last_closed.get(event.key)
+        if last is not None and event.timestamp_ms <= last:
+            return
+        step = self.client.interval_ms(event.interval)
+        if last is not None and event.timestamp_ms > last + step:
+            await self._backfill(event.key, until=event.timestamp_ms)
+        self.last_closed[event.key] = event.timestamp_ms
+        await self._dispatch(event)
+
+    async def _backfill_all(self, streams: Sequence[StreamKey]) -> None:
+        for key in streams:
+            await self._backfill(key)
+
+    async def _backfill(self, key: StreamKey, until: Optional[int] = None) -> None:
+        """Deliver closed candles after the last seen one and before ``until``."""
+        last = self.last_closed.get(key)
+        if last is None:
+            return
+        symbol, interval = key
+        step = self.client.interval_ms(interval)
+        now = int(self.clock() * 1000)
+        end = until if until is not None else now - now % step
+        missing = (end - last) // step - 1
+        if missing <= 0:
+            return
+        logger.info("Backfilling %d %s %s candles from REST", missing, symbol, interval)
+        fetch = functools.partial(self.client.fetch_ohlc, symbol, interval, limit=missing, start_time=last + step)
+        try:
+            candles = CandleSeries.coerce(await asyncio.to_thread(fetch))
+        except Exception as error:  # a failed backfill must not kill the stream
+            logger.warning("Backfill for %s %s failed: %s", symbol, interval, error)
+            return
+        for candle in candles:
+            timestamp = candle.timestamp_ms
+            if not last < timestamp < end or timestamp + step > now:
+                continue
+            last = timestamp
+            self.last_closed[key] = timestamp
+            await self._dispatch(
+                KlineEvent(
+                    exchange=self.feed.name,
+                    symbol=symbol,
+                    interval=interval,
+                    timestamp_ms=timestamp,
+                    open=candle.open,
+                    high=candle.high,
+                    low=candle.low,
+                    close=candle.close,
+                    volume=candle.volume,
+                    closed=True,
+                )
+            )
+
+    async def _dispatch(self, event: KlineEvent) -> None:
+        try:
+            result = self.on_event(event)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:  # one failing handler must not drop the connection
+            logger.exception("Kline handler failed for %s %s", event.symbol, event.interval)
+
+
+class StreamingSignalRunner:
+    """Keeps incremental indicator state per config and evaluates it on every closed candle.
+
+    State is seeded once from the REST clients; afterwards each candle close
+    costs O(1) per config instead of a fetch plus a full recomputation.
+    Configs with ``filters`` also keep the last closed candles their filters
+    need, which are evaluated on every close.
+    """
+
+    def __init__(
+        self,
+        engine: "SignalEngine",
+        configs: Iterable["SignalConfig"],
+        *,
+        include_partial: bool = False,
+        on_signals: Callable[["SignalConfig", Dict[str, str]], Any] | None = None,
+        on_partial: Callable[["SignalConfig", KlineEvent], Any] | None = None,
+        feed_urls: Mapping[str, str] | None = None,
+        notify: bool = True,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.engine = engine
+        self.configs = list(configs)
+        self.include_partial = include_partial
+        self.on_signals = on_signals
+        self.on_partial = on_partial
+        self.feed_urls = dict(feed_urls or {})
+        self.notify = notify
+        self.clock = clock
+        self.streams: List[KlineStream] = []
+        self._states: Dict[int, Any] = {}
+        self._windows: Dict[int, int] = {}
+        self._tails: Dict[int, CandleSeries] = {}
+        self._groups: Dict[int, Dict[StreamKey, List["SignalConfig"]]] = defaultdict(lambda: defaultdict(list))
+        self._clients: Dict[int, ExchangeClient] = {}
+        for config in self.configs:
+            client = config.exchange
+            self._clients[id(client)] = client
+            self._groups[id(client)][(config.symbol.upper(), config.interval)].append(config)
+
+    async def run(self) -> None:
+        """Seed indicator state and stream until cancelled."""
+        await self.seed()
+        await asyncio.gather(*(stream.run() for stream in self.streams))
+
+    async def seed(self) -> None:
+        self.streams = []
+        now = int(self.clock() * 1000)
+        for client_id, group in self._groups.items():
+            client = self._clients[client_id]
+            stream = KlineStream(
+                feed_for(client, self.feed_urls.get(client.name)),
+                client,
+                group.keys(),
+                functools.partial(self._on_event, client_id),
+                include_partial=self.include_partial,
+                clock=self.clock,
+            )
+            for key, configs in group.items():
+                for config in configs:
+                    candles = await asyncio.to_thread(self.engine.fetch_candles, config)
+                    step = client.interval_ms(config.interval)
+                    closed = candles[: _count_closed(candles, step, now)]
+                    self._states[id(config)] = self.engine.create_state(config, closed)
+                    filter_set = self.engine.filter_set
+                    if config.filters and filter_set is not None:
+                        window = self._windows[id(config)] = filter_set.required_candles(config.filters)
+                        self._tails[id(config)] = closed.tail(window).copy()
+                    if closed:
+                        stream.last_closed[key] = closed.timestamps[-1]
+            self.streams.append(stream)
+
+    async def _on_event(self, client_id: int, event: KlineEvent) -> None:
+        for config in self._groups[client_id].get(event.key, ()):
+            if not event.closed:
+                if self.on_partial is not None:
+                    await _maybe_await(self.on_partial(config, event))
+                continue
+            state = self._states[id(config)]
+            state.update(event)
+            signals = self.engine.generate_signals_from_state(config, state, self._filter_candles(config, event))
+            if self.notify:
+                await asyncio.to_thread(self.engine.notify, config, signals)
+            if self.on_signals is not None:
+                await _maybe_await(self.on_signals(config, signals))
+
+    def _filter_candles(self, config: "SignalConfig", event: KlineEvent) -> CandleSeries | None:
+        """Closed candles for ``config``'s filters, including ``event``."""
+        tail = self._tails.get(id(config))
+        if tail is None:
+            return None
+        window = self._windows[id(config)]
+        tail.append(event.timestamp_ms, event.open, event.high, event.low, event.close, event.volume)
+        if len(tail) >= 2 * window:
+            # Trimming only now and then keeps appends amortised O(1)
+            tail = self._tails[id(config)] = tail.tail(window).copy()
+        return tail.tail(window)
+
+
+def _count_closed(candles: CandleSeries, step: int, now: int) -> int:
+    count = len(candles)
+    while count and candles.timestamps[count - 1] + step > now:
+        count -= 1
+    return count
+
+
+async def _maybe_await(result: Any) -> None:
+    if inspect.isawaitable(result):
+        await result
+
+
+__all__ = ["EventHandler", "KlineStream", "StreamingSignalRunner"]
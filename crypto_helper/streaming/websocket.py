@@ -0,0 +1,253 @@
+"""Minimal RFC 6455 WebSocket client and server on top of asyncio streams.
+
+Only what the kline feeds need is implemented: text/binary messages,
+fragmentation, ping/pong and the closing handshake. The server side exists so
+streaming code can be exercised against a local stand-in exchange.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import os
+import ssl
+import struct
+from typing import Awaitable, Callable, Dict, Tuple
+from urllib.parse import urlsplit
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+class WebSocketError(Exception):
+    """Raised on protocol violations and failed handshakes."""
+
+
+class ConnectionClosed(WebSocketError):
+    """Raised when the peer closed the connection."""
+
+    def __init__(self, code: int = 1006, reason: str = "") -> None:
+        super().__init__(f"WebSocket closed ({code}) {reason}".strip())
+        self.code = code
+        self.reason = reason
+
+
+def _accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + _GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _apply_mask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    length = len(payload)
+    repeated = (mask * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+
+
+class WebSocket:
+    """One established WebSocket connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *, is_client: bool) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._is_client = is_client
+        self._write_lock = asyncio.Lock()
+        self.closed = False
+
+    async def send(self, message: str | bytes) -> None:
+        if isinstance(message, str):
+            await self._send_frame(OP_TEXT, message.encode("utf-8"))
+        else:
+            await self._send_frame(OP_BINARY, message)
+
+    async def ping(self, payload: bytes = b"") -> None:
+        await self._send_frame(OP_PING, payload)
+
+    async def recv(self) -> str | bytes:
+        """Return the next data message, answering pings along the way."""
+        fragments: list[bytes] = []
+        message_opcode = None
+        while True:
+            fin, opcode, payload = await self._read_frame()
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                reason = payload[2:].decode("utf-8", "replace")
+                await self.close(1000 if code == 1005 else code)
+                raise ConnectionClosed(code, reason)
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+                fragments = []
+            elif message_opcode is None:
+                raise WebSocketError("Unexpected continuation frame")
+            fragments.append(payload)
+            if sum(map(len, fragments)) > MAX_MESSAGE_SIZE:
+                raise WebSocketError("Message too large")
+            if fin:
+                data = b"".join(fragments)
+                return data.decode("utf-8") if message_opcode == OP_TEXT else data
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        try:
+            await self._send_frame(OP_CLOSE, struct.pack("!H", code))
+        except (ConnectionError, RuntimeError):
+            pass
+        self.closed = True
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, ssl.SSLError):
+            pass
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        if self.closed:
+            raise ConnectionClosed(1006, "connection already closed")
+        header = bytearray([0x80 | opcode])
+        mask_bit = 0x80 if self._is_client else 0
+        length = len(payload)
+        if length < 126:
+            header.append(mask_bit | length)
+        elif length < 1 << 16:
+            header.append(mask_bit | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(mask_bit | 127)
+            header += struct.pack("!Q", length)
+        if self._is_client:
+            mask = os.urandom(4)
+            header += mask
+            payload = _apply_mask(payload, mask)
+        async with self._write_lock:
+            self._writer.write(bytes(header) + payload)
+            await self._writer.drain()
+
+    async def _read_frame(self) -> Tuple[bool, int, bytes]:
+        try:
+            first, second = await self._reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack("!H", await self._reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await self._reader.readexactly(8))
+            if length > MAX_MESSAGE_SIZE:
+                raise WebSocketError("Frame too large")
+            mask = await self._reader.readexactly(4) if second & 0x80 else None
+            payload = await self._reader.readexactly(length)
+        except asyncio.IncompleteReadError as error:
+            self.closed = True
+            raise ConnectionClosed(1006, "connection lost") from error
+        if mask is not None:
+            payload = _apply_mask(payload, mask)
+        return bool(first & 0x80), first & 0x0F, payload
+
+
+async def _read_http_head(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def connect(
+    url: str,
+    *,
+    ssl_context: ssl.SSLContext | None = None,
+    open_timeout: float = 10.0,
+) -> WebSocket:
+    """Open a client connection to a ``ws://`` or ``wss://`` URL."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "wss"
+    if parts.scheme not in ("ws", "wss") or not parts.hostname:
+        raise WebSocketError(f"Unsupported WebSocket URL: {url}")
+    port = parts.port or (443 if secure else 80)
+    context = (ssl_context or ssl.create_default_context()) if secure else None
+
+    async def handshake() -> WebSocket:
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=context, server_hostname=parts.hostname if secure else None
+        )
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {parts.hostname}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        )
+        writer.write(request.encode("ascii"))
+        await writer.drain()
+        status, headers = await _read_http_head(reader)
+        if " 101 " not in f"{status} " or headers.get("sec-websocket-accept") != _accept_key(key):
+            writer.close()
+            raise WebSocketError(f"WebSocket handshake failed: {status}")
+        return WebSocket(reader, writer, is_client=True)
+
+    return await asyncio.wait_for(handshake(), open_timeout)
+
+
+Handler = Callable[[WebSocket, str], Awaitable[None]]
+
+
+async def serve(handler: Handler, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+    """Start a WebSocket server calling ``handler(websocket, path)`` per connection."""
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line, headers = await _read_http_head(reader)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        key = headers.get("sec-websocket-key")
+        if not key or headers.get("upgrade", "").lower() != "websocket":
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n"
+            ).encode("ascii")
+        )
+        await writer.drain()
+        websocket = WebSocket(reader, writer, is_client=False)
+        path = request_line.split(" ")[1] if " " in request_line else "/"
+        try:
+            await handler(websocket, path)
+        except ConnectionClosed:
+            pass
+        finally:
+            await websocket.close()
+
+    return await asyncio.start_server(on_connection, host, port)
+
+
+__all__ = [
+    "ConnectionClosed",
+    "WebSocket",
+    "WebSocketError",
+    "connect",
+    "serve",
+]
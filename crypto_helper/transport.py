@@ -0,0 +1,264 @@
+"""Shared HTTP transport with connection pooling, retries and rate limiting."""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from . import metrics as _metrics
+from ._compat import requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({418, 429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """Token bucket allowing ``limit`` units of request weight per ``window`` seconds.
+
+    Requests reserve weight before they are sent and wait when the bucket is
+    empty, so the client paces itself instead of running into 429/418 bans.
+    Subclasses resynchronise the bucket with the usage an exchange reports in
+    its response headers.
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        window: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.limit = float(limit)
+        self.rate = limit / window
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(limit)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.limit, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: float = 1.0) -> float:
+        """Reserve ``weight`` units, sleeping as long as needed. Returns the wait time."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._tokens -= weight
+            wait = max(self._blocked_until - now, 0.0)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+        if wait > 0:
+            logger.debug("Rate limiter pacing request for %.3fs", wait)
+            self.sleep(wait)
+        return wait
+
+    def sync(self, remaining: float) -> None:
+        """Trust the server when it reports less headroom than the local bucket."""
+        with self._lock:
+            self._refill(self.clock())
+            self._tokens = min(self._tokens, float(remaining))
+
+    def block_for(self, seconds: float) -> None:
+        """Hold all requests for ``seconds`` (used for Retry-After and bans)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket from exchange rate-limit headers."""
+
+
+class BinanceRateLimiter(RateLimiter):
+    """Binance request weight: 6000 per minute per IP, reported in ``X-MBX-USED-WEIGHT-1M``."""
+
+    def __init__(self, limit: float = 6000, window: float = 60, **kwargs: Any) -> None:
+        super().__init__(limit, window, **kwargs)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        used = headers.get("X-MBX-USED-WEIGHT-1M") or headers.get("X-MBX-USED-WEIGHT")
+        if used is not None:
+            self.sync(self.limit - float(used))
+
+
+class BybitRateLimiter(RateLimiter):
+    """Bybit: 600 requests per 5 seconds per IP, plus per-endpoint ``X-Bapi-Limit*`` headers."""
+
+    def __init__(self, limit: float = 600, window: float = 5, **kwargs: Any) -> None:
+        super().__init__(limit, window, **kwargs)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("X-Bapi-Limit-Status")
+        if remaining is None:
+            return
+        self.sync(float(remaining))
+        reset = headers.get("X-Bapi-Limit-Reset-Timestamp")
+        if float(remaining) <= 0 and reset is not None:
+            self.block_for(max(int(reset) / 1000 - time.time(), 0.0))
+
+
+class KuCoinRateLimiter(RateLimiter):
+    """KuCoin public pool, reported in ``gw-ratelimit-remaining`` / ``gw-ratelimit-reset`` (ms)."""
+
+    def __init__(self, limit: float = 2000, window: float = 30, **kwargs: Any) -> None:
+        super().__init__(limit, window, **kwargs)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("gw-ratelimit-remaining")
+        if remaining is None:
+            return
+        self.sync(float(remaining))
+        reset = headers.get("gw-ratelimit-reset")
+        if float(remaining) <= 0 and reset is not None:
+            self.block_for(int(reset) / 1000)
+
+
+class HttpTransport:
+    """HTTP layer shared by all exchange clients.
+
+    One pooled keep-alive session serves every host, responses are requested
+    compressed, transient failures are retried with jittered exponential
+    backoff (honouring ``Retry-After``) and each host can be paced by a
+    :class:`RateLimiter`.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        *,
+        pool_size: int = 32,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 10.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.session = session or self._create_session(pool_size)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.sleep = sleep
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapters = getattr(requests, "adapters", None)
+        if adapters is not None:
+            adapter = adapters.HTTPAdapter(pool_connections=16, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        headers = getattr(session, "headers", None)
+        if headers is not None:
+            headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        return session
+
+    def rate_limiter(self, url: str, factory: Callable[[], RateLimiter] | None = None) -> Optional[RateLimiter]:
+        """Return the limiter for ``url``'s host, creating it with ``factory`` on first use."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None and factory is not None:
+                limiter = self._limiters[host] = factory()
+            return limiter
+
+    def get(self, url: str, params: Mapping[str, str] | None = None, *, weight: float = 1.0) -> Any:
+        return self.request("GET", url, params=params, weight=weight)
+
+    def post(self, url: str, json: Any = None, *, weight: float = 1.0) -> Any:
+        return self.request("POST", url, json=json, weight=weight)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Mapping[str, str] | None = None,
+        json: Any = None,
+        weight: float = 1.0,
+    ) -> Any:
+        """Send a request and return the successful response."""
+        limiter = self.rate_limiter(url)
+        metrics = _metrics.active()
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(weight)
+            metrics.inc("requests_total", host=host)
+            try:
+                with metrics.timer("http", host=host):
+                    if method == "GET":
+                        response = self.session.get(url, params=params, timeout=self.timeout)
+                    else:
+                        response = self.session.post(url, json=json, timeout=self.timeout)
+            except requests.RequestException as error:
+                metrics.inc("request_errors_total", host=host, reason=type(error).__name__)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("Request to %s failed (%s), retrying in %.2fs", url, error, delay)
+            else:
+                headers = getattr(response, "headers", None) or {}
+                if limiter is not None:
+                    limiter.update(headers)
+                status = response.status_code
+                if metrics.enabled:
+                    metrics.inc("response_bytes_total", len(getattr(response, "content", b"") or b""), host=host)
+                    if status >= 400:
+                        metrics.inc("request_errors_total", host=host, reason=str(status))
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = _retry_after(headers) or self._backoff(attempt)
+                if limiter is not None and status in (418, 429):
+                    limiter.block_for(delay)
+                logger.warning("HTTP %d from %s, retrying in %.2fs", status, url, delay)
+            metrics.inc("retries_total", host=host)
+            attempt += 1
+            self.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads retries of many workers instead of synchronising them
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+_default_transport: HttpTransport | None = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> HttpTransport:
+    """Process-wide transport shared by clients created without one."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
+
+
+__all__ = [
+    "BinanceRateLimiter",
+    "BybitRateLimiter",
+    "HttpTransport",
+    "KuCoinRateLimiter",
+    "RateLimiter",
+    "default_transport",
+]
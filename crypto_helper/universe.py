@@ -0,0 +1,80 @@
+"""Pre-selection of the markets worth scanning from one bulk ticker request.
+
+Fetching candles for every symbol of an exchange costs one request per
+symbol. The exchanges' bulk ticker endpoints (see
+:meth:`~crypto_helper.exchanges.base.ExchangeClient.fetch_tickers`) return the
+24-hour volume, price change and best bid/ask of every market at once, so the
+universe can be ranked and cut down before any candles are downloaded.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .exchanges.base import ExchangeClient, Ticker
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS: Dict[str, Callable[[Ticker], float]] = {
+    "volume": lambda ticker: ticker.quote_volume,
+    "change": lambda ticker: ticker.change_pct,
+    "abs_change": lambda ticker: abs(ticker.change_pct),
+    # Tightest spreads first, markets without a quote last
+    "spread": lambda ticker: -ticker.spread_pct if ticker.spread_pct is not None else float("-inf"),
+}
+
+
+@dataclass
+class UniverseFilter:
+    """Criteria a market must meet to be scanned.
+
+    ``quote`` keeps markets quoted in that currency; ``min_change`` and
+    ``max_change`` bound the 24-hour change in percent and ``max_spread_pct``
+    the bid/ask spread. Survivors are ranked by ``sort_by`` (descending) and
+    the first ``top`` are kept.
+    """
+
+    quote: Optional[str] = "USDT"
+    min_quote_volume: float = 0.0
+    min_change: Optional[float] = None
+    max_change: Optional[float] = None
+    max_spread_pct: Optional[float] = None
+    sort_by: str = "volume"
+    top: Optional[int] = 50
+
+    def __post_init__(self) -> None:
+        if self.sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {self.sort_by!r}; available: {', '.join(SORT_KEYS)}")
+
+    def matches(self, ticker: Ticker) -> bool:
+        if self.quote and not ticker.symbol.replace("-", "").upper().endswith(self.quote.upper()):
+            return False
+        if ticker.quote_volume < self.min_quote_volume:
+            return False
+        if self.min_change is not None and ticker.change_pct < self.min_change:
+            return False
+        if self.max_change is not None and ticker.change_pct > self.max_change:
+            return False
+        if self.max_spread_pct is not None:
+            spread = ticker.spread_pct
+            if spread is None or spread > self.max_spread_pct:
+                return False
+        return True
+
+
+def select(tickers: Iterable[Ticker], criteria: UniverseFilter) -> List[Ticker]:
+    """Tickers meeting ``criteria``, best ranked first."""
+    selected = sorted(filter(criteria.matches, tickers), key=SORT_KEYS[criteria.sort_by], reverse=True)
+    return selected if criteria.top is None else selected[: criteria.top]
+
+
+def scan_universe(client: ExchangeClient, criteria: UniverseFilter) -> List[str]:
+    """Symbols of ``client``'s markets meeting ``criteria``, from a single request."""
+    tickers = client.fetch_tickers()
+    selected = select(tickers, criteria)
+    logger.info("%s: отобрано %d из %d рынков", client.name, len(selected), len(tickers))
+    return [ticker.symbol for ticker in selected]
+
+
+__all__ = ["SORT_KEYS", "UniverseFilter", "scan_universe", "select"]
@@ -4,70 +4,334 @@ from __future__ import annotations
 import argparse
 import logging
 import os
+from typing import Dict, List, Tuple
 
-from crypto_helper import (
-    BinanceClient,
-    BybitClient,
-    KuCoinClient,
-    SignalConfig,
-    SignalEngine,
-    TelegramNotifier,
-)
+from crypto_helper import metrics, registry
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.filters import FilterError, FilterSet, parse_filters
 
 logging.basicConfig(level=logging.INFO)
 
-EXCHANGES = {
-    "binance": BinanceClient,
-    "bybit": BybitClient,
-    "kucoin": KuCoinClient,
-}
-
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run CryptoHelper signal engine")
-    parser.add_argument("symbol", help="Trading pair, e.g. BTCUSDT")
-    parser.add_argument("interval", help="Candle interval (1m, 1h, 1d, etc.)")
+    parser.add_argument(
+        "symbol",
+        help=(
+            "Trading pair, e.g. BTCUSDT. Several pairs may be given comma-separated or "
+            "as @path to a file with one pair per line; prefix a pair with "
+            "'exchange:' to override --exchange. '*' scans the exchange's most liquid markets, "
+            "pre-selected from one ticker request (see --quote, --top and --sort)"
+        ),
+    )
+    parser.add_argument(
+        "interval",
+        type=parse_intervals,
+        help=(
+            "Candle interval (1m, 1h, 1d, etc.); several comma-separated intervals, e.g. 5m,15m,1h,4h, "
+            "share one download of the finest one where that saves requests"
+        ),
+    )
     parser.add_argument(
         "--exchange",
-        choices=EXCHANGES.keys(),
+        type=str.lower,
         default="binance",
-        help="Exchange to fetch data from",
+        help=(
+            "Exchange to fetch data from (binance, bybit, kucoin or a plugin); join several with '+', "
+            "e.g. binance+bybit+kucoin, to merge their candles into a volume-weighted series"
+        ),
+    )
+    parser.add_argument(
+        "--quorum",
+        type=int,
+        default=None,
+        help="With several exchanges, use the first N to answer and ignore slower ones",
     )
     parser.add_argument("--ema-fast", type=int, default=50)
     parser.add_argument("--ema-slow", type=int, default=200)
     parser.add_argument("--rsi-period", type=int, default=14)
     parser.add_argument("--bollinger-period", type=int, default=20)
     parser.add_argument("--bollinger-std", type=float, default=2.0)
+    parser.add_argument(
+        "--cache",
+        default=os.getenv("CRYPTO_HELPER_CACHE"),
+        help="Path to an SQLite candle cache; only missing candles are downloaded",
+    )
+    parser.add_argument(
+        "--state",
+        default=os.getenv("CRYPTO_HELPER_STATE"),
+        help="Path to an SQLite signal-state file; only signals that switch on are sent",
+    )
+    parser.add_argument(
+        "--cooldown",
+        type=float,
+        default=0.0,
+        help="Seconds before the same signal may be sent again (with --state)",
+    )
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help=(
+            "Custom signal filter 'name: expression', e.g. 'dip: rsi(14) < 25 and volume > sma(volume, 20) * 2'; "
+            "may be repeated or given as @path to a file with one filter per line"
+        ),
+    )
+    parser.add_argument("--quote", default="USDT", help="Quote currency of the markets selected by '*'")
+    parser.add_argument(
+        "--min-volume", type=float, default=0.0, help="Minimum 24h quote volume of the markets selected by '*'"
+    )
+    parser.add_argument("--min-change", type=float, default=None, help="Minimum 24h price change, %% (with '*')")
+    parser.add_argument("--max-change", type=float, default=None, help="Maximum 24h price change, %% (with '*')")
+    parser.add_argument("--max-spread", type=float, default=None, help="Maximum bid/ask spread, %% (with '*')")
+    parser.add_argument(
+        "--sort",
+        choices=("volume", "change", "abs_change", "spread"),
+        default="volume",
+        help="Ranking of the markets selected by '*'",
+    )
+    parser.add_argument("--top", type=int, default=50, help="Number of markets selected by '*'")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent symbols in a scan")
+    parser.add_argument(
+        "--per-exchange",
+        type=int,
+        default=None,
+        help="Maximum concurrent requests against a single exchange",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Keep running and evaluate signals on every closed candle from the exchange WebSocket feed",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and evaluate every symbol right after each candle closes (exchange server time)",
+    )
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to wait after a candle closes (with --daemon)")
+    parser.add_argument("--jitter", type=float, default=2.0, help="Random extra delay spreading load (with --daemon)")
+    parser.add_argument("--metrics", help="Write Prometheus metrics of the run to this file")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--profile", help="Profile the run with cProfile and save the stats to this file")
+    parser.add_argument(
+        "--notifier",
+        type=str.lower,
+        default="telegram",
+        help="Notification channel (telegram or a plugin)",
+    )
     parser.add_argument("--telegram-token", default=os.getenv("TELEGRAM_TOKEN"))
-    parser.add_argument("--telegram-chat", default=os.getenv("TELEGRAM_CHAT_ID"))
+    parser.add_argument(
+        "--telegram-chat",
+        default=os.getenv("TELEGRAM_CHAT_ID"),
+        help="Chat ID to notify; several subscriber chats may be given comma-separated",
+    )
     return parser.parse_args()
 
 
+def parse_intervals(spec: str) -> List[str]:
+    intervals = [interval.strip() for interval in spec.split(",") if interval.strip()]
+    if not intervals:
+        raise argparse.ArgumentTypeError("at least one interval is required")
+    return intervals
+
+
+def parse_symbols(spec: str, default_exchange: str) -> List[Tuple[str, str]]:
+    """Expand the symbol argument into ``(exchange, symbol)`` pairs."""
+    if spec.startswith("@"):
+        with open(spec[1:], encoding="utf-8") as handle:
+            entries = [line.split("#", 1)[0].strip() for line in handle]
+    else:
+        entries = [entry.strip() for entry in spec.split(",")]
+
+    pairs = []
+    for entry in filter(None, entries):
+        exchange, _, symbol = entry.rpartition(":")
+        exchange = exchange.lower() or default_exchange
+        for name in exchange.split("+"):
+            if name not in registry.exchanges:
+                raise SystemExit(f"Unknown exchange {name!r} for {symbol}; available: {', '.join(registry.exchanges.names())}")
+        pairs.append((exchange, symbol))
+    return pairs
+
+
+def expand_universe(
+    pairs: List[Tuple[str, str]], exchanges: Dict[str, object], args: argparse.Namespace
+) -> List[Tuple[str, str]]:
+    """Replace ``*`` entries with the markets selected from each exchange's tickers."""
+    from crypto_helper.universe import UniverseFilter, scan_universe
+
+    criteria = UniverseFilter(
+        quote=args.quote,
+        min_quote_volume=args.min_volume,
+        min_change=args.min_change,
+        max_change=args.max_change,
+        max_spread_pct=args.max_spread,
+        sort_by=args.sort,
+        top=args.top,
+    )
+    expanded = []
+    for exchange, symbol in pairs:
+        if symbol != "*":
+            expanded.append((exchange, symbol))
+            continue
+        try:
+            symbols = scan_universe(exchanges[exchange], criteria)
+        except NotImplementedError as error:
+            raise SystemExit(str(error))
+        expanded.extend((exchange, selected) for selected in symbols)
+    return list(dict.fromkeys(expanded))
+
+
+def create_exchange(name: str, quorum: int | None = None):
+    """Client for ``name``; ``a+b`` builds a composite client over both exchanges.
+
+    ``CRYPTO_HELPER_<NAME>_URL`` points an exchange at another server, e.g. a
+    local stand-in from ``benchmarks.server``.
+    """
+    clients = []
+    for part in name.split("+"):
+        base_url = os.getenv(f"CRYPTO_HELPER_{part.upper()}_URL")
+        client_cls = registry.exchanges.get(part)
+        clients.append(client_cls(base_url=base_url) if base_url else client_cls())
+    if len(clients) == 1:
+        return clients[0]
+    from crypto_helper.exchanges.composite import CompositeExchangeClient
+
+    return CompositeExchangeClient(clients, quorum=quorum)
+
+
 def main() -> None:
     args = parse_args()
     if not args.telegram_token or not args.telegram_chat:
         raise SystemExit("Telegram token and chat ID must be provided")
 
-    exchange_cls = EXCHANGES[args.exchange]
-    exchange = exchange_cls()
-    notifier = TelegramNotifier(token=args.telegram_token, chat_id=args.telegram_chat)
-
-    config = SignalConfig(
-        symbol=args.symbol,
-        interval=args.interval,
-        exchange=exchange,
-        telegram_notifier=notifier,
-        ema_fast=args.ema_fast,
-        ema_slow=args.ema_slow,
-        rsi_period=args.rsi_period,
-        bollinger_period=args.bollinger_period,
-        bollinger_std_dev=args.bollinger_std,
-    )
-
-    engine = SignalEngine()
-    signals = engine.run(config)
-    for name, description in signals.items():
-        logging.info("%s: %s", name, description)
+    if args.notifier not in registry.notifiers:
+        raise SystemExit(f"Unknown notifier {args.notifier!r}; available: {', '.join(registry.notifiers.names())}")
+
+    if len(args.interval) > 1 and (args.stream or args.daemon):
+        raise SystemExit("Several intervals are only supported for a one-off scan")
+
+    pairs = parse_symbols(args.symbol, args.exchange)
+    filters = parse_filters(args.filter)
+    filter_set = None
+    if filters:
+        try:
+            filter_set = FilterSet(filters)
+        except FilterError as error:
+            raise SystemExit(str(error))
+    store = None
+    if args.cache:
+        from crypto_helper.exchanges.cache import CachedExchangeClient, CandleStore
+
+        store = CandleStore(args.cache)
+    # One client per exchange, so every symbol reuses its HTTP session
+    clients = {name: create_exchange(name, args.quorum) for name in {exchange for exchange, _ in pairs}}
+    exchanges = dict(clients)
+    if store is not None:
+        exchanges = {name: CachedExchangeClient(client, store) for name, client in clients.items()}
+    if any(symbol == "*" for _, symbol in pairs):
+        pairs = expand_universe(pairs, exchanges, args)
+        if not pairs:
+            raise SystemExit("No markets match the universe criteria")
+    chats = [chat.strip() for chat in args.telegram_chat.split(",") if chat.strip()]
+    notifier = registry.notifiers.get(args.notifier)(token=args.telegram_token, chat_id=chats[0])
+    from crypto_helper.notifications.dispatch import TelegramDispatcher
+
+    # Messages are delivered in the background, so slow Telegram calls never hold up the scan
+    dispatcher = TelegramDispatcher(notifier, chats)
+
+    configs = [
+        SignalConfig(
+            symbol=symbol,
+            interval=args.interval[0],
+            exchange=exchanges[exchange],
+            telegram_notifier=dispatcher,
+            ema_fast=args.ema_fast,
+            ema_slow=args.ema_slow,
+            rsi_period=args.rsi_period,
+            bollinger_period=args.bollinger_period,
+            bollinger_std_dev=args.bollinger_std,
+            filters=tuple(filters),
+        )
+        for exchange, symbol in pairs
+    ]
+
+    metrics_registry = None
+    if args.metrics or args.metrics_port:
+        metrics_registry = metrics.MetricsRegistry()
+        metrics.use(metrics_registry)
+        if args.metrics_port:
+            metrics_registry.serve(args.metrics_port)
+
+    try:
+        if args.profile:
+            _, stats = metrics.profile(run, args, configs, filter_set, path=args.profile)
+            logging.info("Profile saved to %s\n%s", args.profile, metrics.format_stats(stats))
+        else:
+            run(args, configs, filter_set)
+    finally:
+        dispatcher.close()
+        for client in clients.values():
+            # Composite clients own a thread pool for their parallel requests
+            if hasattr(client, "close"):
+                client.close()
+        if metrics_registry is not None and args.metrics:
+            metrics_registry.write(args.metrics)
+
+
+def run(args: argparse.Namespace, configs: List[SignalConfig], filter_set: FilterSet | None = None) -> None:
+    state_store = None
+    if args.state:
+        from crypto_helper.state import SignalStateStore
+
+        state_store = SignalStateStore(args.state)
+    engine = SignalEngine(state_store=state_store, cooldown=args.cooldown, filter_set=filter_set)
+    if args.stream:
+        import asyncio
+
+        from crypto_helper.streaming import StreamingSignalRunner
+
+        try:
+            asyncio.run(StreamingSignalRunner(engine, configs).run())
+        except KeyboardInterrupt:
+            logging.info("Streaming stopped")
+        return
+
+    if args.daemon:
+        from crypto_helper.scheduler import CandleScheduler
+
+        scheduler = CandleScheduler(
+            engine,
+            configs,
+            delay=args.delay,
+            jitter=args.jitter,
+            max_workers=args.workers,
+            per_exchange_limit=args.per_exchange,
+        )
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            logging.info("Daemon stopped")
+        return
+
+    timeframes = args.interval if len(args.interval) > 1 else None
+    if len(configs) == 1 and timeframes is None:
+        signals = engine.run(configs[0])
+        for name, description in signals.items():
+            logging.info("%s: %s", name, description)
+        return
+
+    results = engine.run_many(
+        configs, max_workers=args.workers, per_exchange_limit=args.per_exchange, timeframes=timeframes
+    )
+    for result in results:
+        if not result.ok:
+            logging.error("%s: %s", result.config.symbol, result.error)
+            continue
+        for name, description in result.signals.items():
+            logging.info("%s %s: %s", result.config.symbol, name, description)
+    failed = sum(1 for result in results if not result.ok)
+    logging.info("Scanned %d symbols, %d failed", len(results), failed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Exchange, notifier and clock stand-ins shared by the test modules."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, List, Mapping, Tuple
+
+from crypto_helper._compat import requests
+from crypto_helper.candles import CandleSeries
+from crypto_helper.exchanges.base import ExchangeClient
+
+MINUTE = 60_000
+
+
+def minutes(start: int, count: int, step: int = MINUTE) -> CandleSeries:
+    """``count`` candles from ``start`` whose close is their index."""
+    opens = [start + index * step for index in range(count)]
+    prices = [float(index) for index in range(count)]
+    return CandleSeries(
+        opens, prices, [price + 0.5 for price in prices], [price - 0.5 for price in prices], prices, [1.0] * count
+    )
+
+
+class DummyExchange(ExchangeClient):
+    """Exchange stub serving a fixed history and recording every request.
+
+    ``candles`` is a list of ``OHLCV``, a :class:`CandleSeries`, or a mapping
+    of symbols to either. Requests are recorded as
+    ``(symbol, interval, limit, start_time)``.
+    """
+
+    base_url = "https://example.com"
+    name = "dummy"
+
+    def __init__(self, candles: Any):
+        super().__init__()
+        self._candles = candles
+        self.requests: List[Tuple[str, str, int, int | None]] = []
+
+    @property
+    def last_limit(self) -> int | None:
+        return self.requests[-1][2] if self.requests else None
+
+    def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100, start_time: int | None = None) -> Any:
+        self.requests.append((symbol, interval, limit, start_time))
+        candles = self._candles[symbol] if isinstance(self._candles, Mapping) else self._candles
+        if start_time is None:
+            return candles[-limit:]
+        candles = CandleSeries.coerce(candles)
+        first = bisect_left(candles.timestamps, start_time)
+        return candles[first : first + limit]
+
+    def _fetch_page(
+        self, symbol: str, interval: str, limit: int, start_time: int | None = None, end_time: int | None = None
+    ) -> Any:
+        return self.fetch_ohlc(symbol, interval, limit, start_time)
+
+
+class DummyNotifier:
+    """Telegram notifier stub used for capturing outgoing messages."""
+
+    def __init__(self, *, raise_error: bool = False, return_false: bool = False):
+        self.raise_error = raise_error
+        self.return_false = return_false
+        self.messages: List[str] = []
+
+    def send_message(self, text: str, chat_id: str | None = None) -> bool:
+        self.messages.append(text)
+        if self.raise_error:
+            raise requests.RequestException("network failure")
+        if self.return_false:
+            return False
+        return True
+
+
+class FakeClock:
+    """Manually advanced clock; ``sleep`` advances it and records the delay."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
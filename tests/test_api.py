@@ -0,0 +1,159 @@
+"""Tests for the HTTP signals API and its candle-close-aware response cache."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import unittest
+from typing import Dict, List, Tuple
+
+from crypto_helper.api import APIError, ResponseCache, SignalsAPI, main
+from crypto_helper.candles import CandleSeries
+from crypto_helper.exchanges.base import ExchangeClient
+from fakes import MINUTE, FakeClock
+
+
+class SlowExchange(ExchangeClient):
+    """Serves candles up to the clock's candle in progress, slowly, counting fetches."""
+
+    base_url = "https://example.com"
+    name = "static"
+
+    def __init__(self, clock: FakeClock) -> None:
+        super().__init__()
+        self.clock = clock
+        self.fetches: List[Tuple[str, str, int]] = []
+        self._lock = threading.Lock()
+
+    def server_time(self) -> int:
+        return int(self.clock() * 1000)
+
+    def _fetch_page(self, symbol, interval, limit, start_time=None, end_time=None):
+        with self._lock:
+            self.fetches.append((symbol, interval, limit))
+        threading.Event().wait(0.05)
+        last = int(self.clock() * 1000) // MINUTE
+        opens = [(last - index) * MINUTE for index in reversed(range(limit))]
+        closes = [100.0 + (index % 7) for index in range(limit)]
+        highs = [close + 1 for close in closes]
+        lows = [close - 1 for close in closes]
+        return CandleSeries(opens, closes, highs, lows, closes, [1.0] * limit)
+
+
+async def get(port: int, path: str) -> Tuple[int, Dict[str, str], dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(body)
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_concurrent_misses_share_one_computation(self) -> None:
+        clock = FakeClock(0.0)
+        cache = ResponseCache(clock=clock)
+        calls = []
+
+        async def compute():
+            calls.append(clock())
+            await asyncio.sleep(0.01)
+            return f"value{len(calls)}", clock() + 60
+
+        async def scenario():
+            first = await asyncio.gather(*(cache.get("key", compute) for _ in range(20)))
+            clock.now = 59.0
+            cached = await cache.get("key", compute)
+            clock.now = 60.0
+            refreshed = await cache.get("key", compute)
+            return first, cached, refreshed
+
+        first, cached, refreshed = asyncio.run(scenario())
+
+        self.assertEqual({value for value, _ in first}, {"value1"})
+        self.assertEqual(cached[0], "value1")
+        self.assertEqual(refreshed[0], "value2")
+        self.assertEqual((cache.misses, cache.coalesced, cache.hits), (2, 19, 1))
+
+    def test_failures_are_not_cached(self) -> None:
+        cache = ResponseCache()
+        attempts = []
+
+        async def compute():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return "ok", float("inf")
+
+        async def scenario():
+            with self.assertRaises(RuntimeError):
+                await cache.get("key", compute)
+            return await cache.get("key", compute)
+
+        self.assertEqual(asyncio.run(scenario())[0], "ok")
+
+
+class SignalsAPITests(unittest.TestCase):
+    def test_polling_costs_one_fetch_per_candle(self) -> None:
+        # 30 seconds into a candle
+        clock = FakeClock(1_700_000_010.0)
+        exchange = SlowExchange(clock)
+        api = SignalsAPI({"static": exchange}, port=0, delay=1.0, clock=clock)
+
+        async def scenario():
+            await api.start()
+            try:
+                path = "/signals/static/btcusdt/1m?ema_fast=5&ema_slow=20"
+                burst = await asyncio.gather(*(get(api.port, path) for _ in range(10)))
+                clock.now += 29.0  # still before the close plus delay
+                cached = await get(api.port, path)
+                clock.now += 2.0  # past the close plus delay
+                fresh = await get(api.port, path)
+                missing = await get(api.port, "/signals/nowhere/BTCUSDT/1m")
+                return burst, cached, fresh, missing
+            finally:
+                await api.close()
+
+        burst, cached, fresh, missing = asyncio.run(scenario())
+
+        self.assertEqual(len(exchange.fetches), 2)
+        status, headers, body = burst[0]
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Cache-Control"], "public, max-age=31")
+        # The candle in progress is dropped; the last closed one opened a minute before it
+        self.assertEqual(body["candle_open"], 1_700_000_010_000 // MINUTE * MINUTE - MINUTE)
+        self.assertEqual(body["expires_at"], 1_700_000_010_000 // MINUTE * MINUTE + MINUTE)
+        self.assertEqual(body["symbol"], "BTCUSDT")
+        self.assertIn("summary", body["signals"])
+        self.assertEqual(set(body["indicators"]), {"ema_fast", "ema_slow", "rsi", "macd", "bollinger"})
+        self.assertIsNotNone(body["indicators"]["macd"]["histogram"])
+        self.assertTrue(all(response[2] == body for response in burst))
+        self.assertEqual(cached[2], body)
+        self.assertEqual(fresh[2]["candle_open"], body["candle_open"] + MINUTE)
+        self.assertEqual(missing[0], 404)
+
+    def test_out_of_range_parameters_are_rejected_before_fetching(self) -> None:
+        clock = FakeClock(1_700_000_010.0)
+        exchange = SlowExchange(clock)
+        api = SignalsAPI({"static": exchange}, clock=clock)
+
+        for query in ({"ema_slow": "5000000"}, {"rsi_period": "0"}, {"ema_fast": "x"}, {"bollinger_std": "nan"}):
+            with self.subTest(query=query):
+                with self.assertRaises(APIError) as raised:
+                    asyncio.run(api.signals("static", "BTCUSDT", "1m", query))
+                self.assertEqual(raised.exception.status, 400)
+                self.assertIn(next(iter(query)), str(raised.exception))
+        self.assertFalse(exchange.fetches)
+        self.assertEqual(len(api.cache), 0)
+
+    def test_invalid_filter_exits_with_a_message(self) -> None:
+        with self.assertRaises(SystemExit) as raised:
+            main(["--filter", "rsi(14) <"])
+        self.assertIn("filter1", str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
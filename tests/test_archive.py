@@ -0,0 +1,105 @@
+"""Tests for the memory-mapped historical candle archive."""
+from __future__ import annotations
+
+import tempfile
+import unittest
+from array import array
+
+from crypto_helper.archive import ArchiveError, CandleArchive
+from crypto_helper.candles import CandleSeries
+from crypto_helper.indicators import core, vectorized
+from fakes import MINUTE, DummyExchange, minutes
+
+START = 1_699_833_600_000
+
+
+class CandleArchiveTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.archive = CandleArchive(self.directory.name)
+
+    def test_appended_candles_are_read_back_as_views(self) -> None:
+        candles = minutes(START, 500)
+        self.assertEqual(self.archive.append("binance", "BTCUSDT", "1m", candles[:300]), 300)
+        # Overlapping candles are skipped, only newer ones are written
+        self.assertEqual(self.archive.append("binance", "BTCUSDT", "1m", candles[200:]), 200)
+        self.assertEqual(self.archive.append("binance", "BTCUSDT", "1m", candles), 0)
+
+        stored = self.archive.read("binance", "BTCUSDT", "1m")
+        self.assertIsInstance(stored.close, memoryview)
+        self.assertTrue(stored.close.readonly)
+        self.assertEqual(list(stored.timestamps), list(candles.timestamps))
+        self.assertEqual(list(stored.close), list(candles.close))
+        self.assertEqual(list(self.archive.series()), [("binance", "BTCUSDT", "1m")])
+
+    def test_ranges_are_sliced_with_and_without_gaps(self) -> None:
+        candles = minutes(START, 100)
+        self.archive.append("binance", "BTCUSDT", "1m", candles)
+        window = self.archive.read("binance", "BTCUSDT", "1m", START + 10 * MINUTE, START + 19 * MINUTE)
+        self.assertEqual(list(window.timestamps), list(candles.timestamps[10:20]))
+
+        # A gap of an hour after the last candle moves later candles off their computed position
+        self.archive.append("binance", "BTCUSDT", "1m", minutes(START + 160 * MINUTE, 20))
+        window = self.archive.read("binance", "BTCUSDT", "1m", START + 95 * MINUTE, START + 165 * MINUTE)
+        self.assertEqual(window.timestamps[0], START + 95 * MINUTE)
+        self.assertEqual(window.timestamps[-1], START + 165 * MINUTE)
+        self.assertEqual(len(window), 11)
+        self.assertFalse(self.archive.read("binance", "BTCUSDT", "1m", START + 101 * MINUTE, START + 150 * MINUTE))
+
+    def test_indicators_consume_the_mapped_columns(self) -> None:
+        candles = minutes(START, 400)
+        self.archive.append("binance", "BTCUSDT", "1m", candles)
+        stored = self.archive.read("binance", "BTCUSDT", "1m").tail(300)
+        self.assertEqual(core.ema(stored.close, 20), core.ema(candles.close[100:], 20))
+        self.assertEqual(list(vectorized.rsi(stored.close, 14)), list(vectorized.rsi(candles.close[100:], 14)))
+
+    def test_copy_is_writable(self) -> None:
+        self.archive.append("binance", "BTCUSDT", "1m", minutes(START, 10))
+        copied = self.archive.read("binance", "BTCUSDT", "1m").copy()
+        self.assertIsInstance(copied.close, array)
+        copied.append(START + 10 * MINUTE, 1.0, 1.0, 1.0, 1.0, 1.0)
+        self.assertEqual(len(copied), 11)
+        self.assertEqual(self.archive.count("binance", "BTCUSDT", "1m"), 10)
+
+    def test_interrupted_append_is_ignored_and_repaired(self) -> None:
+        self.archive.append("binance", "BTCUSDT", "1m", minutes(START, 10))
+        directory = self.archive.path("binance", "BTCUSDT", "1m")
+        with open(directory / "timestamps.i64", "ab") as handle:
+            handle.write(array("q", [START + 10 * MINUTE]).tobytes())
+        self.assertEqual(self.archive.count("binance", "BTCUSDT", "1m"), 10)
+
+        self.archive.append("binance", "BTCUSDT", "1m", minutes(START + 10 * MINUTE, 5))
+        stored = self.archive.read("binance", "BTCUSDT", "1m")
+        self.assertEqual(list(stored.timestamps), list(minutes(START, 15).timestamps))
+
+    def test_unordered_candles_are_rejected(self) -> None:
+        candles = minutes(START, 3)
+        reversed_candles = CandleSeries(reversed(candles.timestamps), *([1.0] * 3 for _ in range(5)))
+        with self.assertRaises(ArchiveError):
+            self.archive.append("binance", "BTCUSDT", "1m", reversed_candles)
+
+    def test_download_resumes_and_skips_the_candle_in_progress(self) -> None:
+        client = DummyExchange(minutes(START, 1000))
+        now = (START + 600 * MINUTE + 30_000) / 1000
+        self.assertEqual(self.archive.download(client, "BTCUSDT", "1m", START, chunk=250, clock=lambda: now), 600)
+        starts = [(start_time, limit) for _, _, limit, start_time in client.requests]
+        self.assertEqual(starts, [(START, 250), (START + 250 * MINUTE, 250), (START + 500 * MINUTE, 100)])
+
+        later = now + 100 * 60
+        self.assertEqual(self.archive.download(client, "BTCUSDT", "1m", START, chunk=250, clock=lambda: later), 100)
+        self.assertEqual(client.requests[-1], ("BTCUSDT", "1m", 100, START + 600 * MINUTE))
+        self.assertEqual(self.archive.count("dummy", "BTCUSDT", "1m"), 700)
+
+
+class MemoryviewSeriesTests(unittest.TestCase):
+    def test_memoryview_columns_must_match_the_format(self) -> None:
+        timestamps = memoryview(array("q", [START]))
+        prices = memoryview(array("d", [1.0]))
+        self.assertEqual(len(CandleSeries(timestamps, prices, prices, prices, prices, prices)), 1)
+        with self.assertRaises(ValueError):
+            CandleSeries(prices, prices, prices, prices, prices, prices)
+
+
+if __name__ == "__main__":
+    unittest.main()
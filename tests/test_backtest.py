@@ -0,0 +1,77 @@
+"""Tests for the vectorized backtester."""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import random
+import unittest
+from unittest import mock
+
+from crypto_helper import registry
+from crypto_helper.backtest import Backtester, main, signal_events
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.registry import Registry
+from fakes import DummyExchange
+
+
+def _random_walk_candles(count: int, seed: int = 3) -> CandleSeries:
+    rng = random.Random(seed)
+    series = CandleSeries()
+    price = 100.0
+    for index in range(count):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.02)))
+        series.append(1_700_000_000_000 + index * 60_000, price, price, price, price, 1.0)
+    return series
+
+
+class BacktesterTests(unittest.TestCase):
+    def test_events_match_bar_by_bar_replay(self) -> None:
+        candles = _random_walk_candles(260)
+        config = SignalConfig(
+            symbol="BTCUSDT", interval="1m", exchange=None, telegram_notifier=None, ema_fast=5, ema_slow=20
+        )
+        engine = SignalEngine()
+        closes = list(candles.close)
+
+        events = signal_events(candles.close, config)
+
+        for name in ("ema_crossover", "rsi_oversold", "bollinger_bounce"):
+            replayed = [
+                index
+                for index in range(1, len(closes))
+                if name in engine.generate_signals(config, candles[: index + 1], closes[: index + 1])
+            ]
+            self.assertEqual(events[name], replayed, name)
+        self.assertTrue(any(events.values()), "random walk should trigger some signals")
+
+    def test_report_contains_forward_returns(self) -> None:
+        candles = _random_walk_candles(400)
+        config = SignalConfig(symbol="X", interval="1m", exchange=None, telegram_notifier=None, ema_fast=5, ema_slow=20)
+
+        report = Backtester(horizons=(1, 5)).run(candles, config)
+
+        for signal in report.signals:
+            if signal.index + 5 < len(candles):
+                expected = candles.close[signal.index + 5] / candles.close[signal.index] - 1
+                self.assertAlmostEqual(signal.forward_returns[5], expected)
+        self.assertEqual(
+            report.stats["rsi_oversold"][1].count,
+            sum(1 for signal in report.signals if signal.name == "rsi_oversold" and 1 in signal.forward_returns),
+        )
+
+
+    def test_cli_creates_registered_exchanges(self) -> None:
+        exchange = DummyExchange(_random_walk_candles(400))
+        exchanges = Registry("exchange", "crypto_helper.tests.exchanges")
+        exchanges.register("dummy", lambda: exchange)
+        output = io.StringIO()
+        with mock.patch.object(registry, "exchanges", exchanges), contextlib.redirect_stdout(output):
+            main(["BTCUSDT", "1m", "--exchange", "dummy", "--limit", "300", "--ema-fast", "5", "--ema-slow", "20"])
+
+        self.assertEqual(exchange.requests, [("BTCUSDT", "1m", 300, None)])
+        self.assertIn("ema_crossover", json.loads(output.getvalue())["stats"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,45 +2,30 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
+import threading
 from typing import List
 import unittest
 
 from crypto_helper._compat import requests
 
 from crypto_helper.engine import SignalConfig, SignalEngine
-from crypto_helper.exchanges.base import ExchangeClient, OHLCV
+from crypto_helper.exchanges.base import OHLCV
+from crypto_helper.state import SignalStateStore
+from fakes import DummyExchange, DummyNotifier
 
 
-class DummyExchange(ExchangeClient):
-    """Exchange stub that records requested candle limits."""
+class BarrierExchange(DummyExchange):
+    """Exchange stub whose fetches only complete when run concurrently."""
 
-    base_url = "https://example.com"
-
-    def __init__(self, candles: List[OHLCV]):
-        super().__init__()
-        self._candles = candles
-        self.last_limit: int | None = None
+    def __init__(self, candles: List[OHLCV], barrier: threading.Barrier):
+        super().__init__(candles)
+        self.barrier = barrier
 
     def fetch_ohlc(self, symbol: str, interval: str, limit: int = 100) -> List[OHLCV]:
-        self.last_limit = limit
-        return self._candles[-limit:]
-
-
-class DummyNotifier:
-    """Telegram notifier stub used for capturing outgoing messages."""
-
-    def __init__(self, *, raise_error: bool = False, return_false: bool = False):
-        self.raise_error = raise_error
-        self.return_false = return_false
-        self.messages: List[str] = []
-
-    def send_message(self, text: str) -> bool:
-        self.messages.append(text)
-        if self.raise_error:
-            raise requests.RequestException("network failure")
-        if self.return_false:
-            return False
-        return True
+        if symbol == "BROKEN":
+            raise requests.RequestException("unknown symbol")
+        self.barrier.wait(timeout=5)
+        return super().fetch_ohlc(symbol, interval, limit)
 
 
 def _make_candles(count: int) -> List[OHLCV]:
@@ -100,6 +85,62 @@ class SignalEngineTests(unittest.TestCase):
 
         self.assertTrue(notifier.messages, "Engine must attempt to send a Telegram message")
 
+    def test_state_signals_match_batch_signals(self) -> None:
+        candles = _make_candles(400)
+        config = SignalConfig(
+            symbol="BTCUSDT",
+            interval="1h",
+            exchange=DummyExchange(candles),
+            telegram_notifier=DummyNotifier(),
+        )
+        engine = SignalEngine()
+        state = engine.create_state(config, candles[:-1])
+        state.update(candles[-1])
+
+        close_prices = [candle.close for candle in candles]
+        expected = engine.generate_signals(config, candles, close_prices)
+
+        self.assertEqual(engine.generate_signals_from_state(config, state), expected)
+
+    def test_run_many_fetches_concurrently_and_collects_errors(self) -> None:
+        exchange = BarrierExchange(_make_candles(400), threading.Barrier(3))
+        notifier = DummyNotifier()
+        symbols = ["BTCUSDT", "BROKEN", "ETHUSDT", "SOLUSDT"]
+        configs = [
+            SignalConfig(symbol=symbol, interval="1h", exchange=exchange, telegram_notifier=notifier)
+            for symbol in symbols
+        ]
+
+        results = SignalEngine().run_many(configs, max_workers=4)
+
+        self.assertEqual([result.config.symbol for result in results], symbols)
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, requests.RequestException)
+        self.assertTrue(all(result.ok for index, result in enumerate(results) if index != 1))
+        self.assertEqual(len(notifier.messages), 3)
+
+    def test_state_store_notifies_only_on_transitions(self) -> None:
+        notifier = DummyNotifier()
+        config = SignalConfig(
+            symbol="BTCUSDT", interval="1h", exchange=DummyExchange([]), telegram_notifier=notifier
+        )
+        now = [1000.0]
+        engine = SignalEngine(state_store=SignalStateStore(), cooldown={"rsi_oversold": 600}, clock=lambda: now[0])
+        quiet = {"macd": "MACD", "summary": "Нет сильных сигналов — наблюдаем"}
+        oversold = {"rsi_oversold": "RSI", **quiet}
+
+        for signals, advance in ((quiet, 0), (oversold, 60), (oversold, 60), (quiet, 60), (oversold, 60), (oversold, 600)):
+            now[0] += advance
+            engine.notify(config, signals)
+        self.assertEqual(len(notifier.messages), 1, "repeats and re-entries within the cool-down are muted")
+        self.assertIn("rsi_oversold", notifier.messages[0])
+        self.assertNotIn("summary", notifier.messages[0])
+
+        engine.notify(config, quiet)
+        now[0] += 600
+        engine.notify(config, oversold)
+        self.assertEqual(len(notifier.messages), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
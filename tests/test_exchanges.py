@@ -0,0 +1,319 @@
+"""Tests for exchange clients parsing raw kline payloads."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Tuple
+import unittest
+
+from crypto_helper._requests_stub import Response
+from crypto_helper.candles import CandleSeries
+from crypto_helper.exchanges import BinanceClient, BybitClient, KuCoinClient
+from crypto_helper.exchanges.cache import CachedExchangeClient, CandleStore
+from crypto_helper.exchanges.base import ExchangeClient, Ticker
+from crypto_helper.exchanges.composite import CompositeExchangeClient, merge_candles
+from crypto_helper.universe import UniverseFilter, scan_universe, select
+
+
+class FakeSession:
+    """Session stub returning canned payloads and recording requests."""
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.calls: List[Tuple[str, Dict[str, str]]] = []
+
+    def get(self, url: str, params: dict | None = None, timeout: float | None = None) -> Response:
+        self.calls.append((url, dict(params or {})))
+        return Response(payload=self.payload)
+
+
+class ExchangeParsingTests(unittest.TestCase):
+    def assertChronological(self, candles: CandleSeries) -> None:
+        self.assertEqual(list(candles.timestamps), sorted(candles.timestamps))
+
+    def test_binance_rows_parse_into_candle_series(self) -> None:
+        payload = [
+            [1700000000000, "1.0", "2.0", "0.5", "1.5", "10", 1700000059999],
+            [1700000060000, "1.5", "2.5", "1.0", "2.0", "12", 1700000119999],
+        ]
+        candles = BinanceClient(session=FakeSession(payload)).fetch_ohlc("btcusdt", "1m", limit=2)
+
+        self.assertIsInstance(candles, CandleSeries)
+        self.assertEqual(list(candles.close), [1.5, 2.0])
+        self.assertEqual(candles[-1].timestamp_ms, 1700000060000)
+        self.assertEqual(candles[0].high, 2.0)
+
+    def test_bybit_rows_are_returned_oldest_first(self) -> None:
+        payload = {
+            "result": {
+                "list": [
+                    ["1700000060000", "1.5", "2.5", "1.0", "2.0", "12", "0"],
+                    ["1700000000000", "1.0", "2.0", "0.5", "1.5", "10", "0"],
+                ]
+            }
+        }
+        candles = BybitClient(session=FakeSession(payload)).fetch_ohlc("BTCUSDT", "1")
+
+        self.assertChronological(candles)
+        self.assertEqual(list(candles.close), [1.5, 2.0])
+
+    def test_kucoin_column_order_and_seconds_timestamps(self) -> None:
+        payload = {
+            "data": [
+                ["1700000060", "1.5", "2.0", "2.5", "1.0", "12", "0"],
+                ["1700000000", "1.0", "1.5", "2.0", "0.5", "10", "0"],
+            ]
+        }
+        session = FakeSession(payload)
+        candles = KuCoinClient(session=session).fetch_ohlc("BTC-USDT", "1min", limit=2, start_time=1700000000000)
+
+        self.assertEqual(session.calls[0][1]["startAt"], "1700000000")
+        self.assertChronological(candles)
+        self.assertEqual(candles[0].timestamp_ms, 1700000000000)
+        self.assertEqual(list(candles.close), [1.5, 2.0])
+        self.assertEqual(list(candles.high), [2.0, 2.5])
+
+    def test_bulk_tickers_share_one_shape(self) -> None:
+        binance = [
+            {
+                "symbol": "BTCUSDT",
+                "lastPrice": "100.0",
+                "priceChangePercent": "2.5",
+                "quoteVolume": "1000000",
+                "bidPrice": "99.9",
+                "askPrice": "100.1",
+            }
+        ]
+        bybit = {
+            "result": {
+                "list": [
+                    {
+                        "symbol": "BTCUSDT",
+                        "lastPrice": "100.0",
+                        "price24hPcnt": "0.025",
+                        "turnover24h": "1000000",
+                        "bid1Price": "99.9",
+                        "ask1Price": "100.1",
+                    }
+                ]
+            }
+        }
+        kucoin = {
+            "data": {
+                "ticker": [
+                    {
+                        "symbol": "BTC-USDT",
+                        "last": "100.0",
+                        "changeRate": "0.025",
+                        "volValue": "1000000",
+                        "buy": "99.9",
+                        "sell": "100.1",
+                    },
+                    {"symbol": "OLD-USDT", "last": None, "changeRate": None, "volValue": "0", "buy": None, "sell": None},
+                ]
+            }
+        }
+        for client, payload, url in (
+            (BinanceClient, binance, "/api/v3/ticker/24hr"),
+            (BybitClient, bybit, "/v5/market/tickers"),
+            (KuCoinClient, kucoin, "/api/v1/market/allTickers"),
+        ):
+            with self.subTest(exchange=client.name):
+                session = FakeSession(payload)
+                ticker = client(session=session).fetch_tickers()[0]
+
+                self.assertEqual(len(session.calls), 1)
+                self.assertTrue(session.calls[0][0].endswith(url))
+                self.assertAlmostEqual(ticker.change_pct, 2.5)
+                self.assertEqual(ticker.quote_volume, 1_000_000.0)
+                self.assertAlmostEqual(ticker.spread_pct, 0.2)
+
+        inactive = KuCoinClient(session=FakeSession(kucoin)).fetch_tickers()[1]
+        self.assertEqual((inactive.last, inactive.change_pct, inactive.spread_pct), (0.0, 0.0, None))
+
+    def test_large_limits_are_paginated_by_time_range(self) -> None:
+        step = 60_000
+        start = step * 28_000_000
+
+        class PagingSession(FakeSession):
+            def get(self, url, params=None, timeout=None):
+                self.calls.append((url, dict(params)))
+                first, last = int(params["startTime"]), int(params["endTime"])
+                opens = range(first, last + 1, step)
+                rows = [[ts, "1", "1", "1", str(ts // step), "1"] for ts in opens][: int(params["limit"])]
+                return Response(payload=rows)
+
+        session = PagingSession(None)
+        candles = BinanceClient(session=session).fetch_ohlc("BTCUSDT", "1m", limit=2500, start_time=start)
+
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual(len(candles), 2500)
+        self.assertEqual(list(candles.timestamps), list(range(start, start + 2500 * step, step)))
+
+    def test_clients_must_implement_fetch_page(self) -> None:
+        class Incomplete(ExchangeClient):
+            base_url = "https://example.com"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class UniverseTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tickers = [
+            Ticker("BTCUSDT", 100.0, 1.0, 5_000_000.0, 99.99, 100.01),
+            Ticker("ETHUSDT", 10.0, -6.0, 3_000_000.0, 9.99, 10.01),
+            Ticker("DOGEUSDT", 0.1, 12.0, 900_000.0, 0.099, 0.101),
+            Ticker("ETHBTC", 0.05, 0.5, 8_000_000.0, 0.0499, 0.0501),
+            Ticker("DEADUSDT", 1.0, 0.0, 10.0),
+        ]
+
+    def test_markets_are_filtered_and_ranked(self) -> None:
+        by_volume = select(self.tickers, UniverseFilter(top=2))
+        self.assertEqual([ticker.symbol for ticker in by_volume], ["BTCUSDT", "ETHUSDT"])
+
+        movers = select(self.tickers, UniverseFilter(min_quote_volume=100_000, sort_by="abs_change", top=None))
+        self.assertEqual([ticker.symbol for ticker in movers], ["DOGEUSDT", "ETHUSDT", "BTCUSDT"])
+
+        tight = select(self.tickers, UniverseFilter(quote=None, max_spread_pct=0.5, min_change=0.0, top=None))
+        self.assertEqual([ticker.symbol for ticker in tight], ["ETHBTC", "BTCUSDT"])
+
+        with self.assertRaises(ValueError):
+            UniverseFilter(sort_by="name")
+
+    def test_scan_uses_a_single_request(self) -> None:
+        payload = {
+            "data": {
+                "ticker": [
+                    {"symbol": "BTC-USDT", "last": "1", "changeRate": "0", "volValue": "20", "buy": "1", "sell": "1"},
+                    {"symbol": "ETH-USDT", "last": "1", "changeRate": "0", "volValue": "30", "buy": "1", "sell": "1"},
+                ]
+            }
+        }
+        session = FakeSession(payload)
+
+        symbols = scan_universe(KuCoinClient(session=session), UniverseFilter())
+
+        self.assertEqual(symbols, ["ETH-USDT", "BTC-USDT"])
+        self.assertEqual(len(session.calls), 1)
+
+
+class SyntheticClient(BinanceClient):
+    """Client serving one-minute candles up to the current clock time."""
+
+    def __init__(self, clock):
+        super().__init__(session=FakeSession([]))
+        self.clock = clock
+        self.requests: List[Tuple[int, int | None]] = []
+
+    def fetch_ohlc(self, symbol, interval, limit=100, start_time=None):
+        self.requests.append((limit, start_time))
+        step = self.interval_ms(interval)
+        now = int(self.clock() * 1000)
+        last_open = now - now % step
+        first = last_open - (limit - 1) * step if start_time is None else start_time
+        opens = range(first, min(last_open, first + (limit - 1) * step) + 1, step)
+        return CandleSeries(opens, *([float(ts // step) for ts in opens] for _ in range(5)))
+
+
+class CachedExchangeClientTests(unittest.TestCase):
+    def test_only_missing_tail_is_requested(self) -> None:
+        now = [1_700_000_030.0]
+        upstream = SyntheticClient(lambda: now[0])
+        client = CachedExchangeClient(upstream, CandleStore(), clock=lambda: now[0])
+
+        first = client.fetch_ohlc("BTCUSDT", "1m", limit=50)
+        now[0] += 180
+        second = client.fetch_ohlc("BTCUSDT", "1m", limit=50)
+
+        self.assertEqual(len(first), 50)
+        self.assertEqual(upstream.requests[0], (50, None))
+        self.assertEqual(upstream.requests[1], (4, first.timestamps[-2] + 60_000))
+        expected = upstream.fetch_ohlc("BTCUSDT", "1m", limit=50)
+        self.assertEqual(list(second.timestamps), list(expected.timestamps))
+        self.assertEqual(list(second.close), list(expected.close))
+
+
+class StaticClient(KuCoinClient):
+    """Returns fixed candles, optionally blocking until released."""
+
+    def __init__(self, name: str, close: float, volume: float, release: threading.Event | None = None):
+        super().__init__(session=FakeSession([]))
+        self.name = name
+        self.close = close
+        self.volume = volume
+        self.release = release
+        self.calls: List[Tuple[str, str]] = []
+
+    def fetch_ohlc(self, symbol, interval, limit=100, start_time=None):
+        self.calls.append((symbol, interval))
+        if self.release is not None:
+            self.release.wait(5)
+        opens = [1_700_000_000_000 + index * 60_000 for index in range(limit)]
+        return CandleSeries(opens, *([self.close] * limit for _ in range(4)), [self.volume] * limit)
+
+
+class CompositeExchangeClientTests(unittest.TestCase):
+    def test_native_spellings(self) -> None:
+        kucoin = KuCoinClient(session=FakeSession([]))
+        bybit = BybitClient(session=FakeSession([]))
+        binance = BinanceClient(session=FakeSession([]))
+        self.assertEqual(kucoin.native_symbol("ethbtc"), "ETH-BTC")
+        self.assertEqual(kucoin.native_interval("1h"), "1hour")
+        self.assertEqual(bybit.native_interval("4h"), "240")
+        self.assertEqual(bybit.native_interval("1d"), "D")
+        self.assertEqual(binance.native_symbol("BTC-USDT"), "BTCUSDT")
+        self.assertEqual(binance.native_interval("15min"), "15m")
+
+    def test_candles_are_volume_weighted(self) -> None:
+        first = CandleSeries([0, 60_000], [10.0, 10.0], [12.0, 12.0], [9.0, 9.0], [11.0, 11.0], [1.0, 0.0])
+        second = CandleSeries([60_000, 120_000], [20.0, 20.0], [22.0, 22.0], [19.0, 19.0], [21.0, 21.0], [3.0, 2.0])
+        merged = merge_candles([first, second])
+
+        self.assertEqual(list(merged.timestamps), [0, 60_000, 120_000])
+        self.assertEqual(list(merged.close), [11.0, 21.0, 21.0])
+        self.assertEqual(list(merged.volume), [1.0, 3.0, 2.0])
+        self.assertEqual(merge_candles([first, CandleSeries([0], [30.0], [30.0], [30.0], [30.0], [0.0])]).close[0], 11.0)
+
+    def test_all_exchanges_are_merged_with_native_spellings(self) -> None:
+        clients = [StaticClient("kucoin", 100.0, 1.0), StaticClient("kucoin-futures", 200.0, 3.0)]
+        composite = CompositeExchangeClient(clients, symbols={"kucoin-futures": {"BTCUSDT": "XBT-USDT"}})
+        candles = composite.fetch_ohlc("BTCUSDT", "1h", limit=3)
+
+        self.assertEqual(list(candles.close), [175.0] * 3)
+        self.assertEqual(clients[0].calls, [("BTC-USDT", "1hour")])
+        self.assertEqual(clients[1].calls, [("XBT-USDT", "1hour")])
+
+    def test_hedged_request_ignores_stragglers(self) -> None:
+        release = threading.Event()
+        slow = StaticClient("slow", 500.0, 1.0, release)
+        client = CompositeExchangeClient([slow, StaticClient("fast", 100.0, 1.0)], quorum=1)
+        try:
+            candles = client.fetch_ohlc("BTCUSDT", "1m", limit=2)
+        finally:
+            release.set()
+            client.close()
+
+        self.assertEqual(client.name, "slow+fast")
+        self.assertEqual(list(candles.close), [100.0, 100.0])
+
+    def test_stragglers_share_one_pool(self) -> None:
+        def pool_threads() -> int:
+            return sum(thread.name.startswith("composite-stuck+") for thread in threading.enumerate())
+
+        release = threading.Event()
+        slow = StaticClient("stuck", 500.0, 1.0, release)
+        client = CompositeExchangeClient([slow, StaticClient("fast", 100.0, 1.0)], quorum=1, max_workers=8)
+        try:
+            # Every call leaves a straggler behind; they all wait on the same pool
+            for _ in range(6):
+                self.assertEqual(list(client.fetch_ohlc("BTCUSDT", "1m", limit=1).close), [100.0])
+            self.assertEqual(len(slow.calls), 6)
+            self.assertLessEqual(pool_threads(), 8)
+        finally:
+            release.set()
+            client.close()
+        self.assertEqual(pool_threads(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Tests for the filter expression language and its shared evaluation plan."""
+from __future__ import annotations
+
+from collections import Counter
+import os
+import tempfile
+from typing import List
+import unittest
+
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.filters import FilterError, FilterSet, parse_filters
+from crypto_helper.indicators import core, vectorized
+from fakes import DummyExchange, DummyNotifier
+
+
+def candles_from_closes(closes: List[float], volumes: List[float] | None = None) -> CandleSeries:
+    volumes = volumes or [10.0] * len(closes)
+    return CandleSeries(
+        [index * 60_000 for index in range(len(closes))],
+        closes,
+        [close + 1 for close in closes],
+        [close - 1 for close in closes],
+        closes,
+        volumes,
+    )
+
+
+class CountingSource:
+    """Indicator source counting how often each indicator is computed."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+
+    def __getattr__(self, name: str):
+        function = getattr(vectorized, name)
+
+        def call(*args):
+            self.calls[name] += 1
+            return function(*args)
+
+        return call
+
+
+class FilterSetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        # Falling for a while, then a sharp rebound on the last candle with a volume spike
+        closes = [100.0 - index * 0.5 for index in range(80)] + [75.0]
+        volumes = [10.0] * 80 + [50.0]
+        self.candles = candles_from_closes(closes, volumes)
+
+    def test_shared_subexpressions_are_compiled_once(self) -> None:
+        filters = FilterSet()
+        filters.add("a", "ema(21) > ema(55) and volume > sma(volume, 20) * 2")
+        before = filters.node_count
+        filters.add("b", "ema(close, 21) > ema(55) and 2 * sma(volume, 20) < volume")
+        # Only the reversed comparison and the "and" combining it are new
+        self.assertEqual(filters.node_count - before, 2)
+        filters.add("c", "ema(55) < ema(21)")
+        self.assertEqual(filters.evaluate(self.candles, ["a"])["a"], False)
+
+    def test_evaluation(self) -> None:
+        filters = FilterSet(
+            {
+                "spike": "volume > sma(volume, 20) * 2",
+                "oversold": "rsi(14) < 30",
+                "rebound": "cross_up(close, ema(5))",
+                "chained": "70 < close <= 75",
+                "weak": "not close > bollinger_lower(20, 2)",
+                "stoch": "stoch_k(14, 3) > stoch_d(14, 3)",
+                "young": "ema(500) > 0",
+            }
+        )
+        results = filters.evaluate(self.candles)
+
+        closes = list(self.candles.close)
+        self.assertTrue(results["spike"])
+        self.assertEqual(results["oversold"], core.rsi(closes, 14)[-1] < 30)
+        ema5 = core.ema(closes, 5)
+        self.assertEqual(results["rebound"], closes[-2] < ema5[-2] and closes[-1] > ema5[-1])
+        self.assertTrue(results["chained"])
+        self.assertEqual(results["weak"], not closes[-1] > core.bollinger_bands(closes, 20, 2)[2][-1])
+        k_values, d_values = core.stochastic(self.candles.high, self.candles.low, closes, 14, 3)
+        self.assertEqual(results["stoch"], k_values[-1] > d_values[-1])
+        # Not enough history: the filter simply does not match
+        self.assertFalse(results["young"])
+
+    def test_indicators_are_computed_once_per_evaluation(self) -> None:
+        filters = FilterSet(
+            {
+                "a": "cross_up(ema(21), ema(55))",
+                "b": "ema(21) > ema(55) and rsi(14) < 40",
+                "c": "macd_hist() > 0 and macd_signal() < macd()",
+            }
+        )
+        source = CountingSource()
+        memo: dict = {}
+        filters.evaluate(self.candles, ["a"], source, memo)
+        filters.evaluate(self.candles, ["b", "c"], source, memo)
+
+        self.assertEqual(source.calls, Counter({"ema": 2, "rsi": 1, "macd": 1}))
+
+    def test_required_candles(self) -> None:
+        filters = FilterSet({"a": "cross_up(ema(21), ema(55))", "b": "rsi(ema(10), 14) < 30"})
+        self.assertEqual(filters.required_candles(["a"]), 56)
+        self.assertEqual(filters.required_candles(["b"]), 9 + 15 + 1)
+        self.assertFalse(FilterSet({"a": "cross_up(ema(21), ema(55))"}).evaluate(self.candles.tail(55))["a"])
+
+    def test_invalid_filters(self) -> None:
+        for expression in ("rsi(14) <", "foo(3) > 1", "price > 1", "ema() > 1", "ema(2.5) > 1", "close", "close.real > 1"):
+            with self.subTest(expression=expression), self.assertRaises(FilterError):
+                FilterSet({"bad": expression})
+
+    def test_parse_filters(self) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as handle:
+            handle.write("# momentum\nspike: volume > sma(volume, 20) * 2\n\nrsi(14) < 30  # unnamed\n")
+        self.addCleanup(os.unlink, handle.name)
+        self.assertEqual(
+            parse_filters(["dip: rsi(14) < 25", f"@{handle.name}"]),
+            {"dip": "rsi(14) < 25", "spike": "volume > sma(volume, 20) * 2", "filter3": "rsi(14) < 30"},
+        )
+
+
+class EngineFilterTests(unittest.TestCase):
+    def test_matching_filter_is_reported_as_signal(self) -> None:
+        candles = candles_from_closes([100.0 - index * 0.5 for index in range(300)] + [75.0], [10.0] * 300 + [50.0])
+        exchange = DummyExchange(candles)
+        notifier = DummyNotifier()
+        filter_set = FilterSet({"spike": "volume > sma(volume, 20) * 2", "long": "cross_up(ema(21), ema(250))"})
+        config = SignalConfig(
+            symbol="BTCUSDT", interval="1m", exchange=exchange, telegram_notifier=notifier, filters=("spike", "long")
+        )
+
+        signals = SignalEngine(filter_set=filter_set).run(config)
+
+        self.assertEqual(exchange.requests, [("BTCUSDT", "1m", 251, None)])
+        self.assertIn("filter:spike", signals)
+        self.assertNotIn("filter:long", signals)
+        self.assertNotIn("summary", signals)
+        self.assertIn("volume > sma(volume, 20) * 2", notifier.messages[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""Tests for the incremental and vectorized indicator backends."""
+from __future__ import annotations
+
+import random
+from typing import List
+import unittest
+
+from crypto_helper import patterns
+from crypto_helper.indicators import core, rolling, vectorized
+from crypto_helper.indicators.incremental import (
+    BollingerState,
+    EMAState,
+    MACDState,
+    RSIState,
+)
+
+
+def _random_walk(count: int, seed: int = 7) -> List[float]:
+    rng = random.Random(seed)
+    price = 100.0
+    prices = []
+    for _ in range(count):
+        price = max(1.0, price + rng.uniform(-1.5, 1.5))
+        prices.append(price)
+    return prices
+
+
+class IncrementalIndicatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.prices = _random_walk(500)
+
+    def test_ema_state_matches_batch(self) -> None:
+        state = EMAState.from_history(self.prices[:300], 21)
+        streamed = [state.update(price) for price in self.prices[300:]]
+        self.assertEqual(core.ema(self.prices, 21)[-200:], streamed)
+
+    def test_rsi_state_matches_batch(self) -> None:
+        state = RSIState(14)
+        values = state.extend(self.prices)
+        self.assertEqual(core.rsi(self.prices, 14), values)
+
+    def test_macd_state_matches_batch(self) -> None:
+        state = MACDState.from_history(self.prices[:100])
+        streamed = [state.update(price) for price in self.prices[100:]]
+        macd_line, signal_line, histogram = core.macd(self.prices)
+        expected = list(zip(macd_line[-400:], signal_line[-400:], histogram[-400:]))
+        self.assertEqual(expected, streamed)
+
+    def test_bollinger_state_matches_batch(self) -> None:
+        state = BollingerState(20, 2.0)
+        values = state.extend(self.prices)
+        upper, mid, lower = core.bollinger_bands(self.prices, 20, 2.0)
+        self.assertEqual(list(zip(upper, mid, lower)), values)
+
+
+class VectorizedIndicatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rows = [_random_walk(300, seed) for seed in range(3)]
+
+    def assertSeriesAlmostEqual(self, actual, expected) -> None:
+        self.assertEqual(len(actual), len(expected))
+        for left, right in zip(actual, expected):
+            self.assertAlmostEqual(float(left), right, places=9)
+
+    def test_matrix_input_matches_per_row_batch(self) -> None:
+        ema_rows = vectorized.ema(self.rows, 21)
+        rsi_rows = vectorized.rsi(self.rows, 14)
+        macd_rows = vectorized.macd(self.rows)
+        bollinger_rows = vectorized.bollinger_bands(self.rows, 20, 2.0)
+
+        for index, row in enumerate(self.rows):
+            self.assertSeriesAlmostEqual(ema_rows[index], core.ema(row, 21))
+            self.assertSeriesAlmostEqual(rsi_rows[index], core.rsi(row, 14))
+            for actual, expected in zip(macd_rows, core.macd(row)):
+                self.assertSeriesAlmostEqual(actual[index], expected)
+            for actual, expected in zip(bollinger_rows, core.bollinger_bands(row, 20, 2.0)):
+                self.assertSeriesAlmostEqual(actual[index], expected)
+
+    def test_single_series_matches_batch(self) -> None:
+        prices = self.rows[0]
+        self.assertSeriesAlmostEqual(vectorized.ema(prices, 50), core.ema(prices, 50))
+        for actual, expected in zip(vectorized.bollinger_bands(prices), core.bollinger_bands(prices)):
+            self.assertSeriesAlmostEqual(actual, expected)
+
+
+class RollingKernelTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.prices = _random_walk(3000)
+        self.high = [price + 1.0 for price in self.prices]
+        self.low = [price - 1.0 for price in self.prices]
+        self.volume = [float(index % 11) for index in range(len(self.prices))]
+
+    def test_kernels_match_window_recomputation(self) -> None:
+        period = 50
+        windows = [self.prices[i : i + period] for i in range(len(self.prices) - period + 1)]
+        means, variances = rolling.rolling_mean_variance(self.prices, period)
+
+        self.assertEqual(rolling.rolling_max(self.prices, period), [max(window) for window in windows])
+        self.assertEqual(rolling.rolling_min(self.prices, period), [min(window) for window in windows])
+        # Long enough to cross several resynchronisations
+        for window, mean, variance, total in zip(windows, means, variances, rolling.rolling_sum(self.prices, period)):
+            expected = sum(window) / period
+            self.assertAlmostEqual(mean, expected, places=9)
+            self.assertAlmostEqual(variance, sum((value - expected) ** 2 for value in window) / period, places=7)
+            self.assertAlmostEqual(total, sum(window), places=8)
+
+    def test_new_indicators(self) -> None:
+        upper, mid, lower = core.donchian_channels(self.high, self.low, 20)
+        self.assertEqual(upper[0], max(self.high[:20]))
+        self.assertEqual(lower[-1], min(self.low[-20:]))
+        self.assertEqual(mid[5], (upper[5] + lower[5]) / 2)
+
+        k_values, d_values = core.stochastic(self.high, self.low, self.prices, 14, 3)
+        top, bottom = max(self.high[-14:]), min(self.low[-14:])
+        self.assertAlmostEqual(k_values[-1], 100 * (self.prices[-1] - bottom) / (top - bottom))
+        self.assertAlmostEqual(d_values[-1], sum(k_values[-3:]) / 3)
+        self.assertEqual(len(d_values), len(k_values) - 2)
+
+        vwap_values = core.vwap(self.high, self.low, self.prices, self.volume, 20)
+        typical = [(h + l + c) / 3 for h, l, c in zip(self.high[-20:], self.low[-20:], self.prices[-20:])]
+        expected = sum(t * v for t, v in zip(typical, self.volume[-20:])) / sum(self.volume[-20:])
+        self.assertAlmostEqual(vwap_values[-1], expected)
+
+        atr_values = core.atr(self.high, self.low, self.prices, 14)
+        self.assertEqual(len(atr_values), len(self.prices) - 13)
+        ranges = [2.0] + [max(2.0, abs(self.prices[i] - self.prices[i - 1]) + 1.0) for i in range(1, 14)]
+        self.assertAlmostEqual(atr_values[0], sum(ranges) / 14)
+
+        self.assertEqual(core.obv([1.0, 2.0, 2.0, 1.0], [5.0, 3.0, 4.0, 1.0]), [0.0, 3.0, 3.0, 2.0])
+        with self.assertRaises(ValueError):
+            core.atr(self.high[:5], self.low[:5], self.prices[:5], 14)
+
+    def test_detectors(self) -> None:
+        self.assertTrue(patterns.stochastic_oversold_cross([10.0, 25.0], [15.0, 18.0]))
+        self.assertFalse(patterns.stochastic_oversold_cross([60.0, 75.0], [65.0, 70.0]))
+        self.assertTrue(patterns.donchian_breakout([10.0, 12.0], [11.0, 12.0]))
+        self.assertTrue(patterns.vwap_reclaim([9.0, 11.0], [10.0, 10.0]))
+        self.assertTrue(patterns.atr_expansion([1.0, 1.0, 1.0, 2.0], factor=1.5, lookback=3))
+        self.assertTrue(patterns.obv_divergence([5.0, 4.0, 3.0], [0.0, -1.0, 2.0], lookback=3))
+
+
+
+class DetectorEventTests(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = random.Random(11)
+        self.close = _random_walk(400, seed=11)
+        # Occasional wide candles so the ATR expands now and then
+        spreads = [15.0 if rng.random() < 0.03 else rng.uniform(0.2, 1.0) for _ in self.close]
+        self.high = [price + spread for price, spread in zip(self.close, spreads)]
+        self.low = [price - spread for price, spread in zip(self.close, spreads)]
+        self.volume = [rng.uniform(1.0, 10.0) for _ in self.close]
+
+    def assertMatchesReplay(self, events: List[bool], detect) -> None:
+        # Same as calling the last-bar detector on every prefix of the candles
+        padded = [False] * (len(self.close) - len(events)) + events
+        replayed = []
+        for end in range(1, len(self.close) + 1):
+            try:
+                replayed.append(detect(end))
+            except ValueError:
+                replayed.append(False)
+        self.assertEqual(padded, replayed)
+        self.assertTrue(any(events))
+
+    def test_events_match_bar_by_bar_replay(self) -> None:
+        h, l, c, v = self.high, self.low, self.close, self.volume
+
+        k_values, d_values = core.stochastic(h, l, c, 14, 3)
+        self.assertMatchesReplay(
+            patterns.stochastic_oversold_cross_events(k_values, d_values),
+            lambda end: patterns.stochastic_oversold_cross(*core.stochastic(h[:end], l[:end], c[:end], 14, 3)),
+        )
+        self.assertMatchesReplay(
+            patterns.donchian_breakout_events(c, core.donchian_channels(h, l, 20)[0]),
+            lambda end: patterns.donchian_breakout(c[:end], core.donchian_channels(h[:end], l[:end], 20)[0]),
+        )
+        self.assertMatchesReplay(
+            patterns.vwap_reclaim_events(c, core.vwap(h, l, c, v, 20)),
+            lambda end: patterns.vwap_reclaim(c[:end], core.vwap(h[:end], l[:end], c[:end], v[:end], 20)),
+        )
+        self.assertMatchesReplay(
+            patterns.atr_expansion_events(core.atr(h, l, c, 14)),
+            lambda end: patterns.atr_expansion(core.atr(h[:end], l[:end], c[:end], 14)),
+        )
+        self.assertMatchesReplay(
+            patterns.obv_divergence_events(c, core.obv(c, v)),
+            lambda end: patterns.obv_divergence(c[:end], core.obv(c[:end], v[:end])),
+        )
+
+if __name__ == "__main__":
+    unittest.main()
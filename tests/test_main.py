@@ -0,0 +1,58 @@
+"""Smoke tests running the command-line entry point end to end."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import main
+from crypto_helper import metrics
+from crypto_helper.registry import Registry
+from fakes import DummyExchange, DummyNotifier, minutes
+
+START = 1_699_833_600_000
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exchange = DummyExchange(minutes(START, 400))
+        self.notifier = DummyNotifier()
+        fake_registry = SimpleNamespace(
+            exchanges=Registry("exchange", "crypto_helper.tests.exchanges"),
+            notifiers=Registry("notifier", "crypto_helper.tests.notifiers"),
+        )
+        fake_registry.exchanges.register("dummy", lambda: self.exchange)
+        fake_registry.notifiers.register("dummy", lambda token, chat_id: self.notifier)
+        patcher = mock.patch.object(main, "registry", fake_registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(metrics.use, metrics.active())
+
+    def run_main(self, *argv: str) -> None:
+        arguments = ["main.py", *argv, "--exchange", "dummy", "--notifier", "dummy"]
+        arguments += ["--telegram-token", "token", "--telegram-chat", "42"]
+        with mock.patch.object(sys, "argv", arguments):
+            main.main()
+
+    def test_scan_runs_end_to_end(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            self.run_main("BTCUSDT,ETHUSDT", "1m", "--metrics", path)
+            with open(path, encoding="utf-8") as handle:
+                self.assertIn("crypto_helper_notifications_total 2", handle.read())
+
+        self.assertEqual(sorted(symbol for symbol, *_ in self.exchange.requests), ["BTCUSDT", "ETHUSDT"])
+        self.assertTrue(self.notifier.messages)
+
+    def test_invalid_filter_exits_with_a_message(self) -> None:
+        with self.assertRaises(SystemExit) as raised:
+            self.run_main("BTCUSDT", "1m", "--filter", "broken: rsi(14) <")
+        self.assertIn("broken", str(raised.exception))
+        self.assertFalse(self.exchange.requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Tests for stage metrics and the Prometheus exporter."""
+from __future__ import annotations
+
+import unittest
+
+from crypto_helper import metrics
+from crypto_helper._requests_stub import Response
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.exchanges import BinanceClient
+from fakes import DummyNotifier
+
+
+class KlineSession:
+    def get(self, url: str, params: dict | None = None, timeout: float | None = None) -> Response:
+        limit = int(params["limit"])
+        rows = [[1700000000000 + index * 60000, "1", "2", "0.5", str(100 + index % 7), "3"] for index in range(limit)]
+        return Response(payload=rows)
+
+
+class MetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = metrics.MetricsRegistry()
+        self.previous = metrics.use(self.registry)
+
+    def tearDown(self) -> None:
+        metrics.use(self.previous)
+
+    def test_engine_run_records_every_stage(self) -> None:
+        events = []
+        self.registry.add_hook(lambda kind, name, value, labels: events.append((kind, name)))
+        config = SignalConfig("BTCUSDT", "1m", BinanceClient(session=KlineSession()), DummyNotifier())
+
+        SignalEngine().run(config)
+
+        for stage, labels in (
+            ("fetch", {"exchange": "binance"}),
+            ("http", {"host": "api.binance.com"}),
+            ("decode", {"exchange": "binance"}),
+            ("parse", {"exchange": "binance"}),
+            ("indicators", {}),
+            ("patterns", {}),
+            ("notify", {}),
+        ):
+            count, _total = self.registry.histogram("stage_seconds", stage=stage, **labels)
+            self.assertEqual(count, 1, stage)
+        self.assertEqual(self.registry.counter("requests_total", host="api.binance.com"), 1)
+        self.assertEqual(self.registry.counter("notifications_total"), 1)
+        self.assertIn(("counter", "requests_total"), events)
+
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE crypto_helper_stage_seconds histogram", text)
+        self.assertIn('crypto_helper_stage_seconds_bucket{stage="notify",le="+Inf"} 1', text)
+        self.assertIn('crypto_helper_requests_total{host="api.binance.com"} 1', text)
+
+    def test_profile_run_captures_engine_calls(self) -> None:
+        config = SignalConfig("BTCUSDT", "1m", BinanceClient(session=KlineSession()), DummyNotifier())
+
+        signals, stats = SignalEngine().profile_run(config)
+
+        self.assertIn("summary", signals)
+        self.assertIn("generate_signals", metrics.format_stats(stats))
+
+
+if __name__ == "__main__":
+    unittest.main()
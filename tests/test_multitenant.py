@@ -0,0 +1,78 @@
+"""Tests for shared multi-tenant evaluation."""
+from __future__ import annotations
+
+import math
+import traceback
+from typing import List
+import unittest
+
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.multitenant import IndicatorCache, MultiTenantEngine
+from fakes import DummyExchange, DummyNotifier
+
+
+def _market(offset: float) -> CandleSeries:
+    closes = [100 + 10 * math.sin(index / 7) + offset for index in range(500)]
+    return CandleSeries(range(500), closes, closes, closes, closes, closes)
+
+
+class MultiTenantEngineTests(unittest.TestCase):
+    def test_configs_share_fetches_and_indicators(self) -> None:
+        exchange = DummyExchange({"BTCUSDT": _market(0), "ETHUSDT": _market(5)})
+        notifier = DummyNotifier()
+        configs = [
+            SignalConfig("BTCUSDT", "1h", exchange, notifier, ema_fast=10, ema_slow=30),
+            SignalConfig("ETHUSDT", "1h", exchange, notifier, ema_fast=10, ema_slow=30),
+            SignalConfig("BTCUSDT", "1h", exchange, notifier, ema_fast=10, ema_slow=30),
+            SignalConfig("BTCUSDT", "1h", exchange, notifier, ema_fast=20, ema_slow=60, rsi_period=7),
+        ]
+        cache = IndicatorCache()
+
+        results = MultiTenantEngine(cache=cache).run(configs)
+
+        self.assertEqual(sorted(exchange.requests), [("BTCUSDT", "1h", 61, None), ("ETHUSDT", "1h", 34, None)])
+        self.assertEqual([result.config for result in results], configs)
+        self.assertEqual(len(notifier.messages), 4)
+
+        engine = SignalEngine()
+        for config, result in zip(configs, results):
+            limit = 61 if config.symbol == "BTCUSDT" else 34
+            candles = exchange.fetch_ohlc(config.symbol, config.interval, limit)
+            self.assertEqual(result.signals, engine.generate_signals(config, candles, candles.close))
+        # BTC: EMA 10/30/20/60/12/26, RSI 14/7, MACD, Bollinger; ETH: EMA 10/30/12/26, RSI, MACD, Bollinger
+        self.assertEqual(cache.misses, 10 + 7)
+        self.assertGreater(cache.hits, 0)
+
+    def test_none_is_a_cached_value(self) -> None:
+        cache = IndicatorCache()
+        calls: List[int] = []
+        for _ in range(3):
+            self.assertIsNone(cache.get("key", lambda: calls.append(1)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+
+    def test_cached_failures_raise_fresh_errors(self) -> None:
+        cache = IndicatorCache()
+        calls: List[int] = []
+
+        def compute() -> None:
+            calls.append(1)
+            raise ValueError("Not enough price data")
+
+        errors: List[ValueError] = []
+        for _ in range(3):
+            try:
+                cache.get("key", compute)
+            except ValueError as error:
+                errors.append(error)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({str(error) for error in errors}, {"Not enough price data"})
+        self.assertIsNot(errors[1], errors[2])
+        # A re-raised shared instance would collect a frame on every hit
+        self.assertEqual(len(traceback.extract_tb(errors[2].__traceback__)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Tests for the background Telegram dispatcher."""
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from typing import List, Tuple
+
+from crypto_helper.notifications import TelegramDispatcher, TelegramRetryAfter
+
+
+class RecordingNotifier:
+    chat_id = "default"
+
+    def __init__(self, throttle_chat: str | None = None) -> None:
+        self.sent: List[Tuple[str, str, float]] = []
+        self.throttle_chat = throttle_chat
+        self.lock = threading.Lock()
+
+    def send_message(self, text: str, chat_id: str | None = None) -> None:
+        with self.lock:
+            if chat_id == self.throttle_chat:
+                self.throttle_chat = None
+                raise TelegramRetryAfter(0.2, "HTTP 429")
+            if text.startswith("boom"):
+                raise RuntimeError("notifier bug")
+            self.sent.append((chat_id, text, time.monotonic()))
+
+
+class TelegramDispatcherTests(unittest.TestCase):
+    def test_fan_out_coalesces_messages_per_chat(self) -> None:
+        notifier = RecordingNotifier()
+        with TelegramDispatcher(notifier, ["a", "b", "c"], coalesce_delay=0.05, chat_interval=0.05) as dispatcher:
+            started = time.monotonic()
+            for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+                dispatcher.send_message(f"{symbol}: сигнал")
+            self.assertLess(time.monotonic() - started, 0.05, "send_message must not block")
+
+        self.assertEqual(sorted(chat for chat, _, _ in notifier.sent), ["a", "b", "c"])
+        for _, text, _ in notifier.sent:
+            self.assertEqual(text, "BTCUSDT: сигнал\n\nETHUSDT: сигнал\n\nSOLUSDT: сигнал")
+
+    def test_long_messages_are_split_and_retry_after_is_honoured(self) -> None:
+        notifier = RecordingNotifier(throttle_chat="b")
+        dispatcher = TelegramDispatcher(notifier, ["b"], coalesce_delay=0.0, chat_interval=0.0, max_length=50)
+        started = time.monotonic()
+        dispatcher.send_message("x" * 30)
+        dispatcher.send_message("y" * 30)
+        dispatcher.send_message("z" * 120)
+        self.assertTrue(dispatcher.flush(timeout=5))
+        dispatcher.close()
+
+        texts = [text for _, text, _ in notifier.sent]
+        self.assertEqual("".join(texts), "x" * 30 + "y" * 30 + "z" * 120)
+        self.assertTrue(all(len(text) <= 50 for text in texts))
+        self.assertGreaterEqual(notifier.sent[0][2] - started, 0.2)
+
+
+    def test_notifier_errors_drop_the_message_and_keep_the_worker(self) -> None:
+        notifier = RecordingNotifier()
+        dispatcher = TelegramDispatcher(notifier, ["a"], workers=1, coalesce_delay=0.0, chat_interval=0.0)
+        with self.assertLogs("crypto_helper.notifications.dispatch", "ERROR"):
+            for text in ("boom 1", "boom 2"):
+                dispatcher.send_message(text)
+                self.assertTrue(dispatcher.flush(timeout=5))
+        dispatcher.send_message("after")
+        self.assertTrue(dispatcher.flush(timeout=5))
+        dispatcher.close()
+
+        self.assertEqual([text for _, text, _ in notifier.sent], ["after"])
+
+if __name__ == "__main__":
+    unittest.main()
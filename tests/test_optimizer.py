@@ -0,0 +1,76 @@
+"""Tests for the parameter-sweep optimizer."""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import random
+import unittest
+from unittest import mock
+
+from crypto_helper import registry
+from crypto_helper.backtest import StrategyParams, forward_return_stats, signal_events
+from crypto_helper.candles import CandleSeries
+from crypto_helper.optimizer import Optimizer, main, parameter_grid, random_search
+from crypto_helper.registry import Registry
+from fakes import DummyExchange
+
+SPACE = {
+    "ema_fast": [5, 10],
+    "ema_slow": [10, 20, 30],
+    "rsi_period": [7, 14],
+    "bollinger_std_dev": [1.5, 2.0],
+}
+
+
+def _random_walk_candles(count: int, seed: int = 3) -> CandleSeries:
+    rng = random.Random(seed)
+    series = CandleSeries()
+    price = 100.0
+    for index in range(count):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.02)))
+        series.append(1_700_000_000_000 + index * 60_000, price, price, price, price, 1.0)
+    return series
+
+
+class OptimizerTests(unittest.TestCase):
+    def test_grid_skips_inverted_emas(self) -> None:
+        grid = list(parameter_grid(SPACE))
+        self.assertEqual(len(grid), 5 * 2 * 2)
+        self.assertTrue(all(params.ema_fast < params.ema_slow for params in grid))
+        self.assertEqual(len(set(random_search(SPACE, 7, seed=1))), 7)
+        with self.assertRaises(ValueError):
+            list(parameter_grid({"ema_medium": [1]}))
+
+    def test_parallel_sweep_matches_backtest(self) -> None:
+        candles = _random_walk_candles(500)
+        sequential = Optimizer(horizon=5, workers=1).optimize(candles, parameter_grid(SPACE))
+        parallel = Optimizer(horizon=5, workers=2, chunk_size=3).optimize(candles, parameter_grid(SPACE))
+        self.assertEqual(parallel, sequential)
+
+        params = StrategyParams(ema_fast=5, ema_slow=20, rsi_period=7, bollinger_std_dev=1.5)
+        indices = [index for found in signal_events(candles.close, params).values() for index in found]
+        expected = forward_return_stats(candles.close, indices, (5,))[5]
+        result = next(result for result in sequential if result.params == params)
+        self.assertEqual((result.signals, result.mean_return, result.hit_rate), (expected.count, expected.mean_return, expected.hit_rate))
+
+        hit_rates = [result.hit_rate for result in sequential]
+        self.assertEqual(hit_rates, sorted(hit_rates, reverse=True))
+
+
+    def test_cli_creates_registered_exchanges(self) -> None:
+        exchange = DummyExchange(_random_walk_candles(400))
+        exchanges = Registry("exchange", "crypto_helper.tests.exchanges")
+        exchanges.register("dummy", lambda: exchange)
+        argv = ["BTCUSDT", "1m", "--exchange", "dummy", "--limit", "300", "--ema-fast", "5", "--ema-slow", "20"]
+        output = io.StringIO()
+        with mock.patch.object(registry, "exchanges", exchanges), contextlib.redirect_stdout(output):
+            main([*argv, "--workers", "1", "--min-signals", "0"])
+
+        self.assertEqual(exchange.requests, [("BTCUSDT", "1m", 300, None)])
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertTrue(results)
+        self.assertEqual({result["params"]["ema_fast"] for result in results}, {5})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the lazy exchange/notifier registry and import-time budget."""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import unittest
+
+from crypto_helper import registry
+from crypto_helper.registry import Registry
+
+HEAVY_MODULES = (
+    "requests",
+    "numpy",
+    "crypto_helper.engine",
+    "crypto_helper.exchanges.binance",
+    "crypto_helper.notifications.telegram",
+)
+
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import crypto_helper
+from crypto_helper import registry
+names = registry.exchanges.names()
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules], "names": names}}))
+"""
+
+
+class RegistryTests(unittest.TestCase):
+    def test_builtin_names_resolve_lazily(self) -> None:
+        from crypto_helper.exchanges.kucoin import KuCoinClient
+
+        self.assertIn("bybit", registry.exchanges)
+        self.assertIn("Binance", registry.exchanges)
+        self.assertIs(registry.exchanges.get("kucoin"), KuCoinClient)
+        self.assertEqual(registry.notifiers.get("telegram").__name__, "TelegramNotifier")
+
+    def test_unknown_name(self) -> None:
+        local = Registry("exchange", "crypto_helper.tests.none")
+        local.register("json", "json:dumps")
+        self.assertIs(local.get("json"), json.dumps)
+        self.assertNotIn("okx", local)
+        with self.assertRaises(KeyError):
+            local.get("okx")
+
+    def test_package_import_is_cheap(self) -> None:
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        self.assertEqual(result["loaded"], [])
+        self.assertEqual(result["names"][:3], ["binance", "bybit", "kucoin"])
+        # Generous budget: the point is catching an eager import of requests/numpy
+        self.assertLess(result["elapsed"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
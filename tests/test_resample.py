@@ -0,0 +1,113 @@
+"""Tests for resampling fine candles into higher timeframes."""
+from __future__ import annotations
+
+from typing import List, Tuple
+import unittest
+
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.exchanges.base import ExchangeClient
+from crypto_helper.resample import ResamplingExchangeClient, finest_interval, resample
+from fakes import MINUTE, DummyExchange, DummyNotifier, minutes
+
+# 2023-11-13 00:00 UTC, a Monday
+MONDAY = 1_699_833_600_000
+
+
+class ResampleTests(unittest.TestCase):
+    def test_buckets_are_aligned_and_aggregated(self) -> None:
+        # Starts at 00:03, so the 00:00 bucket is incomplete and dropped
+        candles = resample(minutes(MONDAY + 3 * MINUTE, 14), 5 * MINUTE, MINUTE)
+
+        self.assertEqual(list(candles.timestamps), [MONDAY + 5 * MINUTE, MONDAY + 10 * MINUTE, MONDAY + 15 * MINUTE])
+        self.assertEqual(list(candles.open), [2.0, 7.0, 12.0])
+        self.assertEqual(list(candles.high), [6.5, 11.5, 13.5])
+        self.assertEqual(list(candles.low), [1.5, 6.5, 11.5])
+        self.assertEqual(list(candles.close), [6.0, 11.0, 13.0])
+        # The trailing bucket is still in progress
+        self.assertEqual(list(candles.volume), [5.0, 5.0, 2.0])
+
+    def test_weekly_buckets_open_on_monday(self) -> None:
+        candles = resample(minutes(MONDAY - 2 * 86_400_000, 10, 86_400_000), 7 * 86_400_000)
+
+        self.assertEqual(list(candles.timestamps), [MONDAY - 7 * 86_400_000, MONDAY, MONDAY + 7 * 86_400_000])
+        self.assertEqual(list(candles.volume), [2.0, 7.0, 1.0])
+
+    def test_intervals_must_divide(self) -> None:
+        self.assertEqual(finest_interval(["1h", "15m", "4h"]), "15m")
+        with self.assertRaises(ValueError):
+            finest_interval(["15m", "1h", "10m"])
+        with self.assertRaises(ValueError):
+            resample(minutes(MONDAY, 10), 7 * MINUTE, 2 * MINUTE)
+
+    def test_resampling_client_fetches_base_interval(self) -> None:
+        upstream = DummyExchange(minutes(MONDAY, 600))
+        candles = ResamplingExchangeClient(upstream, "1m").fetch_ohlc("BTCUSDT", "1h", limit=3)
+
+        self.assertEqual(upstream.requests, [("BTCUSDT", "1m", 240, None)])
+        self.assertEqual(list(candles.timestamps), [MONDAY + hour * 3_600_000 for hour in (7, 8, 9)])
+        self.assertEqual(list(candles.close), [479.0, 539.0, 599.0])
+
+
+class PagedExchange(ExchangeClient):
+    """Serves the tail of a 5-minute history through the base client's paging, counting pages."""
+
+    base_url = "https://example.com"
+
+    def __init__(self, candles: CandleSeries) -> None:
+        super().__init__()
+        self.candles = candles
+        self.pages: List[Tuple[str, int]] = []
+
+    def _fetch_page(self, symbol, interval, limit, start_time=None, end_time=None):
+        self.pages.append((interval, limit))
+        return resample(self.candles, self.interval_ms(interval), 5 * MINUTE).tail(limit)
+
+
+class TimeframeEngineTests(unittest.TestCase):
+    def test_timeframes_share_a_fetch_when_it_fits_one_page(self) -> None:
+        exchange = DummyExchange(minutes(MONDAY, 20_000))
+        notifier = DummyNotifier()
+        config = SignalConfig(
+            symbol="BTCUSDT", interval="1m", exchange=exchange, telegram_notifier=notifier, ema_fast=5, ema_slow=20
+        )
+
+        results = SignalEngine().run_timeframes(config, ["1m", "15m", "1h"])
+
+        # 15m needs 35 * 15 one-minute candles, 1h would need 35 * 60 and is fetched on its own
+        self.assertEqual(exchange.requests, [("BTCUSDT", "1m", 35 * 15, None), ("BTCUSDT", "1h", 34, None)])
+        self.assertEqual(list(results), ["1m", "15m", "1h"])
+        self.assertEqual(len(notifier.messages), 3)
+        scan = SignalEngine().run_many([config], timeframes=["1m", "1h"])[0]
+        self.assertTrue(scan.ok)
+        self.assertIn("1h summary", scan.signals)
+
+    def test_timeframes_cost_no_more_requests_than_separate_fetches(self) -> None:
+        exchange = PagedExchange(minutes(MONDAY, 10_000, 5 * MINUTE))
+        config = SignalConfig(symbol="BTCUSDT", interval="5m", exchange=exchange, telegram_notifier=DummyNotifier())
+
+        series = SignalEngine().fetch_timeframes(config, ["5m", "15m", "1h", "4h"])
+
+        self.assertEqual(exchange.pages, [("5m", 606), ("1h", 201), ("4h", 201)])
+        # Paging 48 * 202 five-minute candles for 4h alone would take 10 requests
+        lengths = {interval: len(candles) for interval, candles in series.items()}
+        self.assertEqual(lengths, {"5m": 606, "15m": 202, "1h": 201, "4h": 201})
+
+    def test_local_clients_resample_everything_from_one_fetch(self) -> None:
+        upstream = DummyExchange(minutes(MONDAY, 20_000))
+        config = SignalConfig(
+            symbol="BTCUSDT",
+            interval="1m",
+            exchange=ResamplingExchangeClient(upstream, "1m"),
+            telegram_notifier=DummyNotifier(),
+            ema_fast=5,
+            ema_slow=20,
+        )
+
+        SignalEngine().fetch_timeframes(config, ["1m", "15m", "1h"])
+
+        self.assertEqual(upstream.requests, [("BTCUSDT", "1m", 35 * 60, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the candle-close scheduler."""
+from __future__ import annotations
+
+import random
+from typing import List
+import unittest
+
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import ScanResult, SignalConfig, SignalEngine
+from crypto_helper.exchanges.base import ExchangeClient
+from crypto_helper.scheduler import CandleScheduler
+from fakes import MINUTE, FakeClock
+
+
+class SkewedExchange(ExchangeClient):
+    """Exchange whose clock runs ``skew_ms`` ahead of the local one."""
+
+    base_url = "https://example.com"
+    name = "skewed"
+
+    def __init__(self, clock: FakeClock, skew_ms: int) -> None:
+        super().__init__()
+        self.clock = clock
+        self.skew_ms = skew_ms
+
+    def server_time(self) -> int:
+        return int(self.clock() * 1000) + self.skew_ms
+
+    def _fetch_page(self, symbol, interval, limit, start_time=None, end_time=None):
+        return CandleSeries()
+
+
+class RecordingEngine(SignalEngine):
+    def __init__(self, clock: FakeClock, run_seconds: float = 0.0) -> None:
+        super().__init__()
+        self.clock = clock
+        self.run_seconds = run_seconds
+        self.calls: List[tuple] = []
+
+    def run_many(self, configs, max_workers=8, per_exchange_limit=None):
+        self.calls.append((self.clock(), [config.symbol for config in configs]))
+        self.clock.now += self.run_seconds
+        return [ScanResult(config, signals={}) for config in configs]
+
+
+class CandleSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock(1_699_999_990.0)  # 10 s into a minute
+
+    def test_runs_align_to_exchange_candle_close(self) -> None:
+        clock = self.clock
+        exchange = SkewedExchange(clock, skew_ms=500)
+        engine = RecordingEngine(clock)
+        configs = [SignalConfig(symbol, "1m", exchange, None) for symbol in ("BTCUSDT", "ETHUSDT")]
+        scheduler = CandleScheduler(engine, configs, delay=1.0, jitter=0.5, clock=clock, sleep=clock.sleep, rng=random.Random(1))
+
+        scheduler.run(max_runs=3)
+
+        self.assertEqual([symbols for _, symbols in engine.calls], [["BTCUSDT", "ETHUSDT"]] * 3)
+        for index, (started, _) in enumerate(engine.calls):
+            # The exchange clock is 0.5 s ahead, so its candles close 0.5 s early locally
+            local_close = 1_700_000_040.0 + index * MINUTE / 1000 - 0.5
+            self.assertGreaterEqual(started, local_close + 1.0)
+            self.assertLess(started, local_close + 1.5)
+
+    def test_overdue_runs_are_coalesced(self) -> None:
+        clock = self.clock
+        exchange = SkewedExchange(clock, skew_ms=0)
+        engine = RecordingEngine(clock, run_seconds=150)  # each run overruns two candles
+        config = SignalConfig("BTCUSDT", "1m", exchange, None)
+        scheduler = CandleScheduler(engine, [config], delay=1.0, jitter=0.0, clock=clock, sleep=clock.sleep)
+
+        scheduler.run(max_runs=3)
+
+        starts = [started for started, _ in engine.calls]
+        # The closes at +100 s and +160 s pass while the first run is busy and are skipped
+        self.assertEqual(starts, [1_700_000_041.0, 1_700_000_221.0, 1_700_000_401.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
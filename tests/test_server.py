@@ -0,0 +1,100 @@
+"""Tests for the stand-in exchange server used for offline load tests."""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from urllib.request import urlopen
+
+from benchmarks.server import ExchangeServer, Faults, Recording, RecordingSession, candle_window
+from crypto_helper._compat import requests
+from crypto_helper.exchanges import BinanceClient, BybitClient, KuCoinClient
+from crypto_helper.transport import HttpTransport
+from fakes import FakeClock
+
+HOUR = 3_600_000
+
+
+def unthrottled(client_cls: type) -> type:
+    # The tests exercise the server's limits, not the client's own pacing
+    return type(client_cls.__name__, (client_cls,), {"rate_limiter": None})
+
+
+class CandleWindowTests(unittest.TestCase):
+    def test_window_is_clamped_to_the_candle_in_progress(self) -> None:
+        now = 100 * HOUR + 5
+        self.assertEqual(candle_window(HOUR, 3, now), (98 * HOUR, 3))
+        self.assertEqual(candle_window(HOUR, 10, now, start_ms=97 * HOUR + 1), (98 * HOUR, 3))
+        self.assertEqual(candle_window(HOUR, 2, now, start_ms=90 * HOUR, end_ms=95 * HOUR), (90 * HOUR, 2))
+        self.assertEqual(candle_window(HOUR, 5, now, end_ms=95 * HOUR), (91 * HOUR, 5))
+
+
+class ServerFormatTests(unittest.TestCase):
+    def test_time_endpoint_answers_without_a_client_library(self) -> None:
+        with ExchangeServer("kucoin", clock=lambda: 1_700_000_000.5) as server:
+            with urlopen(f"{server.url}/api/v1/timestamp") as response:
+                self.assertEqual(json.load(response)["data"], 1_700_000_000_500)
+                self.assertIn("gw-ratelimit-remaining", response.headers)
+
+
+@unittest.skipIf(importlib.util.find_spec("requests") is None, "requests is not installed")
+class ServerClientTests(unittest.TestCase):
+    def test_every_exchange_serves_the_same_market(self) -> None:
+        closes = {}
+        for client_cls, symbol, interval in (
+            (BinanceClient, "BTCUSDT", "1h"),
+            (BybitClient, "BTCUSDT", "60"),
+            (KuCoinClient, "BTC-USDT", "1hour"),
+        ):
+            with ExchangeServer(client_cls.name, clock=lambda: 1_700_000_000.0) as server:
+                client = unthrottled(client_cls)(transport=HttpTransport(), base_url=server.url)
+                candles = client.fetch_ohlc(symbol, interval, limit=2500, start_time=1_690_000_000_000 // HOUR * HOUR)
+                self.assertEqual(client.server_time(), 1_700_000_000_000)
+                self.assertEqual(len(client.fetch_tickers()), 5)
+            self.assertEqual(len(candles), 2500)
+            self.assertEqual({b - a for a, b in zip(candles.timestamps, candles.timestamps[1:])}, {HOUR})
+            closes[client_cls.name] = list(candles.close)
+        self.assertEqual(closes["binance"], closes["bybit"])
+        self.assertEqual(closes["binance"], closes["kucoin"])
+
+    def test_weight_budget_is_enforced_and_reported(self) -> None:
+        clock = FakeClock(1_700_000_080.0)
+        with ExchangeServer("binance", weight_limit=4, window=60, clock=clock) as server:
+            client = unthrottled(BinanceClient)(transport=HttpTransport(sleep=clock.sleep), base_url=server.url)
+            for _ in range(3):
+                client.fetch_ohlc("BTCUSDT", "1m", limit=10)
+
+            # The third request exceeded the budget and was retried after the window reset
+            self.assertEqual(server.stats[429], 1)
+            self.assertEqual(clock.sleeps, [20.0])
+            self.assertEqual(server.stats[200], 3)
+
+    def test_injected_errors_surface_after_retries(self) -> None:
+        with ExchangeServer("bybit", faults=Faults(error_rate=1.0)) as server:
+            transport = HttpTransport(max_retries=2, sleep=lambda seconds: None)
+            client = unthrottled(BybitClient)(transport=transport, base_url=server.url)
+            with self.assertRaises(requests.HTTPError):
+                client.fetch_ohlc("BTCUSDT", "1", limit=10)
+            self.assertEqual(server.stats[500], 3)
+
+    def test_recorded_responses_are_replayed(self) -> None:
+        with ExchangeServer("binance") as server:
+            recorder = RecordingSession(HttpTransport().session)
+            client = unthrottled(BinanceClient)(transport=HttpTransport(session=recorder), base_url=server.url)
+            original = client.fetch_ohlc("ETHUSDT", "1d", limit=30)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "binance.jsonl.gz")
+            self.assertEqual(recorder.save(path), 1)
+            recording = Recording.load(path)
+
+        with ExchangeServer("binance", recording=recording) as server:
+            client = unthrottled(BinanceClient)(transport=HttpTransport(), base_url=server.url)
+            replayed = client.fetch_ohlc("ETHUSDT", "1d", limit=30)
+        self.assertEqual(list(replayed.timestamps), list(original.timestamps))
+        self.assertEqual(list(replayed.close), list(original.close))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""Tests for kline streaming against a local WebSocket stand-in server."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, List, Tuple
+import unittest
+
+from crypto_helper._requests_stub import Response
+from crypto_helper.candles import CandleSeries
+from crypto_helper.engine import SignalConfig, SignalEngine
+from crypto_helper.filters import FilterSet
+from crypto_helper.exchanges import BinanceClient, KuCoinClient
+from crypto_helper.streaming import BinanceKlineFeed, KlineStream, KuCoinKlineFeed, StreamingSignalRunner
+from crypto_helper.streaming.feeds import KlineEvent
+from crypto_helper.streaming.websocket import serve
+from fakes import DummyNotifier
+
+STEP = 60_000
+T0 = STEP * 28_333_333
+
+
+class HistoryClient(BinanceClient):
+    """REST client stand-in serving candles that have opened before ``clock()``."""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.requests: List[Tuple[int, int | None]] = []
+
+    def fetch_ohlc(self, symbol, interval, limit=100, start_time=None):
+        self.requests.append((limit, start_time))
+        now = int(self.clock() * 1000)
+        opens = [T0 + index * STEP for index in range(400) if T0 + index * STEP <= now]
+        if start_time is not None:
+            opens = [ts for ts in opens if ts >= start_time][:limit]
+        else:
+            opens = opens[-limit:]
+        return CandleSeries(opens, *([100.0 + (ts - T0) / STEP for ts in opens] for _ in range(5)))
+
+
+def _kline(index: int, closed: bool) -> str:
+    price = str(100.0 + index)
+    return json.dumps(
+        {
+            "e": "kline",
+            "s": "BTCUSDT",
+            "k": {"t": T0 + index * STEP, "i": "1m", "o": price, "h": price, "l": price, "c": price, "v": "1", "x": closed},
+        }
+    )
+
+
+class StreamingRunnerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_closed_candles_drive_signals_and_gaps_are_backfilled(self) -> None:
+        now = [(T0 + 299 * STEP + 10_000) / 1000]
+        subscribed = asyncio.Event()
+
+        async def exchange(websocket, path):
+            request = json.loads(await websocket.recv())
+            self.assertEqual(request["params"], ["btcusdt@kline_1m"])
+            subscribed.set()
+            await websocket.send(_kline(299, closed=False))
+            now[0] = (T0 + 300 * STEP + 5) / 1000
+            await websocket.send(_kline(299, closed=True))
+            now[0] = (T0 + 303 * STEP + 5) / 1000
+            await websocket.send(_kline(302, closed=True))
+            await asyncio.sleep(10)
+
+        server = await serve(exchange)
+        port = server.sockets[0].getsockname()[1]
+
+        client = HistoryClient(lambda: now[0])
+        notifier = DummyNotifier()
+        config = SignalConfig(symbol="btcusdt", interval="1m", exchange=client, telegram_notifier=notifier)
+        closed: List[int] = []
+        partial: List[int] = []
+        done = asyncio.Event()
+
+        def on_signals(config, signals):
+            closed.append(runner._states[id(config)].candles)
+            if len(closed) == 4:
+                done.set()
+
+        runner = StreamingSignalRunner(
+            SignalEngine(),
+            [config],
+            include_partial=True,
+            on_signals=on_signals,
+            on_partial=lambda config, event: partial.append(event.timestamp_ms),
+            feed_urls={"binance": f"ws://127.0.0.1:{port}/ws"},
+            clock=lambda: now[0],
+        )
+        task = asyncio.create_task(runner.run())
+        try:
+            await asyncio.wait_for(done.wait(), timeout=5)
+        finally:
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        self.assertTrue(subscribed.is_set())
+        self.assertEqual(partial, [T0 + 299 * STEP])
+        seeded = closed[0] - 1
+        self.assertEqual(closed, [seeded + 1, seeded + 2, seeded + 3, seeded + 4])
+        self.assertEqual(client.requests[-1], (2, T0 + 300 * STEP))
+        self.assertEqual(len(notifier.messages), 4)
+        self.assertEqual(runner.streams[0].last_closed[("BTCUSDT", "1m")], T0 + 302 * STEP)
+
+    async def test_filters_are_evaluated_on_closed_candles(self) -> None:
+        now = (T0 + 299 * STEP + 10_000) / 1000
+        engine = SignalEngine(filter_set=FilterSet({"rising": "close > sma(5)", "falling": "close < sma(5)"}))
+        config = SignalConfig(
+            "BTCUSDT", "1m", HistoryClient(lambda: now), DummyNotifier(), filters=("rising", "falling")
+        )
+        seen: List[Dict[str, str]] = []
+        runner = StreamingSignalRunner(
+            engine, [config], on_signals=lambda config, signals: seen.append(signals), notify=False, clock=lambda: now
+        )
+        await runner.seed()
+
+        # History rises by one per candle; a final drop turns the filters around
+        closes = [100.0 + index for index in range(299, 318)] + [50.0]
+        for index, close in enumerate(closes, 299):
+            event = KlineEvent("binance", "BTCUSDT", "1m", T0 + index * STEP, close, close, close, close, 1.0, True)
+            await runner.streams[0].handle(event)
+
+        self.assertEqual(len(seen), len(closes))
+        self.assertTrue(all("filter:rising" in signals for signals in seen[:-1]))
+        self.assertIn("filter:falling", seen[-1])
+        self.assertNotIn("filter:rising", seen[-1])
+        self.assertLess(len(runner._tails[id(config)]), 10)
+
+
+class StreamResilienceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_truncated_handshake_is_retried(self) -> None:
+        connections = []
+
+        async def broken(reader, writer):
+            connections.append(writer)
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 101 Switching")
+            writer.close()
+
+        server = await asyncio.start_server(broken, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        feed = BinanceKlineFeed(url=f"ws://127.0.0.1:{port}/ws")
+        stream = KlineStream(feed, HistoryClient(lambda: 0), [("BTCUSDT", "1m")], print, reconnect_delay=0.01)
+        task = asyncio.create_task(stream.run())
+        try:
+            while len(connections) < 3:
+                self.assertFalse(task.done())
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+    async def test_error_from_the_bullet_endpoint_is_retried(self) -> None:
+        class ErrorTransport:
+            def __init__(self) -> None:
+                self.posts = 0
+
+            def post(self, url, json=None, **kwargs):
+                self.posts += 1
+                return Response(payload={"code": "429000", "msg": "Too many requests"})
+
+        client = KuCoinClient()
+        client.transport = ErrorTransport()
+        stream = KlineStream(KuCoinKlineFeed(client=client), client, [("BTC-USDT", "1min")], print, reconnect_delay=0.01)
+        task = asyncio.create_task(stream.run())
+        try:
+            while client.transport.posts < 3:
+                self.assertFalse(task.done())
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+
+    async def test_malformed_messages_and_failing_handlers_are_skipped(self) -> None:
+        async def exchange(websocket, path):
+            await websocket.recv()
+            for message in ("not json", json.dumps({"e": "kline", "s": "BTCUSDT"}), _kline(299, True), _kline(300, True)):
+                await websocket.send(message)
+            await asyncio.sleep(10)
+
+        server = await serve(exchange)
+        port = server.sockets[0].getsockname()[1]
+        received: List[int] = []
+        done = asyncio.Event()
+
+        def on_event(event):
+            received.append(event.timestamp_ms)
+            if len(received) == 1:
+                raise RuntimeError("handler bug")
+            done.set()
+
+        feed = BinanceKlineFeed(url=f"ws://127.0.0.1:{port}/ws")
+        stream = KlineStream(feed, HistoryClient(lambda: 0), [("BTCUSDT", "1m")], on_event)
+        task = asyncio.create_task(stream.run())
+        try:
+            with self.assertLogs("crypto_helper.streaming.stream", "WARNING") as logs:
+                await asyncio.wait_for(done.wait(), timeout=5)
+        finally:
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        self.assertEqual(received, [T0 + 299 * STEP, T0 + 300 * STEP])
+        self.assertEqual(sum("malformed" in line for line in logs.output), 2)
+        self.assertTrue(any("handler bug" in line for line in logs.output))
+
+
+class KlineFeedTests(unittest.IsolatedAsyncioTestCase):
+    async def test_kucoin_candle_closes_when_next_candle_starts(self) -> None:
+        feed = KuCoinKlineFeed(url="ws://unused")
+        events = []
+        stream = KlineStream(feed, KuCoinClient(), [("BTC-USDT", "1min")], events.append)
+
+        for start, close in ((1700000040, "1.5"), (1700000040, "1.7"), (1700000100, "1.8")):
+            message = json.dumps(
+                {
+                    "type": "message",
+                    "topic": "/market/candles:BTC-USDT_1min",
+                    "data": {"candles": [str(start), "1.0", close, "2.0", "0.5", "3", "0"]},
+                }
+            )
+            for event in feed.parse(message):
+                await stream.handle(event)
+
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].closed)
+        self.assertEqual((events[0].timestamp_ms, events[0].close), (1700000040000, 1.7))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for the shared HTTP transport."""
+from __future__ import annotations
+
+from typing import List
+import unittest
+
+from crypto_helper._requests_stub import Response
+from crypto_helper.transport import BinanceRateLimiter, HttpTransport, RateLimiter
+from fakes import FakeClock
+
+
+class HeaderResponse(Response):
+    def __init__(self, status_code: int = 200, headers: dict | None = None, payload=None):
+        super().__init__(status_code=status_code, payload=payload)
+        self.headers = headers or {}
+
+
+class ScriptedSession:
+    """Session stub replaying a fixed sequence of responses."""
+
+    def __init__(self, responses: List[HeaderResponse]):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class HttpTransportTests(unittest.TestCase):
+    def test_retry_after_is_honoured_on_429(self) -> None:
+        clock = FakeClock()
+        session = ScriptedSession(
+            [
+                HeaderResponse(429, {"Retry-After": "3"}),
+                HeaderResponse(200, {"X-MBX-USED-WEIGHT-1M": "5990"}, payload=[1]),
+            ]
+        )
+        transport = HttpTransport(session=session, sleep=clock.sleep)
+        limiter = transport.rate_limiter(
+            "https://api.binance.com", lambda: BinanceRateLimiter(clock=clock, sleep=clock.sleep)
+        )
+
+        response = transport.get("https://api.binance.com/api/v3/klines", weight=2)
+
+        self.assertEqual(response.json(), [1])
+        self.assertEqual(session.calls, 2)
+        self.assertIn(3.0, clock.sleeps)
+        # The server reported 5990 of 6000 used, so 20 more weight must wait
+        self.assertGreater(limiter.acquire(20), 0)
+
+    def test_token_bucket_paces_requests(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(10, 1, clock=clock, sleep=clock.sleep)
+
+        waits = [limiter.acquire() for _ in range(12)]
+
+        self.assertEqual(waits[:10], [0.0] * 10)
+        self.assertAlmostEqual(waits[10], 0.1)
+        self.assertAlmostEqual(clock.now, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()